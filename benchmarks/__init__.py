@@ -0,0 +1,15 @@
+"""Бенчмарки горячих путей бота.
+
+Каждый модуль запускается отдельно, например:
+
+    python -m benchmarks.bench_db_pool
+
+Набор микробенчмарков benchmarks.suite сохраняет отчет JSON и сравнивает
+его с базовым перед выкладкой:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+Бенчмарки, которым нужны PostgreSQL или Redis, берут параметры подключения
+из того же файла .env, что и сам бот.
+"""
@@ -0,0 +1,118 @@
+"""Установка пачки напоминаний по одному и одним многострочным сообщением.
+
+Собирает Dispatcher с register_user_handlers и поддельный Telegram Bot API
+(benchmarks.fake_telegram) с задержкой ответа --tg-latency-ms, как load_sim,
+и устанавливает --reminders напоминаний одного пользователя двумя способами:
+
+- "single": отдельное сообщение на каждое напоминание — разбор, INSERT,
+  задача arq и два ответа Telegram на каждое;
+- "bulk": одно сообщение со строкой на каждое напоминание — разбор пачкой,
+  один многострочный INSERT, один pipeline Redis и одна сводка.
+
+Для каждого способа выводятся общее время, количество сообщений, принятых
+Telegram, сохраненные напоминания и поставленные задачи. Нужны PostgreSQL
+и Redis из .env. После прогона пользователь бенчмарка удаляется вместе с
+напоминаниями и задачами.
+
+Запуск:
+
+    python -m benchmarks.bench_bulk_create --reminders 50 --tg-latency-ms 50
+"""
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.bot.api import TelegramAPIServer
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.constants import job_key_prefix
+
+from benchmarks.fake_telegram import FAKE_TOKEN, FakeTelegram
+from benchmarks.load_sim import DUE_TEXTS
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.reminder_cache import reminder_cache
+from bot.handlers.user_handlers import register_user_handlers
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+
+BENCH_QUEUE = "arq:bench_bulk_create"
+BENCH_USER_ID = 940_000_000
+
+
+def make_update(update_id: int, text: str) -> types.Update:
+    """Создать обновление с сообщением пользователя бенчмарка."""
+    return types.Update(**{
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": BENCH_USER_ID, "type": "private"},
+            "from": {"id": BENCH_USER_ID, "is_bot": False, "first_name": "Bulk", "username": "bulk_bench"},
+        },
+    })
+
+
+async def cleanup(redis) -> None:
+    """Удалить напоминания пользователя бенчмарка и задачи его очереди."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""DELETE FROM main_schedule WHERE fk_user_id = %s""", (BENCH_USER_ID,))
+    if job_ids := await redis.zrange(BENCH_QUEUE, 0, -1):
+        await redis.delete(*(job_key_prefix + job_id.decode() for job_id in job_ids))
+    await redis.delete(BENCH_QUEUE)
+
+
+async def measure(dp: Dispatcher, fake: FakeTelegram, redis, mode: str, lines: list) -> None:
+    """Установить напоминания одним способом и вывести отчет."""
+    await cleanup(redis)
+    sent_before = len(fake.sent)
+    started = time.perf_counter()
+    if mode == "single":
+        for n, line in enumerate(lines, start=1):
+            await dp.process_update(make_update(n, line))
+    else:
+        await dp.process_update(make_update(1, "\n".join(lines)))
+    elapsed = time.perf_counter() - started
+
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""SELECT count(*) FROM main_schedule WHERE fk_user_id = %s""", (BENCH_USER_ID,))
+        saved = (await cursor.fetchone())[0]
+    print(f"{mode:6}: {elapsed * 1000:8.1f} ms, {len(fake.sent) - sent_before:3d} Telegram messages, "
+          f"{saved} reminders saved, {await redis.zcard(BENCH_QUEUE)} jobs queued")
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Установить напоминания обоими способами."""
+    fake = FakeTelegram(global_rate=100_000, chat_interval=0, latency=args.tg_latency_ms / 1000)
+    bot = Bot(FAKE_TOKEN, server=TelegramAPIServer.from_base(await fake.start()))
+    redis = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer,
+                              default_queue_name=BENCH_QUEUE)
+    reminder_cache.attach(redis)
+    await db_pool.open()
+    await apply_migrations()
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s) ON CONFLICT DO NOTHING""",
+                             (BENCH_USER_ID,))
+
+    dp = Dispatcher(bot)
+    register_user_handlers(dp, redis)
+    Bot.set_current(bot)
+    Dispatcher.set_current(dp)
+    lines = [f"{DUE_TEXTS[n % len(DUE_TEXTS)]} через {n + 5} минут" for n in range(args.reminders)]
+    try:
+        for mode in ("single", "bulk"):
+            await measure(dp, fake, redis, mode, lines)
+    finally:
+        await cleanup(redis)
+        async with db_pool.cursor() as cursor:
+            await cursor.execute("""DELETE FROM main_users WHERE tg_id = %s""", (BENCH_USER_ID,))
+        await db_pool.close()
+        await redis.close()
+        await (await bot.get_session()).close()
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=50)
+    parser.add_argument("--tg-latency-ms", type=float, default=50, help="задержка ответа Telegram, мс")
+    asyncio.run(main(parser.parse_args()))
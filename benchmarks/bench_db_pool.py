@@ -0,0 +1,145 @@
+"""Пропускная способность обработчиков: одно блокирующее соединение против пула.
+
+Симулирует N одновременных пользователей, каждый из которых несколько раз
+создает напоминание и запрашивает свой список. Режим "before" повторяет прежнюю
+схему (одно глобальное соединение psycopg2 с синхронными запросами в цикле событий),
+режим "after" использует функции bot.db.db_func поверх асинхронного пула.
+
+Запуск:
+
+    python -m benchmarks.bench_db_pool --users 200 --rounds 5 --rtt-ms 1
+"""
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import psycopg2
+
+from bot.db.db_func import get_all_reminders, set_info_remind
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.other_func.reminder_analysis import analyze_reminder_db
+
+FIRST_USER_ID = 900_000_000
+
+
+def make_message(user_id: int) -> SimpleNamespace:
+    """Создать минимальное подобие types.Message для функций db_func."""
+    return SimpleNamespace(
+        text="Проверить бенчмарк завтра в 15:00",
+        from_user=SimpleNamespace(id=user_id, username=f"bench_{user_id}"),
+    )
+
+
+def legacy_connection():
+    """Открыть одно соединение psycopg2, как это делал прежний db_tables."""
+    connection = psycopg2.connect(
+        host=os.getenv("host"),
+        user=os.getenv("user"),
+        password=os.getenv("password"),
+        database=os.getenv("db_name"),
+        port=os.getenv("port"),
+    )
+    connection.autocommit = True
+    return connection
+
+
+async def legacy_user_session(connection, user_id: int, rounds: int, rtt: float) -> None:
+    """Сессия пользователя с синхронными запросами прямо в корутине."""
+    message = make_message(user_id)
+    for _ in range(rounds):
+        text_remind, from_date = await analyze_reminder_db(message=message)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", (rtt,))
+            cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id)
+                   VALUES (%s, %s, %s)""",
+                (text_remind, from_date, user_id)
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", (rtt,))
+            cursor.execute(
+                """SELECT id, reminder_text, reminder_datetime FROM main_schedule WHERE fk_user_id = %s""",
+                (user_id,)
+            )
+            cursor.fetchall()
+
+
+async def pooled_user_session(user_id: int, rounds: int, rtt: float) -> None:
+    """Сессия пользователя через асинхронный пул и функции db_func."""
+    message = make_message(user_id)
+    for _ in range(rounds):
+        if rtt:
+            async with db_pool.cursor() as cursor:
+                await cursor.execute("SELECT pg_sleep(%s)", (rtt,))
+        await set_info_remind(message=message)
+        if rtt:
+            async with db_pool.cursor() as cursor:
+                await cursor.execute("SELECT pg_sleep(%s)", (rtt,))
+        await get_all_reminders(message)
+
+
+async def prepare_users(users: int) -> None:
+    """Создать пользователей бенчмарка и очистить их старые напоминания."""
+    async with db_pool.cursor() as cursor:
+        await cursor.executemany(
+            """INSERT INTO main_users (tg_id, tg_username) VALUES (%s, %s) ON CONFLICT DO NOTHING""",
+            [(FIRST_USER_ID + i, f"bench_{FIRST_USER_ID + i}") for i in range(users)]
+        )
+        await cleanup(cursor, users)
+
+
+async def cleanup(cursor, users: int) -> None:
+    """Удалить напоминания пользователей бенчмарка."""
+    await cursor.execute(
+        """DELETE FROM main_schedule WHERE fk_user_id >= %s AND fk_user_id < %s""",
+        (FIRST_USER_ID, FIRST_USER_ID + users)
+    )
+
+
+async def run(users: int, rounds: int, rtt_ms: float) -> None:
+    """Прогнать оба режима и вывести пропускную способность."""
+    rtt = rtt_ms / 1000
+    await db_pool.open()
+    await apply_migrations()
+    await prepare_users(users)
+
+    operations = users * rounds * 2
+
+    connection = legacy_connection()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        legacy_user_session(connection, FIRST_USER_ID + i, rounds, rtt) for i in range(users)
+    ))
+    legacy_elapsed = time.perf_counter() - started
+    connection.close()
+
+    async with db_pool.cursor() as cursor:
+        await cleanup(cursor, users)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        pooled_user_session(FIRST_USER_ID + i, rounds, rtt) for i in range(users)
+    ))
+    pooled_elapsed = time.perf_counter() - started
+
+    async with db_pool.cursor() as cursor:
+        await cleanup(cursor, users)
+    await db_pool.close()
+
+    print(f"users={users} rounds={rounds} rtt={rtt_ms}ms pool={db_pool.min_size}..{db_pool.max_size}")
+    print(f"before: {legacy_elapsed:.2f}s, {operations / legacy_elapsed:.0f} handler ops/s")
+    print(f"after:  {pooled_elapsed:.2f}s, {operations / pooled_elapsed:.0f} handler ops/s")
+    print(f"speedup: x{legacy_elapsed / pooled_elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=1.0,
+                        help="имитация сетевой задержки до PostgreSQL на каждый запрос")
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.rounds, args.rtt_ms))
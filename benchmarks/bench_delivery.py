@@ -0,0 +1,84 @@
+"""Доставка пачки напоминаний, пришедших на одно время, через поддельный Telegram.
+
+Симулирует начало часа: N напоминаний в M чатах становятся готовыми к отправке
+одновременно, а воркер выполняет не больше max_jobs задач сразу. Режим "before"
+вызывает bot.send_message напрямую, как прежняя задача send_message, режим
+"after" — через DeliveryEngine. Для обоих режимов выводятся доставленные и
+потерянные сообщения, количество ответов 429, скорость доставки и задержка
+относительно запланированного времени.
+
+Запуск:
+
+    python -m benchmarks.bench_delivery --reminders 600 --chats 300 --max-jobs 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.bot.api import TelegramAPIServer
+from aiogram.utils.exceptions import TelegramAPIError
+
+from benchmarks.fake_telegram import FAKE_TOKEN, FakeTelegram
+from bot.other_func.delivery import DeliveryEngine
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> None:
+    """Доставить пачку напоминаний в одном из режимов и вывести результат."""
+    fake = FakeTelegram(global_rate=30, chat_interval=1, latency=args.latency_ms / 1000)
+    base = await fake.start()
+    bot = Bot(token=FAKE_TOKEN, server=TelegramAPIServer.from_base(base))
+    engine = DeliveryEngine(rate=args.rate, burst=args.burst, chat_interval=1.0,
+                            concurrency=args.concurrency, max_retries=5, backoff=0.5)
+    jobs = asyncio.Semaphore(args.max_jobs)
+    lags: list[float] = []
+    lost = 0
+    scheduled = datetime.now().astimezone()
+
+    async def job(chat_id: int, n: int) -> None:
+        nonlocal lost
+        async with jobs:
+            if mode == "before":
+                try:
+                    await bot.send_message(chat_id, f"напоминание {n}")
+                except TelegramAPIError:
+                    lost += 1
+                    return
+            elif not await engine.deliver(bot, chat_id, f"напоминание {n}", scheduled=scheduled):
+                lost += 1
+                return
+            lags.append((datetime.now().astimezone() - scheduled).total_seconds())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(job(n % args.chats + 1, n) for n in range(args.reminders)))
+    elapsed = time.perf_counter() - started
+    await (await bot.get_session()).close()
+    await fake.stop()
+
+    delivered = len(fake.sent)
+    p99 = statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else 0.0
+    print(f"{mode:6} delivered={delivered} lost={lost} 429={fake.rejected} "
+          f"rate={delivered / elapsed:.1f}/s lag_avg={statistics.fmean(lags or [0]):.2f}s "
+          f"lag_p99={p99:.2f}s total={elapsed:.2f}s")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Прогнать оба режима."""
+    print(f"reminders={args.reminders} chats={args.chats} max_jobs={args.max_jobs} "
+          f"limits: 30 msg/s, 1 msg/s per chat")
+    await run_mode("before", args)
+    await run_mode("after", args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=600)
+    parser.add_argument("--chats", type=int, default=300)
+    parser.add_argument("--max-jobs", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=25, help="лимит DeliveryEngine, сообщений в секунду")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20, help="задержка ответа поддельного Telegram")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,43 @@
+"""Скорость быстрого разбора частых фраз по сравнению с periodparser.
+
+Запуск:
+
+    python -m benchmarks.bench_fast_path --seconds 2
+"""
+import argparse
+import time
+from typing import Callable
+
+from benchmarks.corpus import PHRASES
+from bot.other_func.reminder_analysis import extract_reminder, fast_extract
+
+
+def parses_per_second(parse: Callable[[str], object], messages: list[str], seconds: float) -> float:
+    """Разбирать сообщения по кругу заданное время и вернуть скорость."""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for message in messages:
+            parse(message)
+        count += len(messages)
+    return count / (time.perf_counter() - started)
+
+
+def run(seconds: float) -> None:
+    """Сравнить оба способа разбора на сообщениях, которые понимает быстрый разбор."""
+    messages = [message for message in PHRASES if fast_extract(message) is not None]
+    fast = parses_per_second(fast_extract, messages, seconds)
+    slow = parses_per_second(extract_reminder, messages, seconds)
+
+    print(f"messages: {len(messages)} of {len(PHRASES)} in corpus take the fast path")
+    print(f"fast path:    {fast:10.0f} parses/s")
+    print(f"periodparser: {slow:10.0f} parses/s")
+    print(f"speedup: x{fast / slow:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    run(args.seconds)
@@ -0,0 +1,89 @@
+"""Память Redis на одно ожидающее напоминание в прежнем и компактном формате задач.
+
+Ставит --reminders отложенных задач в отдельную очередь локального Redis в
+двух форматах:
+
+- "before": задача send_message с ID чата и полным текстом, сериализованная
+  pickle, как до перехода на send_reminder;
+- "after": задача send_reminder только с ID напоминания в msgpack.
+
+Для каждого формата выводятся размер значения ключа задачи, MEMORY USAGE
+ключа, доля одного напоминания в MEMORY USAGE очереди и их сумма — байты на
+одно ожидающее напоминание. Отдельно выводится размер результата, который arq
+по умолчанию хранит час после доставки, а с keep_result = 0 не хранит.
+
+Тексты напоминаний берутся из корпуса benchmarks.corpus. Параметры Redis
+берутся из .env, как у бота.
+
+Запуск:
+
+    python -m benchmarks.bench_job_size --reminders 100000
+"""
+import argparse
+import asyncio
+import pickle
+from datetime import datetime, timedelta
+
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.constants import job_key_prefix
+from arq.jobs import serialize_result
+
+from benchmarks.corpus import PHRASES
+from bot.other_func.reminder_jobs import delivery_kwargs, job_deserializer, job_serializer, reminder_job_kwargs
+
+BENCH_QUEUE = "arq:bench_job_size"
+FIRST_REMINDER_ID = 50_000_000
+
+
+async def measure(args: argparse.Namespace, mode: str) -> None:
+    """Поставить задачи в одном формате, вывести их размер и удалить их."""
+    if mode == "before":
+        redis = await create_pool(RedisSettings)
+    else:
+        redis = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer)
+    defer_until = datetime.now() + timedelta(days=1)
+    job_ids = [f"reminder:bench{n:012d}" for n in range(args.reminders)]
+
+    await redis.delete(BENCH_QUEUE)
+    for start in range(0, args.reminders, args.batch):
+        await asyncio.gather(*(
+            redis.enqueue_job("send_message", _job_id=job_ids[n], _defer_until=defer_until, _queue_name=BENCH_QUEUE,
+                              **delivery_kwargs(900_000_000 + n, PHRASES[n % len(PHRASES)]))
+            if mode == "before" else
+            redis.enqueue_job("send_reminder", _job_id=job_ids[n], _defer_until=defer_until, _queue_name=BENCH_QUEUE,
+                              **reminder_job_kwargs(FIRST_REMINDER_ID + n))
+            for n in range(start, min(start + args.batch, args.reminders))
+        ))
+
+    sample = job_ids[::max(1, args.reminders // 1000)]
+    value = sum([len(await redis.get(job_key_prefix + job_id)) for job_id in sample]) / len(sample)
+    usage = sum([await redis.memory_usage(job_key_prefix + job_id) for job_id in sample]) / len(sample)
+    entry = await redis.memory_usage(BENCH_QUEUE, samples=0) / args.reminders
+    if mode == "before":
+        kwargs = delivery_kwargs(900_000_000, PHRASES[0])
+        result = len(serialize_result("send_message", (), kwargs, 1, 0, True, True, 0, 0,
+                                      f"{job_ids[0]}:send_message", BENCH_QUEUE, job_ids[0], serializer=pickle.dumps))
+    else:
+        result = 0
+
+    print(f"{mode:6}: job value {value:6.1f} B, job key {usage:6.1f} B, queue entry {entry:5.1f} B, "
+          f"total {usage + entry:6.1f} B per pending reminder, result kept after delivery {result} B")
+
+    for start in range(0, args.reminders, 1000):
+        await redis.delete(*(job_key_prefix + job_id for job_id in job_ids[start:start + 1000]))
+    await redis.delete(BENCH_QUEUE)
+    await redis.close()
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Измерить оба формата задач."""
+    for mode in ("before", "after"):
+        await measure(args, mode)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500, help="задач, ставящихся в очередь одновременно")
+    asyncio.run(main(parser.parse_args()))
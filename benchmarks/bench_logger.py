@@ -0,0 +1,87 @@
+"""Стоимость одного вызова logger.log для прежнего и нового логгера.
+
+Режим "before" повторяет прежний BotLogger: синхронный FileHandler и сообщение,
+собранное f-строкой до вызова. Режим "after" использует BotLogger с очередью и
+фоновым потоком записи. Измеряется время в вызывающем потоке (то, что платит
+обработчик в цикле событий) для записываемого сообщения и для сообщения
+отключенного уровня, как построчный вывод списка напоминаний.
+
+Запуск:
+
+    python -m benchmarks.bench_logger --calls 50000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bot.logging.logger import BotLogger
+
+
+class LegacyBotLogger:
+    """Прежний логгер: синхронная запись в файл из вызывающего потока."""
+
+    def __init__(self, log_file: str) -> None:
+        self.logger = logging.getLogger("bench_legacy_logger")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        self.logger.addHandler(file_handler)
+
+    def log(self, level: str, message: str) -> None:
+        if level == 'info':
+            self.logger.info(message)
+        elif level == 'error':
+            self.logger.error(message)
+
+
+def per_call_us(func, calls: int) -> float:
+    """Вернуть среднее время одного вызова func в микросекундах."""
+    started = time.perf_counter()
+    for n in range(calls):
+        func(n)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(calls: int) -> None:
+    """Измерить оба логгера и вывести результат."""
+    when = datetime(2030, 1, 1, 10, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = LegacyBotLogger(str(Path(directory) / "legacy.log"))
+        current = BotLogger(str(Path(directory) / "bot.log"), level='info', name="bench_bot_logger")
+        current.logger.propagate = False
+
+        legacy_info = per_call_us(
+            lambda n: legacy.log('info', f'Напоминание {n}: "текст", Дата и время: {when} для пользователя: {n}'),
+            calls)
+        # Прежний логгер собирал строку и для сообщений, которые потом никуда не писались
+        legacy_skipped = per_call_us(
+            lambda n: legacy.log('debug', f'Напоминание {n}: "текст", Дата и время: {when} для пользователя: {n}'),
+            calls)
+
+        started = time.perf_counter()
+        current_info = per_call_us(
+            lambda n: current.log('info', 'Напоминание %s: "%s", Дата и время: %s для пользователя: %s',
+                                  n, "текст", when, n),
+            calls)
+        current_skipped = per_call_us(
+            lambda n: current.log('debug', 'Напоминание %s: "%s", Дата и время: %s для пользователя: %s',
+                                  n, "текст", when, n),
+            calls)
+        current.stop()
+        drained = time.perf_counter() - started
+
+    print(f"calls={calls}")
+    print(f"before: written {legacy_info:.2f} us/call, disabled level {legacy_skipped:.2f} us/call")
+    print(f"after:  written {current_info:.2f} us/call, disabled level {current_skipped:.2f} us/call")
+    print(f"after:  background thread finished writing in {drained:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50000)
+    run(parser.parse_args().calls)
@@ -0,0 +1,84 @@
+"""Задержка обработчиков при разборе сообщений в цикле событий и в пуле процессов.
+
+Одновременно отправляет пачку сообщений с напоминаниями (тяжелые обработчики) и
+легкие обработчики, которые не разбирают текст. Для обоих видов выводятся p50 и p99
+задержки: при разборе в цикле событий легкие обработчики ждут, пока закончится
+разбор всех сообщений перед ними.
+
+Запуск:
+
+    python -m benchmarks.bench_parse_executor --messages 400 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+from benchmarks.corpus import PHRASES
+from bot.other_func.parse_executor import parse_executor
+from bot.other_func.reminder_analysis import analyze_reminder_handlers, parse_cache
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Вернуть перцентиль q (0..100) списка значений."""
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+async def parse_handler(text: str, arrived: float, latencies: list[float]) -> None:
+    """Тяжелый обработчик: разбор сообщения с напоминанием."""
+    await analyze_reminder_handlers(message=SimpleNamespace(text=text))
+    latencies.append(time.perf_counter() - arrived)
+
+
+async def light_handler(arrived: float, latencies: list[float]) -> None:
+    """Легкий обработчик, которому нужен только свободный цикл событий."""
+    await asyncio.sleep(0)
+    latencies.append(time.perf_counter() - arrived)
+
+
+async def burst(messages: int) -> tuple[list[float], list[float], float]:
+    """Отправить пачку тяжелых и легких обработчиков одновременно."""
+    parse_cache.clear()
+    heavy: list[float] = []
+    light: list[float] = []
+    # Все обновления приходят одновременно, задержка считается от момента прихода.
+    # Уникальный номер в тексте исключает попадания в кэш разбора.
+    started = time.perf_counter()
+    tasks = []
+    for i in range(messages):
+        tasks.append(parse_handler(f"{PHRASES[i % len(PHRASES)]} №{i}", started, heavy))
+        tasks.append(light_handler(started, light))
+
+    await asyncio.gather(*tasks)
+    return heavy, light, time.perf_counter() - started
+
+
+def report(name: str, heavy: list[float], light: list[float], elapsed: float) -> None:
+    """Вывести перцентили задержки."""
+    print(
+        f"{name:<9} parse p50={percentile(heavy, 50) * 1000:7.1f}ms p99={percentile(heavy, 99) * 1000:7.1f}ms | "
+        f"light p50={percentile(light, 50) * 1000:7.1f}ms p99={percentile(light, 99) * 1000:7.1f}ms | "
+        f"{len(heavy) / elapsed:.0f} parses/s"
+    )
+
+
+async def run(messages: int, workers: int) -> None:
+    """Прогнать пачку без пула процессов и с ним."""
+    report("inline", *await burst(messages))
+
+    parse_executor.workers = workers
+    parse_executor.max_pending = max(parse_executor.max_pending, workers)
+    parse_executor.start()
+    try:
+        report("executor", *await burst(messages))
+    finally:
+        parse_executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.workers))
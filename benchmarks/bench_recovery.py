@@ -0,0 +1,102 @@
+"""Восстановление очереди задач доставки из main_schedule после потери Redis.
+
+Добавляет --rows будущих напоминаний одного пользователя с ID задач, которых
+нет в Redis, как после очистки Redis, и запускает recover_jobs в отдельную
+очередь:
+
+1. первый проход ставит задачи для всех строк;
+2. повторный проход проверяет идемпотентность: он ничего не ставит;
+3. после удаления поставленных задач проход повторяется под tracemalloc,
+   чтобы показать пиковую память Python, которая зависит от --batch-size,
+   но не от количества строк.
+
+Для каждого прохода выводятся количество строк, поставленные задачи и
+скорость в строках в секунду. Бенчмарк рассчитан на базу данных разработки:
+задачи ставятся и для остальных напоминаний таблицы, у которых их нет.
+После прогона строки и задачи бенчмарка удаляются.
+
+Запуск:
+
+    python -m benchmarks.bench_recovery --rows 1000000 --batch-size 2000
+"""
+import argparse
+import asyncio
+import tracemalloc
+from datetime import timedelta
+
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.constants import job_key_prefix
+
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.other_func.job_recovery import recover_jobs
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+
+BENCH_QUEUE = "arq:bench_recovery"
+BENCH_USER_ID = 930_000_000
+
+
+async def seed(rows: int) -> None:
+    """Добавить пользователя бенчмарка и его напоминания с потерянными задачами."""
+    async with db_pool.connection() as connection:
+        await connection.execute("""INSERT INTO main_users (tg_id) VALUES (%s) ON CONFLICT DO NOTHING""",
+                                 (BENCH_USER_ID,))
+        await connection.execute("""SET LOCAL statement_timeout = 0""")
+        await connection.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id)
+               SELECT 'восстановить ' || n, now()::timestamp + interval '1 hour' + n * interval '1 second',
+                      %s, 'reminder:recoverbench' || n
+               FROM generate_series(1, %s) AS n""",
+            (BENCH_USER_ID, rows)
+        )
+
+
+async def flush(redis) -> None:
+    """Удалить задачи из очереди бенчмарка."""
+    while job_ids := await redis.zrange(BENCH_QUEUE, 0, 9999):
+        await redis.delete(*(job_key_prefix + job_id.decode() for job_id in job_ids))
+        await redis.zrem(BENCH_QUEUE, *job_ids)
+
+
+async def cleanup() -> None:
+    """Удалить пользователя бенчмарка вместе с напоминаниями."""
+    async with db_pool.connection() as connection:
+        await connection.execute("""SET LOCAL statement_timeout = 0""")
+        await connection.execute("""DELETE FROM main_users WHERE tg_id = %s""", (BENCH_USER_ID,))
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Заполнить таблицу, прогнать восстановление и вывести отчет."""
+    redis = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer,
+                              default_queue_name=BENCH_QUEUE)
+    await db_pool.open()
+    await apply_migrations()
+    await cleanup()
+    await seed(args.rows)
+    lookback = timedelta(0)
+    try:
+        for name in ("first", "rerun"):
+            stats = await recover_jobs(redis, args.batch_size, lookback)
+            print(f"{name:6}: {stats.scanned} rows, {stats.enqueued} enqueued, "
+                  f"{stats.elapsed:.1f}s, {stats.rate:.0f} rows/s")
+
+        await flush(redis)
+        tracemalloc.start()
+        stats = await recover_jobs(redis, args.batch_size, lookback)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"traced: {stats.scanned} rows, {stats.enqueued} enqueued, "
+              f"peak Python memory {peak / 2**20:.1f} MiB with batch size {args.batch_size}")
+    finally:
+        await flush(redis)
+        await cleanup()
+        await db_pool.close()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""Хранение повторяющихся напоминаний в течение года.
+
+Создает --reminders ежедневных напоминаний одного пользователя и прокручивает
+--days повторений: для каждого повторения вызывается complete_reminder, как в
+задаче send_reminder, а отработавшая задача удаляется из очереди, как это
+делает воркер arq. На контрольных днях выводятся количество строк
+main_schedule и задач в очереди на одно напоминание и занимаемая ими память:
+размер строк в PostgreSQL (pg_column_size) и MEMORY USAGE ключей задач и доли
+очереди в Redis.
+
+Для сравнения те же напоминания ставятся заранее на весь период, по строке и
+задаче на каждое повторение, как пришлось бы делать без правила повтора.
+
+Нужны PostgreSQL и Redis из .env. После прогона строки и задачи бенчмарка удаляются.
+
+Запуск:
+
+    python -m benchmarks.bench_recurring --reminders 50 --days 365
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.constants import job_key_prefix
+
+from bot.db.db_func import complete_reminder, set_info_reminds
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.other_func.reminder_analysis import format_reminder
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+
+BENCH_QUEUE = "arq:bench_recurring"
+BENCH_USER_ID = 950_000_000
+CHECKPOINTS = (1, 7, 30, 90, 180, 365)
+
+
+async def footprint(redis, reminders: int) -> str:
+    """Строки, задачи и их память на одно напоминание."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT count(*), COALESCE(sum(pg_column_size(main_schedule.*)), 0) FROM main_schedule
+               WHERE fk_user_id = %s""",
+            (BENCH_USER_ID,)
+        )
+        rows, row_bytes = await cursor.fetchone()
+    job_ids = await redis.zrange(BENCH_QUEUE, 0, -1)
+    redis_bytes = sum([await redis.memory_usage(job_key_prefix + job_id.decode()) for job_id in job_ids])
+    redis_bytes += await redis.memory_usage(BENCH_QUEUE, samples=0) or 0
+    return (f"{rows / reminders:6.1f} rows, {row_bytes / reminders:8.0f} B in Postgres, "
+            f"{len(job_ids) / reminders:6.1f} jobs, {redis_bytes / reminders:8.0f} B in Redis per reminder")
+
+
+async def cleanup(redis) -> None:
+    """Удалить напоминания пользователя бенчмарка и задачи его очереди."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""DELETE FROM main_schedule WHERE fk_user_id = %s""", (BENCH_USER_ID,))
+    while job_ids := await redis.zrange(BENCH_QUEUE, 0, 9999):
+        await redis.delete(*(job_key_prefix + job_id.decode() for job_id in job_ids))
+        await redis.zrem(BENCH_QUEUE, *job_ids)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Прокрутить год повторений и сравнить с заранее поставленными напоминаниями."""
+    redis = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer,
+                              default_queue_name=BENCH_QUEUE)
+    await db_pool.open()
+    await apply_migrations()
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s) ON CONFLICT DO NOTHING""",
+                             (BENCH_USER_ID,))
+    first = (datetime.now() + timedelta(hours=1)).replace(second=0, microsecond=0)
+    try:
+        await cleanup(redis)
+        await set_info_reminds(BENCH_USER_ID, [
+            format_reminder(f"повторяющееся {n}", first)._replace(recurrence="D") for n in range(args.reminders)
+        ], redis)
+        print(f"recurring, day {0:3d}: {await footprint(redis, args.reminders)}")
+        for day in range(1, args.days + 1):
+            async with db_pool.cursor() as cursor:
+                await cursor.execute("""SELECT id, job_id FROM main_schedule WHERE fk_user_id = %s""",
+                                     (BENCH_USER_ID,))
+                jobs = await cursor.fetchall()
+            for reminder_id, job_id in jobs:
+                await complete_reminder(reminder_id, job_id, redis)
+                await redis.delete(job_key_prefix + job_id)
+                await redis.zrem(BENCH_QUEUE, job_id)
+            if day in CHECKPOINTS or day == args.days:
+                print(f"recurring, day {day:3d}: {await footprint(redis, args.reminders)}")
+
+        await cleanup(redis)
+        for n in range(args.reminders):
+            await set_info_reminds(BENCH_USER_ID, [
+                format_reminder(f"повторяющееся {n}", first + timedelta(days=day)) for day in range(args.days)
+            ], redis)
+        print(f"pre-enqueued for {args.days} days: {await footprint(redis, args.reminders)}")
+    finally:
+        await cleanup(redis)
+        async with db_pool.cursor() as cursor:
+            await cursor.execute("""DELETE FROM main_users WHERE tg_id = %s""", (BENCH_USER_ID,))
+        await db_pool.close()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365, help="сколько повторений прокрутить")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,148 @@
+"""Стоимость очистки просроченных напоминаний до и после секционирования main_schedule.
+
+Добавляет --rows просроченных напоминаний одного пользователя и удаляет их
+двумя способами:
+
+- "delete": как прежняя фоновая очистка — пачками по --batch-size строк
+  из несекционированной копии main_schedule с теми же индексами, рядом
+  с --live-rows живыми строками;
+- "partition": как ExpirySweeper сейчас — строки лежат в секции месяца
+  2002-01, и drop_expired_partitions отсоединяет и удаляет ее целиком.
+
+Для каждого способа выводятся время, объем записанного WAL и размер таблицы
+с индексами до и после очистки: удаление строк оставляет мертвые строки до
+VACUUM, удаление секции освобождает место сразу. Бенчмарк рассчитан на базу
+данных разработки: вместе с секцией бенчмарка удаляются и остальные секции,
+закончившиеся раньше нее. После прогона строки и таблицы бенчмарка удаляются.
+
+Запуск:
+
+    python -m benchmarks.bench_retention --rows 1000000 --live-rows 1000000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.partitions import drop_expired_partitions
+
+BENCH_USER_ID = 960_000_000
+BENCH_TABLE = "bench_retention_flat"
+BENCH_MONTH = datetime(2002, 1, 1)
+BENCH_PARTITION = "main_schedule_2002_01"
+
+
+async def table_size(cursor, table: str) -> int:
+    """Размер таблицы с индексами, 0 для удаленной таблицы."""
+    await cursor.execute("""SELECT COALESCE(pg_total_relation_size(to_regclass(%s)), 0)""", (table,))
+    return (await cursor.fetchone())[0]
+
+
+async def measure(name: str, table: str, clean) -> None:
+    """Выполнить очистку и вывести время, объем WAL и размер таблицы до и после нее."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""SELECT pg_current_wal_lsn()::text""")
+        wal_before = (await cursor.fetchone())[0]
+        size_before = await table_size(cursor, table)
+    started = time.perf_counter()
+    await clean()
+    elapsed = time.perf_counter() - started
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s::pg_lsn)""", (wal_before,))
+        wal_bytes = (await cursor.fetchone())[0]
+        size_after = await table_size(cursor, table)
+    print(f"{name:9}: {elapsed * 1000:9.1f} ms, {wal_bytes / 2**20:8.1f} MiB WAL, "
+          f"table {size_before / 2**20:.1f} -> {size_after / 2**20:.1f} MiB")
+
+
+async def measure_delete(args: argparse.Namespace) -> None:
+    """Удалить просроченные строки пачками из несекционированной таблицы."""
+    async with db_pool.connection() as connection:
+        await connection.execute("""SET LOCAL statement_timeout = 0""")
+        await connection.execute(f"""DROP TABLE IF EXISTS {BENCH_TABLE}""")
+        await connection.execute(
+            f"""CREATE TABLE {BENCH_TABLE} (
+                id bigserial PRIMARY KEY,
+                reminder_text TEXT NOT NULL,
+                reminder_datetime TIMESTAMP NOT NULL,
+                fk_user_id bigint NOT NULL,
+                job_id varchar(64),
+                recurrence varchar(8)
+            )"""
+        )
+        await connection.execute(
+            f"""INSERT INTO {BENCH_TABLE} (reminder_text, reminder_datetime, fk_user_id, job_id)
+                SELECT 'очистка ' || n,
+                       CASE WHEN n <= %s THEN %s + n * interval '1 second'
+                            ELSE now()::timestamp + n * interval '1 second' END,
+                       %s, 'reminder:retentionbench' || n
+                FROM generate_series(1, %s) AS n""",
+            (args.rows, BENCH_MONTH, BENCH_USER_ID, args.rows + args.live_rows)
+        )
+        for columns in ("fk_user_id, reminder_datetime, id", "reminder_datetime", "job_id"):
+            await connection.execute(f"""CREATE INDEX ON {BENCH_TABLE} ({columns})""")
+        await connection.execute(f"""ANALYZE {BENCH_TABLE}""")
+
+    async def clean() -> None:
+        while True:
+            async with db_pool.cursor() as cursor:
+                await cursor.execute(
+                    f"""DELETE FROM {BENCH_TABLE}
+                        WHERE id IN (SELECT id FROM {BENCH_TABLE}
+                                     WHERE reminder_datetime < now() AND recurrence IS NULL LIMIT %s)""",
+                    (args.batch_size,)
+                )
+                if cursor.rowcount < args.batch_size:
+                    return
+
+    await measure("delete", BENCH_TABLE, clean)
+
+
+async def measure_partition(args: argparse.Namespace) -> None:
+    """Удалить секцию с просроченными строками целиком."""
+    async with db_pool.connection() as connection:
+        await connection.execute("""SET LOCAL statement_timeout = 0""")
+        await connection.execute(f"""DROP TABLE IF EXISTS {BENCH_PARTITION}""")
+        await connection.execute("""SELECT main_schedule_add_partition(%s)""", (BENCH_MONTH,))
+        await connection.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id)
+               SELECT 'очистка ' || n, %s + n * interval '1 second', %s, 'reminder:retentionbench' || n
+               FROM generate_series(1, %s) AS n""",
+            (BENCH_MONTH, BENCH_USER_ID, args.rows)
+        )
+        await connection.execute(f"""ANALYZE {BENCH_PARTITION}""")
+
+    await measure("partition", BENCH_PARTITION, lambda: drop_expired_partitions(datetime(2002, 2, 1)))
+
+
+async def cleanup() -> None:
+    """Удалить таблицу, секцию и пользователя бенчмарка."""
+    async with db_pool.connection() as connection:
+        await connection.execute("""SET LOCAL statement_timeout = 0""")
+        await connection.execute(f"""DROP TABLE IF EXISTS {BENCH_TABLE}, {BENCH_PARTITION}""")
+        await connection.execute("""DELETE FROM main_users WHERE tg_id = %s""", (BENCH_USER_ID,))
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Очистить просроченные строки обоими способами и вывести отчет."""
+    await db_pool.open()
+    await apply_migrations()
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s) ON CONFLICT DO NOTHING""",
+                             (BENCH_USER_ID,))
+    try:
+        await measure_delete(args)
+        await measure_partition(args)
+    finally:
+        await cleanup()
+        await db_pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="просроченные строки")
+    parser.add_argument("--live-rows", type=int, default=1_000_000, help="живые строки рядом с просроченными")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
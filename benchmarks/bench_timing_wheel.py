@@ -0,0 +1,85 @@
+"""Колесо таймеров планировщика доставки с миллионом ожидающих напоминаний.
+
+Заполняет WheelScheduler (без базы данных и Telegram) напоминаниями,
+равномерно распределенными по окну --window секунд, отменяет часть из них,
+как при удалении и редактировании, а затем прокручивает все окно по тикам.
+Выводит:
+
+- память колеса и кэша текстов на одно напоминание (tracemalloc);
+- стоимость вставки и отмены в микросекундах;
+- среднюю и максимальную стоимость тика, включая перекладывание таймеров
+  с верхних уровней, и количество сработавших таймеров.
+
+Запуск:
+
+    python -m benchmarks.bench_timing_wheel --timers 1000000 --window 3600 --tick 0.1
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bot.other_func.wheel_scheduler import WheelScheduler
+
+
+def main(args: argparse.Namespace) -> None:
+    """Заполнить колесо, прокрутить окно и вывести отчет."""
+    random.seed(args.seed)
+    start = datetime.now()
+    offsets = [random.uniform(0, args.window) for _ in range(args.timers)]
+    texts = [f"Пришло время:\nнапоминание {n}" for n in range(1000)]
+
+    def fill() -> WheelScheduler:
+        scheduler = WheelScheduler(tick=args.tick, window=args.window, catchup=0)
+        for reminder_id, offset in enumerate(offsets):
+            scheduler.schedule(reminder_id, 100_000 + reminder_id % 50_000, texts[reminder_id % len(texts)],
+                               start + timedelta(seconds=offset))
+        return scheduler
+
+    # Память и время вставки измеряются на разных заполнениях: tracemalloc замедляет выделения
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    scheduler = fill()
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del scheduler
+
+    began = time.perf_counter()
+    scheduler = fill()
+    insert_us = (time.perf_counter() - began) / args.timers * 1e6
+
+    cancelled = random.sample(range(args.timers), int(args.timers * args.cancel_share))
+    began = time.perf_counter()
+    for reminder_id in cancelled:
+        scheduler.cancel(reminder_id)
+    cancel_us = (time.perf_counter() - began) / max(len(cancelled), 1) * 1e6
+
+    wheel = scheduler.wheel
+    last_tick = scheduler._tick_of((start + timedelta(seconds=args.window)).timestamp())
+    costs = []
+    fired = 0
+    for tick in range(wheel.current, last_tick + 1):
+        began = time.perf_counter()
+        for reminder_id in wheel.advance(tick):
+            scheduler._reminders.pop(reminder_id)
+            fired += 1
+        costs.append(time.perf_counter() - began)
+
+    print(f"timers={args.timers} window={args.window}s tick={args.tick}s ticks={len(costs)}")
+    print(f"memory: {memory / 2**20:.1f} MiB, {memory / args.timers:.0f} bytes per timer (wheel + payload)")
+    print(f"insert: {insert_us:.2f} us/timer, cancel: {cancel_us:.2f} us/timer ({len(cancelled)} cancelled)")
+    print(f"tick: mean {statistics.fmean(costs) * 1e6:.1f} us, p99 {sorted(costs)[int(len(costs) * 0.99)] * 1e6:.1f} us, "
+          f"max {max(costs) * 1000:.2f} ms")
+    print(f"fired: {fired} of {args.timers - len(cancelled)} expected, {len(wheel)} left")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=1_000_000)
+    parser.add_argument("--window", type=float, default=3600, help="окно, по которому распределены таймеры, с")
+    parser.add_argument("--tick", type=float, default=0.1, help="длительность тика, с")
+    parser.add_argument("--cancel-share", type=float, default=0.1, help="доля отменяемых таймеров")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+"""Нагрузочный тест приема обновлений через webhook.
+
+Запускает WebhookServer на локальном порту с обработчиком, который имитирует
+работу (ожидание ввода-вывода в течение --handler-ms), и отправляет синтетические
+обновления с --clients одновременных соединений. Выводится количество принятых
+обновлений в секунду и время до окончания обработки всех обновлений.
+
+Запуск:
+
+    python -m benchmarks.bench_webhook --updates 5000 --clients 50 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, types
+from aiohttp import ClientSession, web
+
+from bot.other_func.webhook import SECRET_HEADER, WebhookServer
+
+
+def make_update(update_id: int) -> dict:
+    """Создать синтетическое обновление с текстовым сообщением."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": "купить молоко завтра в 10:00",
+            "chat": {"id": update_id % 1000 + 1, "type": "private"},
+            "from": {"id": update_id % 1000 + 1, "is_bot": False, "first_name": "Bench"},
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Отправить обновления на webhook и вывести пропускную способность."""
+    processed = 0
+
+    async def handler(message: types.Message) -> None:
+        nonlocal processed
+        await asyncio.sleep(args.handler_ms / 1000)
+        processed += 1
+
+    dp = Dispatcher(Bot(token="123456:bench-token"))
+    dp.register_message_handler(handler)
+    server = WebhookServer(dp, path="/webhook", secret_token="bench",
+                           max_concurrency=args.concurrency, drain_timeout=60)
+    runner = web.AppRunner(server.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/webhook"
+
+    ids = iter(range(args.updates))
+
+    async def client(session: ClientSession) -> None:
+        for update_id in ids:
+            async with session.post(url, json=make_update(update_id), headers={SECRET_HEADER: "bench"}) as response:
+                assert response.status == 200
+
+    async with ClientSession() as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(args.clients)))
+        accepted = time.perf_counter() - started
+        await server.drain()
+        finished = time.perf_counter() - started
+
+    await runner.cleanup()
+    print(f"updates={args.updates} clients={args.clients} concurrency={args.concurrency} "
+          f"handler={args.handler_ms}ms")
+    print(f"accepted: {server.accepted / accepted:.0f} updates/s ({accepted:.2f}s)")
+    print(f"processed: {processed} updates in {finished:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--handler-ms", type=float, default=20)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,40 @@
+"""Набор типичных сообщений пользователей для бенчмарков разбора."""
+
+PHRASES = [
+    "купить молоко через 10 минут",
+    "созвон с командой через 2 часа",
+    "проверить почту через 1 час",
+    "выпить таблетку через 30 минут",
+    "Напомни мне о встрече завтра в 15:00",
+    "завтра в 9:00 позвонить врачу",
+    "сдать отчет завтра в 18:30",
+    "послезавтра в 10:00 забрать посылку",
+    "полить цветы послезавтра в 8:15",
+    "оплатить интернет 25 октября в 12:00",
+    "день рождения мамы 3 ноября в 10:00",
+    "в пятницу в 19:00 кино с друзьями",
+    "в понедельник в 9:30 планерка",
+    "сегодня в 21:00 тренировка",
+    "вечером позвонить бабушке",
+    "через неделю продлить подписку",
+    "забрать ребенка из садика сегодня в 17:30",
+    "через 15 минут выключить духовку",
+    "через 3 часа принять лекарство",
+    "записаться к стоматологу завтра в 11:00",
+    "позвонить в банк в четверг в 10:00",
+    "в среду в 14:00 встреча с клиентом",
+    "в субботу в 12:00 обед у родителей",
+    "в воскресенье в 20:00 собрать вещи в поездку",
+    "продлить страховку 1 декабря в 9:00",
+    "заплатить за квартиру 10 числа в 10:00",
+    "утром сделать зарядку",
+    "завтра утром купить хлеб",
+    "сегодня вечером постирать белье",
+    "через 45 минут проверить пирог",
+    "передать показания счетчиков 20 ноября в 18:00",
+    "послезавтра в 16:45 забрать костюм из химчистки",
+    "напомни завтра в 8:00 взять документы",
+    "Напомни мне через 20 минут выйти из дома",
+    "через 2 дня отправить отчет бухгалтеру",
+    "в понедельник в 10:00 подать заявление",
+]
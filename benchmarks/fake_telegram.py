@@ -0,0 +1,123 @@
+"""Локальный HTTP-сервер, имитирующий Telegram Bot API для тестов и бенчмарков.
+
+Сервер принимает sendMessage и, как настоящий Telegram, отвечает 429 с
+retry_after при превышении общего лимита сообщений в секунду или лимита на
+один чат. Все принятые сообщения сохраняются в FakeTelegram.sent.
+
+Использование:
+
+    fake = FakeTelegram(global_rate=30, chat_interval=1)
+    base = await fake.start()
+    bot = Bot(token=FAKE_TOKEN, server=TelegramAPIServer.from_base(base))
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from aiohttp import web
+
+FAKE_TOKEN = "123456:fake-telegram-token"
+
+
+class FakeTelegram:
+    """Поддельный Telegram Bot API с лимитами частоты.
+
+    Атрибуты:
+        global_rate (int): Допустимое количество сообщений за секунду для всего бота.
+        chat_interval (float): Минимальный интервал между сообщениями в один чат в секундах.
+        latency (float): Искусственная задержка ответа в секундах.
+        retry_after (int): Значение retry_after в ответах 429.
+        sent (list): Принятые сообщения: (chat_id, text, время приема по time.time()).
+        rejected (int): Количество ответов 429.
+    """
+
+    def __init__(self, global_rate: int = 30, chat_interval: float = 1.0,
+                 latency: float = 0.0, retry_after: int = 1) -> None:
+        """Инициализировать FakeTelegram.
+
+        Аргументы:
+            global_rate (int): Допустимое количество сообщений за секунду для всего бота.
+            chat_interval (float): Минимальный интервал между сообщениями в один чат в секундах.
+            latency (float): Искусственная задержка ответа в секундах.
+            retry_after (int): Значение retry_after в ответах 429.
+        """
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.latency = latency
+        self.retry_after = retry_after
+        self.sent: list[tuple[int, str, float]] = []
+        self.rejected = 0
+        self._window: deque[float] = deque()
+        self._last_by_chat: dict[int, float] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запустить сервер.
+
+        Аргументы:
+            host (str): Адрес для прослушивания.
+            port (int): Порт, 0 — выбрать свободный.
+
+        Возвращает:
+            str: Базовый адрес для TelegramAPIServer.from_base.
+        """
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Остановить сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _limited(self, chat_id: int) -> bool:
+        """Проверить лимиты и учесть сообщение, если они не превышены."""
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= 1:
+            self._window.popleft()
+        if len(self._window) >= self.global_rate:
+            return True
+
+        last = self._last_by_chat.get(chat_id)
+        if last is not None and now - last < self.chat_interval:
+            return True
+
+        self._window.append(now)
+        self._last_by_chat[chat_id] = now
+        return False
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Обработать вызов метода Bot API."""
+        method = request.match_info["method"].lower()
+        data = dict(await request.post())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "getme":
+            return web.json_response({"ok": True, "result": {
+                "id": 123456, "is_bot": True, "first_name": "Fake", "username": "fake_bot"
+            }})
+        if method != "sendmessage":
+            return web.json_response({"ok": True, "result": True})
+
+        chat_id = int(data["chat_id"])
+        if self._limited(chat_id):
+            self.rejected += 1
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+
+        self.sent.append((chat_id, data.get("text", ""), time.time()))
+        return web.json_response({"ok": True, "result": {
+            "message_id": len(self.sent), "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"}, "text": data.get("text", ""),
+        }})
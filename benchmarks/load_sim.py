@@ -0,0 +1,255 @@
+"""Сквозной нагрузочный тест: виртуальные пользователи против настоящего Dispatcher.
+
+Собирает Dispatcher с register_user_handlers, поддельный Telegram Bot API
+(benchmarks.fake_telegram) и воркер arq с настоящей функцией send_reminder и
+движком доставки, а также запускает чистку просроченных напоминаний, как main.py.
+Все работает в одном процессе и одном цикле событий, поэтому задержки
+обработчиков включают конкуренцию с воркером, как при запуске на одной машине.
+
+Каждый из --users виртуальных пользователей отправляет /start, а затем до
+конца --duration выбирает действие по весам: напоминание свободным текстом
+(часть из них срабатывает через минуту, чтобы доставка попала в прогон),
+список, редактирование и удаление первого напоминания, и ждет между действиями
+случайное время со средним --think секунд.
+
+После нагрузки тест ждет доставки напоминаний, срок которых уже наступил,
+не дольше --drain секунд, и выводит:
+
+- устойчивую пропускную способность в обновлениях в секунду;
+- p50/p95/p99 времени обработки обновления, всего и по типам действий;
+- долю напоминаний, доставленных не позже --on-time секунд после срока,
+  считая недоставленными задачи, срок которых прошел, а они остались в очереди;
+- количество задач asyncio в начале и в конце, чтобы был виден рост, как при
+  утечке задач чистки.
+
+Нужны PostgreSQL и Redis из .env: воркер arq использует команды Redis,
+которых нет в fakeredis.
+
+Запуск:
+
+    python -m benchmarks.load_sim --users 200 --duration 120 --think 2
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+from itertools import count
+from typing import Dict, List
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.bot.api import TelegramAPIServer
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.worker import Worker, func
+
+from benchmarks.corpus import PHRASES
+from benchmarks.fake_telegram import FAKE_TOKEN, FakeTelegram
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.reminder_cache import reminder_cache
+from bot.db.sweeper import expiry_sweeper
+from bot.handlers.user_handlers import register_user_handlers
+from bot.other_func.arq_func import WorkerSettings, send_reminder
+from bot.other_func.parse_executor import parse_executor
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+
+FIRST_USER_ID = 920_000_000
+LIST_TEXT = "Список моих напоминаний"
+# Напоминания без цифр и слов-дат в тексте, чтобы срок задавался только фразой "через 1 минуту"
+DUE_TEXTS = ("проверить нагрузку", "выпить воды", "размять спину", "ответить коллеге", "закрыть окно")
+# Веса действий виртуального пользователя
+ACTIONS = {"reminder": 50, "list": 25, "edit": 10, "delete": 10, "start": 5}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Перцентиль q (0..100) по отсортированной выборке."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+class LoadSimulator:
+    """Виртуальные пользователи, отправляющие обновления в Dispatcher.
+
+    Атрибуты:
+        dp (Dispatcher): Диспетчер с обработчиками бота.
+        latencies (dict): Время обработки обновлений в секундах по типам действий.
+        errors (int): Количество исключений, вышедших из обработчиков.
+    """
+
+    def __init__(self, dp: Dispatcher, think: float, due_share: float) -> None:
+        """Инициализировать LoadSimulator.
+
+        Аргументы:
+            dp (Dispatcher): Диспетчер с обработчиками бота.
+            think (float): Среднее время между действиями пользователя в секундах.
+            due_share (float): Доля напоминаний, срабатывающих через минуту.
+        """
+        self.dp = dp
+        self.think = think
+        self.due_share = due_share
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self._update_ids = count(1)
+
+    def _update(self, user_id: int, text: str) -> types.Update:
+        """Создать обновление с сообщением пользователя."""
+        update_id = next(self._update_ids)
+        return types.Update(**{
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id, "date": int(time.time()), "text": text,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Load", "username": f"load_{user_id}"},
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+                if text.startswith("/") else [],
+            },
+        })
+
+    def _text(self, action: str) -> str:
+        """Текст сообщения для действия."""
+        if action == "start":
+            return "/start"
+        if action == "list":
+            return LIST_TEXT
+        if action == "edit":
+            return "/edit_reminder 1 перенесенное напоминание 2030-01-01 10:00:00"
+        if action == "delete":
+            return "/delete_reminder 1"
+        if random.random() < self.due_share:
+            return f"{random.choice(DUE_TEXTS)} через 1 минуту"
+        return random.choice(PHRASES)
+
+    async def send(self, user_id: int, action: str) -> None:
+        """Отправить одно обновление и записать время его обработки."""
+        update = self._update(user_id, self._text(action))
+        started = time.perf_counter()
+        try:
+            await self.dp.process_update(update)
+        except Exception:
+            self.errors += 1
+        self.latencies[action].append(time.perf_counter() - started)
+
+    async def user(self, user_id: int, deadline: float) -> None:
+        """Сессия одного виртуального пользователя до deadline по time.monotonic()."""
+        await self.send(user_id, "start")
+        names, weights = list(ACTIONS), list(ACTIONS.values())
+        while True:
+            await asyncio.sleep(random.expovariate(1 / self.think))
+            if time.monotonic() >= deadline:
+                return
+            await self.send(user_id, random.choices(names, weights)[0])
+
+
+async def cleanup_users() -> None:
+    """Удалить пользователей теста вместе с их напоминаниями."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""DELETE FROM main_users WHERE tg_id >= %s AND tg_id < %s""",
+                             (FIRST_USER_ID, FIRST_USER_ID + 1_000_000))
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Прогнать нагрузку и вывести отчет."""
+    random.seed(args.seed)
+    fake = FakeTelegram(global_rate=args.tg_rate, chat_interval=args.tg_chat_interval, latency=args.tg_latency_ms / 1000)
+    server = TelegramAPIServer.from_base(await fake.start())
+    redis = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer)
+    reminder_cache.attach(redis)
+    await db_pool.open()
+    await apply_migrations()
+    await cleanup_users()
+    expiry_sweeper.start()
+    parse_executor.start()
+
+    bot = Bot(FAKE_TOKEN, server=server)
+    dp = Dispatcher(bot)
+    register_user_handlers(dp, redis)
+    Bot.set_current(bot)
+    Dispatcher.set_current(dp)
+
+    lags: List[float] = []
+
+    async def send_and_measure(ctx: dict, reminder_id: int) -> bool:
+        delivered = await send_reminder(ctx, reminder_id)
+        if delivered:
+            lags.append(time.time() - ctx['score'] / 1000)
+        return delivered
+
+    worker = Worker(
+        functions=[func(send_and_measure, name="send_reminder")],
+        redis_pool=redis,
+        ctx={"bot": Bot(FAKE_TOKEN, server=server)},
+        handle_signals=False,
+        max_jobs=WorkerSettings.max_jobs,
+        poll_delay=args.poll_delay,
+        log_results=False,
+        keep_result=WorkerSettings.keep_result,
+        job_serializer=job_serializer,
+        job_deserializer=job_deserializer,
+    )
+    worker_task = asyncio.create_task(worker.async_run())
+
+    simulator = LoadSimulator(dp, args.think, args.due_share)
+    tasks_before = len(asyncio.all_tasks())
+    started = time.monotonic()
+    await asyncio.gather(*(simulator.user(FIRST_USER_ID + i, started + args.duration) for i in range(args.users)))
+    load_elapsed = time.monotonic() - started
+    tasks_after_load = len(asyncio.all_tasks())
+
+    # Дождаться доставки напоминаний, срок которых наступает не позже минуты после нагрузки
+    last_due_ms = int((time.time() + 60) * 1000)
+    drain_until = time.monotonic() + args.drain
+    while time.monotonic() < drain_until and await redis.zcount(redis.default_queue_name, 0, last_due_ms):
+        await asyncio.sleep(1)
+    overdue = await redis.zcount(redis.default_queue_name, 0, int((time.time() - args.on_time) * 1000))
+
+    worker_task.cancel()
+    await asyncio.gather(worker_task, return_exceptions=True)
+    await expiry_sweeper.stop()
+    parse_executor.shutdown()
+    await cleanup_users()
+    await db_pool.close()
+    await worker.close()
+    for closing_bot in (bot, worker.ctx["bot"]):
+        await (await closing_bot.get_session()).close()
+    await fake.stop()
+
+    all_latencies = sorted(latency for samples in simulator.latencies.values() for latency in samples)
+    updates = len(all_latencies)
+    on_time = sum(1 for lag in lags if lag <= args.on_time)
+    expected = len(lags) + overdue
+
+    print(f"users={args.users} duration={args.duration}s think={args.think}s "
+          f"tg_rate={args.tg_rate}/s")
+    print(f"throughput: {updates / load_elapsed:.1f} updates/s ({updates} updates, {simulator.errors} handler errors)")
+    print(f"{'action':10} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for action, samples in [("all", all_latencies)] + sorted(simulator.latencies.items()):
+        samples = sorted(samples)
+        print(f"{action:10} {len(samples):7d} {percentile(samples, 50) * 1000:9.1f} "
+              f"{percentile(samples, 95) * 1000:9.1f} {percentile(samples, 99) * 1000:9.1f}")
+    if expected:
+        print(f"delivery: {len(lags)} delivered, {overdue} overdue in queue, "
+              f"on time (<= {args.on_time}s): {on_time / expected:.1%}, "
+              f"lag p50 {statistics.median(lags) if lags else 0:.2f}s, max {max(lags, default=0):.2f}s")
+    else:
+        print("delivery: no reminders came due during the run")
+    print(f"telegram: {len(fake.sent)} messages accepted, {fake.rejected} responses 429")
+    print(f"asyncio tasks: {tasks_before} before load, {tasks_after_load} after load")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=120, help="длительность нагрузки, с")
+    parser.add_argument("--think", type=float, default=2.0, help="среднее время между действиями, с")
+    parser.add_argument("--due-share", type=float, default=0.5, help="доля напоминаний через 1 минуту")
+    parser.add_argument("--drain", type=float, default=90, help="сколько ждать доставки после нагрузки, с")
+    parser.add_argument("--on-time", type=float, default=5, help="допустимое опоздание доставки, с")
+    parser.add_argument("--tg-rate", type=int, default=1000, help="лимит сообщений в секунду поддельного Telegram")
+    parser.add_argument("--tg-chat-interval", type=float, default=0, help="лимит на один чат, с")
+    parser.add_argument("--tg-latency-ms", type=float, default=20, help="задержка ответа Telegram, мс")
+    parser.add_argument("--poll-delay", type=float, default=0.5, help="период опроса очереди воркером, с")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
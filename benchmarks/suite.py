@@ -0,0 +1,305 @@
+"""Набор микробенчмарков горячих путей с отчетом JSON и сравнением с базовым отчетом.
+
+Измеряются:
+
+- parse: analyze_reminder_handlers и analyze_reminder_db на корпусе фраз
+  с пустым кэшем разбора перед каждым вызовом;
+- db: функции db_func для создания, чтения, изменения и удаления напоминаний
+  на локальном PostgreSQL (без кэша списков в Redis);
+- render: текст и клавиатура страницы списка напоминаний из 1–10 000 строк;
+- enqueue: enqueue_job отложенной задачи send_reminder в локальный Redis.
+
+Группы, которым недоступна база данных или Redis, попадают в отчет как
+пропущенные с причиной. Параметры подключения берутся из .env, как у бота.
+
+Запуск:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --only parse,render --compare bench.json --threshold 0.2
+
+В режиме сравнения для каждого случая выводится изменение медианы времени
+вызова, а код выхода равен 1, если хотя бы один случай стал медленнее порога.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import psycopg
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.constants import job_key_prefix
+from psycopg_pool import PoolTimeout
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from benchmarks.corpus import PHRASES
+from bot.db.db_func import (delete_reminder, get_all_reminders, get_reminders_page, get_user,
+                            set_info_remind, update_reminder)
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.handlers.user_handlers import render_reminder_page
+from bot.keyboards.user_keyboards import get_page_kb
+from bot.other_func.reminder_analysis import (analyze_reminder_db, analyze_reminder_handlers,
+                                               format_reminder, parse_cache)
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer, new_job_id, reminder_job_kwargs
+
+# Ошибки, означающие, что PostgreSQL или Redis не запущены
+UNAVAILABLE = (OSError, psycopg.OperationalError, PoolTimeout, RedisConnectionError)
+
+GROUPS = ("parse", "db", "render", "enqueue")
+RENDER_SIZES = (1, 10, 100, 1000, 10000)
+FIRST_USER_ID = 910_000_000
+BENCH_QUEUE = "arq:bench"
+
+
+def make_message(user_id: int, text: str = "") -> SimpleNamespace:
+    """Создать минимальное подобие types.Message для функций бота."""
+    return SimpleNamespace(text=text, from_user=SimpleNamespace(id=user_id, username=f"bench_{user_id}"))
+
+
+def summarize(samples_ns: List[int]) -> Dict[str, float]:
+    """Свести времена вызовов к статистикам отчета в микросекундах."""
+    samples = sorted(samples_ns)
+    mean = statistics.fmean(samples) / 1000
+    return {
+        "calls": len(samples),
+        "median_us": round(statistics.median(samples) / 1000, 3),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0] / 1000, 3),
+        "mean_us": round(mean, 3),
+        "ops_per_s": round(1e6 / mean, 1) if mean else 0.0,
+    }
+
+
+async def measure(call: Callable[[int], Awaitable[Any]], min_time: float, max_calls: Optional[int] = None,
+                  setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Вызывать корутину, пока не пройдет min_time секунд, и вернуть статистики.
+
+    Аргументы:
+        call (Callable): Функция номера вызова, возвращающая корутину.
+        min_time (float): Минимальное суммарное время измерения в секундах.
+        max_calls (int, optional): Максимальное количество вызовов.
+        setup (Callable, optional): Подготовка перед каждым вызовом, не входит в измерение.
+
+    Возвращает:
+        dict: Статистики времени вызова.
+    """
+    samples: List[int] = []
+    deadline = time.perf_counter() + min_time
+    n = 0
+    while (time.perf_counter() < deadline or n < 10) and (max_calls is None or n < max_calls):
+        if setup is not None:
+            setup()
+        started = time.perf_counter_ns()
+        await call(n)
+        samples.append(time.perf_counter_ns() - started)
+        n += 1
+    return summarize(samples)
+
+
+async def bench_parse(min_time: float) -> Dict[str, Dict[str, float]]:
+    """Разбор фраз корпуса обоими анализаторами без кэша результатов."""
+    messages = [make_message(1, phrase) for phrase in PHRASES]
+    return {
+        "parse.analyze_reminder_handlers": await measure(
+            lambda n: analyze_reminder_handlers(messages[n % len(PHRASES)]), min_time, setup=parse_cache.clear),
+        "parse.analyze_reminder_db": await measure(
+            lambda n: analyze_reminder_db(messages[n % len(PHRASES)]), min_time, setup=parse_cache.clear),
+    }
+
+
+async def bench_db(min_time: float) -> Dict[str, Dict[str, float]]:
+    """Функции db_func на одном пользователе с 50 напоминаниями."""
+    await db_pool.open()
+    await apply_migrations()
+    user_id = FIRST_USER_ID
+    message = make_message(user_id)
+    parsed = format_reminder("Проверить бенчмарк", datetime.now().replace(microsecond=0) + timedelta(days=1))
+    results = {}
+    try:
+        await cleanup()
+        results["db.get_user"] = await measure(
+            lambda n: get_user(make_message(FIRST_USER_ID + 1 + n)), min_time, max_calls=10000)
+        await get_user(message)
+        for _ in range(50):
+            await set_info_remind(message=message, parsed=parsed)
+
+        results["db.set_info_remind"] = await measure(
+            lambda n: set_info_remind(message=message, parsed=parsed), min_time, max_calls=10000)
+        results["db.get_all_reminders"] = await measure(lambda n: get_all_reminders(message), min_time)
+        results["db.get_reminders_page"] = await measure(lambda n: get_reminders_page(user_id, 10), min_time)
+
+        async with db_pool.cursor() as cursor:
+            await cursor.execute("""SELECT id FROM main_schedule WHERE fk_user_id = %s ORDER BY id""", (user_id,))
+            ids = [row[0] for row in await cursor.fetchall()]
+        results["db.update_reminder"] = await measure(
+            lambda n: update_reminder(ids[n % len(ids)], f"Новый текст {n}", parsed.from_date, user_id),
+            min_time)
+        results["db.delete_reminder"] = await measure(
+            lambda n: delete_reminder(message, ids[n]), min_time, max_calls=len(ids))
+    finally:
+        await cleanup()
+        await db_pool.close()
+    return results
+
+
+async def cleanup() -> None:
+    """Удалить пользователей бенчмарка вместе с их напоминаниями."""
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""DELETE FROM main_users WHERE tg_id >= %s AND tg_id < %s""",
+                             (FIRST_USER_ID, FIRST_USER_ID + 100_000))
+
+
+async def bench_render(min_time: float) -> Dict[str, Dict[str, float]]:
+    """Текст и клавиатура страницы списка напоминаний разного размера."""
+    when = datetime(2030, 1, 1, 10, 0)
+    results = {}
+    for size in RENDER_SIZES:
+        page = [{"id": i, "text": f"Напоминание номер {i}", "datetime": when + timedelta(minutes=i)}
+                for i in range(size)]
+
+        async def render(n: int, page: list = page) -> None:
+            render_reminder_page(page, 1, FIRST_USER_ID)
+            get_page_kb(page, 1, True, True)
+
+        results[f"render.list_{size}"] = await measure(render, min_time)
+    return results
+
+
+async def bench_enqueue(min_time: float) -> Dict[str, Dict[str, float]]:
+    """Постановка отложенной задачи доставки в отдельную очередь Redis."""
+    redis = await create_pool(RedisSettings(conn_retries=0), job_serializer=job_serializer,
+                              job_deserializer=job_deserializer)
+    job_ids: List[str] = []
+    defer_until = datetime.now() + timedelta(days=1)
+
+    async def enqueue(n: int) -> None:
+        job_id = new_job_id()
+        job_ids.append(job_id)
+        await redis.enqueue_job("send_reminder", _job_id=job_id, _defer_until=defer_until,
+                                _queue_name=BENCH_QUEUE, **reminder_job_kwargs(n))
+
+    try:
+        return {"enqueue.send_reminder": await measure(enqueue, min_time)}
+    finally:
+        for start in range(0, len(job_ids), 1000):
+            await redis.delete(*(job_key_prefix + job_id for job_id in job_ids[start:start + 1000]))
+        await redis.delete(BENCH_QUEUE)
+        await redis.close()
+
+
+BENCHES: Dict[str, Callable[[float], Awaitable[Dict[str, Dict[str, float]]]]] = {
+    "parse": bench_parse,
+    "db": bench_db,
+    "render": bench_render,
+    "enqueue": bench_enqueue,
+}
+
+
+def git_revision() -> Optional[str]:
+    """Текущий коммит репозитория, если он доступен."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(groups: List[str], min_time: float) -> Dict[str, Any]:
+    """Прогнать выбранные группы и собрать отчет."""
+    report: Dict[str, Any] = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "min_time": min_time,
+        "results": {},
+        "skipped": {},
+    }
+    for group in groups:
+        try:
+            report["results"].update(await BENCHES[group](min_time))
+        except UNAVAILABLE as e:
+            report["skipped"][group] = f"{type(e).__name__}: {e}"
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Сравнить медианы с базовым отчетом и вывести таблицу.
+
+    Аргументы:
+        report (dict): Текущий отчет.
+        baseline (dict): Базовый отчет.
+        threshold (float): Допустимое относительное замедление, например 0.2 для 20%.
+
+    Возвращает:
+        list: Имена случаев, замедлившихся больше порога.
+    """
+    regressions = []
+    print(f"{'case':40} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:40} {'-':>12} {current['median_us']:12.3f} {'new':>8}")
+            continue
+        change = current["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        print(f"{name:40} {base['median_us']:12.3f} {current['median_us']:12.3f} {change:+8.1%}{mark}")
+    for name in sorted(baseline.get("results", {}).keys() - report["results"].keys()):
+        print(f"{name:40} {baseline['results'][name]['median_us']:12.3f} {'-':>12} {'missing':>8}")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Вывести отчет в виде таблицы."""
+    print(f"{'case':40} {'calls':>8} {'median us':>12} {'p95 us':>12} {'ops/s':>12}")
+    for name, result in report["results"].items():
+        print(f"{name:40} {result['calls']:8d} {result['median_us']:12.3f} {result['p95_us']:12.3f} "
+              f"{result['ops_per_s']:12.1f}")
+    for group, reason in report["skipped"].items():
+        print(f"{group:40} skipped: {reason}")
+
+
+def main() -> int:
+    """Разобрать аргументы командной строки, прогнать бенчмарки и вернуть код выхода."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=",".join(GROUPS),
+                        help=f"группы через запятую из {', '.join(GROUPS)}")
+    parser.add_argument("--min-time", type=float, default=0.5, help="минимальное время измерения случая, с")
+    parser.add_argument("--output", help="куда сохранить отчет JSON")
+    parser.add_argument("--compare", help="базовый отчет JSON для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление медианы")
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"неизвестные группы: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(groups, args.min_time))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
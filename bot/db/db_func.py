@@ -1,52 +1,75 @@
-import asyncio
-from datetime import datetime
-from typing import List, Dict, Optional
+import os
+from datetime import datetime, timedelta
+from typing import Any, List, Dict, Optional, Tuple
 
 from aiogram import types
+from arq import ArqRedis
+from dotenv import load_dotenv
 
-from bot.db.db_tables import connection
-from bot.other_func.reminder_analysis import analyze_reminder_db
+from bot.db.db_pool import db_pool
+from bot.db.reminder_cache import reminder_cache
+from bot.db.user_cache import known_users
+from bot.other_func.metrics import DB_SECONDS, timed
+from bot.other_func.reminder_analysis import ReminderParse, analyze_reminder_handlers
+from bot.other_func.recurrence import next_occurrence
+from bot.other_func.reminder_jobs import add_enqueue, cancel_job, new_job_id, reminder_job_kwargs, reschedule_job
 from bot.logging.logger import logger
 
+load_dotenv('.env')
+
+# Напоминания, срок которых прошел больше этого времени назад, просрочены: списки их не показывают,
+# а строки удаляются вместе с месячной секцией main_schedule (bot.db.partitions)
+EXPIRY_GRACE = timedelta(seconds=float(os.getenv("EXPIRY_GRACE", 3600)))
+
+
+def expiry_cutoff() -> datetime:
+    """Момент, раньше которого однократные напоминания считаются просроченными."""
+    return datetime.now() - EXPIRY_GRACE
+
+# Напоминание с номером N в списке пользователя: те же фильтр и порядок (reminder_datetime, id),
+# что у get_all_reminders и get_reminders_page. Параметры: ID пользователя, expiry_cutoff() и N - 1
+NTH_REMINDER = """SELECT id, reminder_datetime, job_id FROM main_schedule
+                  WHERE fk_user_id = %s AND (reminder_datetime >= %s OR recurrence IS NOT NULL)
+                  ORDER BY reminder_datetime, id OFFSET %s LIMIT 1 FOR UPDATE"""
+
+async def _register_user(cursor, user: types.User) -> None:
+    """Добавить пользователя в main_users или обновить его имя, если оно изменилось.
+
+    Аргументы:
+        cursor: Курсор открытой транзакции.
+        user (types.User): Пользователь Telegram.
+    """
+    await cursor.execute(
+        """INSERT INTO main_users (tg_id, tg_username) VALUES (%s, %s)
+           ON CONFLICT (tg_id) DO UPDATE SET tg_username = EXCLUDED.tg_username
+           WHERE main_users.tg_username IS DISTINCT FROM EXCLUDED.tg_username""",
+        (user.id, user.username)
+    )
+
+
+@timed(DB_SECONDS)
 async def get_user(message: types.Message) -> None:
     """Добавить пользователя в базу данных, если его еще нет.
 
+    Пользователь, уже сохраненный с тем же именем, находится в known_users,
+    и запрос к базе данных не выполняется.
+
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
     """
+    user = message.from_user
+    if known_users.is_known(user.id, user.username):
+        return
+
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """INSERT INTO main_users (tg_id, tg_username) VALUES (%s, %s)""",
-                (message.from_user.id, message.from_user.username)
-            )
+        async with db_pool.cursor() as cursor:
+            await _register_user(cursor, user)
+        known_users.add(user.id, user.username)
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in get_user: {ex}')
-
-
-async def delete_expired_rows() -> None:
-    """Удалять просроченные напоминания из базы данных каждую минуту."""
-    while True:
-        try:
-            with connection.cursor() as cursor:
-                now = datetime.now()
-                cursor.execute(
-                    """SELECT * FROM main_schedule WHERE reminder_datetime < %s""",
-                    (now,)
-                )
-                rows = cursor.fetchall()
-
-                for row in rows:
-                    print(f"Deleting row with id {row[0]} and time {row[2]}")
-                    cursor.execute(
-                        """DELETE FROM main_schedule WHERE id = %s""",
-                        (row[0],)
-                    )
-            await asyncio.sleep(60)
-        except Exception as ex:
-            logger.log('error', f'PostgresSQL ERROR in delete_expired_rows: {ex}')
+        logger.log('error', 'PostgresSQL ERROR in get_user: %s', ex)
 
 
+@timed(DB_SECONDS)
 async def get_all_remind(message: types.Message) -> List[str]:
     """Получить все напоминания пользователя.
 
@@ -54,50 +77,61 @@ async def get_all_remind(message: types.Message) -> List[str]:
         message (types.Message): Входящее сообщение от пользователя.
 
     Возвращает:
-        list: Список текстов напоминаний.
+        list: Список текстов напоминаний, упорядоченный по времени.
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """SELECT reminder_text FROM main_schedule WHERE fk_user_id = %s""",
-                (message.from_user.id,)
+        async with db_pool.cursor() as cursor:
+            await cursor.execute(
+                """SELECT reminder_text FROM main_schedule
+                   WHERE fk_user_id = %s AND (reminder_datetime >= %s OR recurrence IS NOT NULL)
+                   ORDER BY reminder_datetime, id""",
+                (message.from_user.id, expiry_cutoff())
             )
-            reminders = cursor.fetchall()
+            reminders = await cursor.fetchall()
             reminders = [reminder[0] for reminder in reminders]
             return reminders
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in get_all_remind: {ex}')
+        logger.log('error', 'PostgresSQL ERROR in get_all_remind: %s', ex)
         return []
 
 
-async def delete_reminder(message: types.Message, reminder_id: int) -> str:
+@timed(DB_SECONDS)
+async def delete_reminder(message: types.Message, reminder_id: int, redis_pool: Optional[ArqRedis] = None) -> str:
     """Удалить напоминание по его ID.
 
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
         reminder_id (int): ID напоминания для удаления.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан,
+            задача доставки напоминания удаляется из очереди.
 
     Возвращает:
         str: Результат операции удаления.
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """DELETE FROM main_schedule WHERE id = %s AND fk_user_id = %s""",
+        async with db_pool.cursor() as cursor:
+            await cursor.execute(
+                """DELETE FROM main_schedule WHERE id = %s AND fk_user_id = %s RETURNING job_id""",
                 (reminder_id, message.from_user.id)
             )
+            row = await cursor.fetchone()
 
-            if cursor.rowcount > 0:
-                connection.commit()
-                return "Напоминание успешно удалено."
-            else:
+            if row is None:
                 return "Напоминание не найдено или вы не имеете права его удалять."
+
+            if redis_pool is not None:
+                await cancel_job(redis_pool, row[0])
+
+        await reminder_cache.invalidate(message.from_user.id)
+        return "Напоминание успешно удалено."
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in delete_reminder: {ex}')
+        logger.log('error', 'PostgresSQL ERROR in delete_reminder: %s', ex)
         return "Произошла ошибка при удалении напоминания."
 
 
-async def update_reminder(reminder_id: int, new_text: str, new_date: datetime, user_id: int) -> str:
+@timed(DB_SECONDS)
+async def update_reminder(reminder_id: int, new_text: str, new_date: datetime, user_id: int,
+                          redis_pool: Optional[ArqRedis] = None) -> str:
     """Обновить существующее напоминание.
 
     Аргументы:
@@ -105,46 +139,346 @@ async def update_reminder(reminder_id: int, new_text: str, new_date: datetime, u
         new_text (str): Новый текст напоминания.
         new_date (datetime): Новая дата и время напоминания.
         user_id (int): ID пользователя, которому принадлежит напоминание.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан, задача
+            доставки заменяется новой в той же транзакции, что и строка напоминания.
 
     Возвращает:
         str: Результат операции обновления.
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """UPDATE main_schedule SET reminder_text = %s, reminder_datetime = %s 
-                   WHERE id = %s AND fk_user_id = %s""",
-                (new_text, new_date, reminder_id, user_id)
+        async with db_pool.cursor() as cursor:
+            await cursor.execute(
+                """SELECT job_id FROM main_schedule WHERE id = %s AND fk_user_id = %s FOR UPDATE""",
+                (reminder_id, user_id)
             )
+            row = await cursor.fetchone()
 
-            if cursor.rowcount > 0:
-                connection.commit()
-                return "Напоминание успешно обновлено!"
-            else:
+            if row is None:
                 return "Не удалось обновить напоминание. Пожалуйста, проверьте ID."
+
+            old_job_id = row[0]
+            job_id = new_job_id() if redis_pool is not None else old_job_id
+            await cursor.execute(
+                """UPDATE main_schedule SET reminder_text = %s, reminder_datetime = %s, job_id = %s
+                   WHERE id = %s AND fk_user_id = %s""",
+                (new_text, new_date, job_id, reminder_id, user_id)
+            )
+
+            # Транзакция откатится, если Redis не примет новую задачу
+            if redis_pool is not None:
+                await reschedule_job(redis_pool, old_job_id, job_id, new_date, reminder_id)
+
+        await reminder_cache.invalidate(user_id)
+        return "Напоминание успешно обновлено!"
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in update_reminder: {ex}')
+        logger.log('error', 'PostgresSQL ERROR in update_reminder: %s', ex)
         return "Произошла ошибка при обновлении напоминания."
 
 
-async def set_info_remind(message: types.Message) -> None:
+@timed(DB_SECONDS)
+async def delete_reminder_at(user_id: int, number: int,
+                             redis_pool: Optional[ArqRedis] = None) -> Optional[Dict[str, Any]]:
+    """Удалить напоминание по его номеру в списке пользователя.
+
+    Номер переводится в строку и строка удаляется одним запросом, поэтому номер
+    соответствует списку напоминаний без отдельного чтения списка.
+
+    Аргументы:
+        user_id (int): ID пользователя.
+        number (int): Номер напоминания в списке, начиная с 1.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан,
+            задача доставки напоминания удаляется из очереди.
+
+    Возвращает:
+        dict | None: ID, текст, время и правило повтора удаленного напоминания
+                     или None, если напоминания с таким номером нет.
+
+    Исключения:
+        Exception: Ошибки базы данных и Redis передаются вызывающему.
+    """
+    if number < 1:
+        return None
+
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            f"""WITH target AS ({NTH_REMINDER})
+                DELETE FROM main_schedule USING target
+                WHERE main_schedule.id = target.id AND main_schedule.reminder_datetime = target.reminder_datetime
+                RETURNING main_schedule.id, main_schedule.reminder_text, main_schedule.reminder_datetime,
+                          main_schedule.recurrence, main_schedule.job_id""",
+            (user_id, expiry_cutoff(), number - 1)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+
+        if redis_pool is not None:
+            await cancel_job(redis_pool, row[4])
+
+    await reminder_cache.invalidate(user_id)
+    return {"id": row[0], "text": row[1], "datetime": row[2], "recurrence": row[3]}
+
+
+@timed(DB_SECONDS)
+async def update_reminder_at(user_id: int, number: int, new_text: str, new_date: datetime,
+                             redis_pool: Optional[ArqRedis] = None) -> Optional[Dict[str, Any]]:
+    """Обновить напоминание по его номеру в списке пользователя.
+
+    Номер переводится в строку и строка обновляется одним запросом, который
+    возвращает прежний ID задачи доставки для ее замены.
+
+    Аргументы:
+        user_id (int): ID пользователя.
+        number (int): Номер напоминания в списке, начиная с 1.
+        new_text (str): Новый текст напоминания.
+        new_date (datetime): Новая дата и время напоминания.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан, задача
+            доставки заменяется новой в той же транзакции, что и строка напоминания.
+
+    Возвращает:
+        dict | None: ID, текст, время и правило повтора обновленного напоминания
+                     или None, если напоминания с таким номером нет.
+
+    Исключения:
+        Exception: Ошибки базы данных и Redis передаются вызывающему.
+    """
+    if number < 1:
+        return None
+
+    job_id = new_job_id() if redis_pool is not None else None
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            f"""WITH target AS ({NTH_REMINDER})
+                UPDATE main_schedule
+                SET reminder_text = %s, reminder_datetime = %s, job_id = COALESCE(%s::varchar, target.job_id)
+                FROM target
+                WHERE main_schedule.id = target.id AND main_schedule.reminder_datetime = target.reminder_datetime
+                RETURNING main_schedule.id, main_schedule.recurrence, target.job_id""",
+            (user_id, expiry_cutoff(), number - 1, new_text, new_date, job_id)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+
+        # Транзакция откатится, если Redis не примет новую задачу
+        if redis_pool is not None:
+            await reschedule_job(redis_pool, row[2], job_id, new_date, row[0])
+
+    await reminder_cache.invalidate(user_id)
+    return {"id": row[0], "text": new_text, "datetime": new_date, "recurrence": row[1]}
+
+
+@timed(DB_SECONDS)
+async def set_info_remind(message: types.Message, parsed: Optional[ReminderParse] = None,
+                          redis_pool: Optional[ArqRedis] = None) -> Optional[int]:
     """Сохранить новое напоминание в базе данных.
 
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
+        parsed (ReminderParse, optional): Уже полученный результат разбора сообщения.
+            Если не передан, сообщение будет разобрано заново.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан, задача
+            доставки с ID напоминания ставится в очередь в той же транзакции, что и строка.
+
+    Возвращает:
+        int: ID нового напоминания или None при ошибке.
     """
+    user = message.from_user
     try:
-        text_remind, from_date = await analyze_reminder_db(message=message)
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id) 
-                   VALUES (%s, %s, %s)""",
-                (text_remind, from_date, message.from_user.id)
+        if parsed is None:
+            parsed = await analyze_reminder_handlers(message=message)
+        job_id = new_job_id() if redis_pool is not None else None
+        register = not known_users.is_known(user.id, user.username)
+        async with db_pool.cursor() as cursor:
+            # Пользователь, не нажимавший /start, регистрируется в той же транзакции
+            if register:
+                await _register_user(cursor, user)
+            await cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id, recurrence) 
+                   VALUES (%s, %s, %s, %s, %s) RETURNING id""",
+                (parsed.text, parsed.from_date, message.from_user.id, job_id, parsed.recurrence)
             )
+            reminder_id = (await cursor.fetchone())[0]
+
+            # Транзакция откатится, если Redis не примет задачу
+            if redis_pool is not None:
+                await redis_pool.enqueue_job("send_reminder", _job_id=job_id, _defer_until=parsed.from_date,
+                                             **reminder_job_kwargs(reminder_id))
+        if register:
+            known_users.add(user.id, user.username)
+        await reminder_cache.invalidate(user.id)
+        return reminder_id
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in set_info_remind: {ex}')
+        # Пользователь мог быть удален из базы после попадания в кэш: следующая попытка зарегистрирует его
+        known_users.discard(user.id)
+        logger.log('error', 'PostgresSQL ERROR in set_info_remind: %s', ex)
+        return None
+
 
+@timed(DB_SECONDS)
+async def set_info_reminds(user_id: int, reminders: List[ReminderParse],
+                           redis_pool: Optional[ArqRedis] = None, user: Optional[types.User] = None) -> List[int]:
+    """Сохранить несколько напоминаний пользователя одной транзакцией.
 
+    Строки добавляются одним многострочным INSERT, а задачи доставки ставятся
+    одним pipeline Redis внутри той же транзакции: если Redis не примет задачи,
+    не сохранится ни одно напоминание.
+
+    Аргументы:
+        user_id (int): ID пользователя Telegram.
+        reminders (list): Результаты разбора напоминаний.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан,
+            для каждого напоминания ставится задача доставки с его ID.
+        user (types.User, optional): Пользователь Telegram. Если передан и его нет
+            в known_users, он регистрируется в той же транзакции.
+
+    Возвращает:
+        list: ID новых напоминаний в порядке reminders.
+
+    Исключения:
+        Exception: Ошибки базы данных и Redis передаются вызывающему.
+    """
+    if not reminders:
+        return []
+
+    job_ids = [new_job_id() if redis_pool is not None else None for _ in reminders]
+    register = user is not None and not known_users.is_known(user.id, user.username)
+    async with db_pool.cursor() as cursor:
+        if register:
+            await _register_user(cursor, user)
+        await cursor.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id, recurrence)
+               SELECT text, datetime, %s, job_id, recurrence
+               FROM unnest(%s::text[], %s::timestamp[], %s::varchar[], %s::varchar[])
+                    WITH ORDINALITY AS new(text, datetime, job_id, recurrence, n)
+               ORDER BY n
+               RETURNING id, job_id""",
+            (user_id, [parsed.text for parsed in reminders], [parsed.from_date for parsed in reminders], job_ids,
+             [parsed.recurrence for parsed in reminders])
+        )
+        rows = await cursor.fetchall()
+        if redis_pool is not None:
+            inserted = {job_id: reminder_id for reminder_id, job_id in rows}
+            reminder_ids = [inserted[job_id] for job_id in job_ids]
+        else:
+            # Без ID задач порядок восстанавливается по id: строки получают их в порядке ORDER BY n
+            reminder_ids = sorted(reminder_id for reminder_id, _ in rows)
+
+        # Транзакция откатится, если Redis не примет задачи
+        if redis_pool is not None:
+            async with redis_pool.pipeline(transaction=True) as pipe:
+                for reminder_id, job_id, parsed in zip(reminder_ids, job_ids, reminders):
+                    add_enqueue(pipe, redis_pool, job_id, parsed.from_date, reminder_id)
+                await pipe.execute()
+
+    if register:
+        known_users.add(user.id, user.username)
+    await reminder_cache.invalidate(user_id)
+    return reminder_ids
+
+
+@timed(DB_SECONDS)
+async def load_reminder(reminder_id: int, job_id: Optional[str]) -> Optional[Tuple[int, str, Optional[str]]]:
+    """Загрузить напоминание для доставки, не меняя его.
+
+    Строка возвращается, только если она все еще связана с задачей job_id:
+    после редактирования напоминания старая задача ничего не найдет.
+
+    Аргументы:
+        reminder_id (int): ID напоминания.
+        job_id (str, optional): ID задачи arq, доставляющей напоминание.
+
+    Возвращает:
+        tuple: ID чата, текст напоминания и правило повтора или None, если напоминания уже нет.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT fk_user_id, reminder_text, recurrence FROM main_schedule WHERE id = %s AND job_id = %s""",
+            (reminder_id, job_id)
+        )
+        return await cursor.fetchone()
+
+
+@timed(DB_SECONDS)
+async def complete_reminder(reminder_id: int, job_id: Optional[str],
+                            redis_pool: Optional[ArqRedis] = None, when: Optional[datetime] = None) -> bool:
+    """Завершить доставку напоминания.
+
+    Однократное напоминание удаляется из базы данных, а повторяющееся переносится
+    на следующее повторение с новой задачей доставки: в очереди и в таблице у него
+    всегда одна задача и одна строка. Вызывается после отправки, поэтому неудачная
+    отправка или падение воркера не теряют напоминание. Строка меняется, только
+    если она все еще связана с задачей job_id, а при переданном when — только
+    если срок напоминания не изменился.
+
+    Аргументы:
+        reminder_id (int): ID напоминания.
+        job_id (str, optional): ID задачи arq, доставляющей напоминание, None для
+            напоминаний без задачи, которые доставляет колесо таймеров.
+        redis_pool (ArqRedis, optional): Пул соединений Redis. Если передан, задача
+            следующего повторения ставится в очередь в той же транзакции, что и перенос.
+        when (datetime, optional): Время сработавшего напоминания.
+
+    Возвращает:
+        bool: True, если строка удалена или перенесена.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """DELETE FROM main_schedule
+               WHERE id = %s AND job_id IS NOT DISTINCT FROM %s AND recurrence IS NULL
+                 AND (%s::timestamp IS NULL OR reminder_datetime = %s)
+               RETURNING fk_user_id""",
+            (reminder_id, job_id, when, when)
+        )
+        row = await cursor.fetchone()
+        user_id = row[0] if row is not None else await _advance_recurring(cursor, reminder_id, job_id,
+                                                                          redis_pool, when)
+
+    if user_id is not None:
+        await reminder_cache.invalidate(user_id)
+    return user_id is not None
+
+
+async def _advance_recurring(cursor, reminder_id: int, job_id: Optional[str],
+                             redis_pool: Optional[ArqRedis], when: Optional[datetime] = None) -> Optional[int]:
+    """Перенести повторяющееся напоминание на следующее повторение.
+
+    Аргументы:
+        cursor: Курсор открытой транзакции.
+        reminder_id (int): ID напоминания.
+        job_id (str, optional): ID задачи arq, доставляющей напоминание.
+        redis_pool (ArqRedis, optional): Пул соединений Redis для задачи следующего повторения.
+        when (datetime, optional): Время сработавшего повторения.
+
+    Возвращает:
+        int: ID чата или None, если повторяющегося напоминания с этой задачей нет.
+    """
+    await cursor.execute(
+        """SELECT fk_user_id, reminder_datetime, recurrence FROM main_schedule
+           WHERE id = %s AND job_id IS NOT DISTINCT FROM %s AND recurrence IS NOT NULL
+             AND (%s::timestamp IS NULL OR reminder_datetime = %s)
+           FOR UPDATE""",
+        (reminder_id, job_id, when, when)
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+
+    user_id, previous, rule = row
+    next_when = next_occurrence(rule, previous)
+    next_job_id = new_job_id() if redis_pool is not None else None
+    await cursor.execute(
+        """UPDATE main_schedule SET reminder_datetime = %s, job_id = %s WHERE id = %s""",
+        (next_when, next_job_id, reminder_id)
+    )
+    # Транзакция откатится, если Redis не примет задачу
+    if redis_pool is not None:
+        await redis_pool.enqueue_job("send_reminder", _job_id=next_job_id, _defer_until=next_when,
+                                     **reminder_job_kwargs(reminder_id))
+    return user_id
+
+
+@timed(DB_SECONDS)
 async def get_all_reminders(message: types.Message) -> List[Dict[str, Optional[str]]]:
     """Получить все напоминания пользователя с их ID, текстом и временем.
 
@@ -152,27 +486,102 @@ async def get_all_reminders(message: types.Message) -> List[Dict[str, Optional[s
         message (types.Message): Входящее сообщение от пользователя.
 
     Возвращает:
-        list: Список словарей с информацией о напоминаниях.
+        list: Список словарей с информацией о напоминаниях, упорядоченный по времени.
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """SELECT id, reminder_text, reminder_datetime 
+        async with db_pool.cursor() as cursor:
+            await cursor.execute(
+                """SELECT id, reminder_text, reminder_datetime, recurrence
                    FROM main_schedule 
-                   WHERE fk_user_id = %s""",
-                (message.from_user.id,)
+                   WHERE fk_user_id = %s AND (reminder_datetime >= %s OR recurrence IS NOT NULL)
+                   ORDER BY reminder_datetime, id""",
+                (message.from_user.id, expiry_cutoff())
             )
-            reminders = cursor.fetchall()
+            reminders = await cursor.fetchall()
 
             reminders_list = [
                 {
                     "id": reminder[0],
                     "text": reminder[1],
-                    "datetime": reminder[2]
+                    "datetime": reminder[2],
+                    "recurrence": reminder[3]
                 }
                 for reminder in reminders
             ]
             return reminders_list
     except Exception as ex:
-        logger.log('error', f'PostgresSQL ERROR in get_all_reminders: {ex}')
-        return []
\ No newline at end of file
+        logger.log('error', 'PostgresSQL ERROR in get_all_reminders: %s', ex)
+        return []
+
+@timed(DB_SECONDS)
+async def get_reminders_page(user_id: int, page_size: int, cursor: Optional[Tuple[datetime, int]] = None,
+                             backward: bool = False) -> Tuple[List[Dict[str, Optional[str]]], bool]:
+    """Получить одну страницу напоминаний пользователя.
+
+    Страницы выбираются по ключу (reminder_datetime, id) относительно крайнего
+    напоминания соседней страницы, поэтому стоимость запроса не зависит от номера
+    страницы и количества напоминаний пользователя. Первая страница, которую
+    открывает кнопка списка, берется из кэша, если он подключен, а страница
+    с уже просроченными напоминаниями читается из базы данных заново.
+
+    Аргументы:
+        user_id (int): ID пользователя.
+        page_size (int): Количество напоминаний на странице.
+        cursor (tuple, optional): Время и ID крайнего напоминания соседней страницы.
+            Если не передан, возвращается первая страница.
+        backward (bool): Выбрать страницу перед cursor, а не после него.
+
+    Возвращает:
+        tuple: Список словарей с информацией о напоминаниях, упорядоченный по времени,
+               и признак того, что в выбранном направлении есть еще напоминания.
+    """
+    generation = None
+    if cursor is None and reminder_cache.is_enabled:
+        try:
+            generation, cached = await reminder_cache.get(user_id, page_size)
+            cutoff = expiry_cutoff()
+            fresh = cached is not None and all(reminder["datetime"] >= cutoff or reminder["recurrence"]
+                                               for reminder in cached[0])
+            reminder_cache.record(hit=fresh)
+            if fresh:
+                return cached
+        except Exception as ex:
+            logger.log('error', 'Redis ERROR in get_reminders_page: %s', ex)
+
+    visible = """(reminder_datetime >= %s OR recurrence IS NOT NULL)"""
+    if cursor is None:
+        query = f"""SELECT id, reminder_text, reminder_datetime, recurrence FROM main_schedule
+                    WHERE fk_user_id = %s AND {visible}
+                    ORDER BY reminder_datetime, id LIMIT %s"""
+        params = (user_id, expiry_cutoff(), page_size + 1)
+    elif backward:
+        query = f"""SELECT id, reminder_text, reminder_datetime, recurrence FROM main_schedule
+                    WHERE fk_user_id = %s AND {visible} AND (reminder_datetime, id) < (%s, %s)
+                    ORDER BY reminder_datetime DESC, id DESC LIMIT %s"""
+        params = (user_id, expiry_cutoff(), *cursor, page_size + 1)
+    else:
+        query = f"""SELECT id, reminder_text, reminder_datetime, recurrence FROM main_schedule
+                    WHERE fk_user_id = %s AND {visible} AND (reminder_datetime, id) > (%s, %s)
+                    ORDER BY reminder_datetime, id LIMIT %s"""
+        params = (user_id, expiry_cutoff(), *cursor, page_size + 1)
+
+    try:
+        async with db_pool.cursor() as db_cursor:
+            await db_cursor.execute(query, params)
+            rows = await db_cursor.fetchall()
+    except Exception as ex:
+        logger.log('error', 'PostgresSQL ERROR in get_reminders_page: %s', ex)
+        return [], False
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backward:
+        rows.reverse()
+
+    reminders = [{"id": row[0], "text": row[1], "datetime": row[2], "recurrence": row[3]} for row in rows]
+    if generation is not None:
+        try:
+            await reminder_cache.put(user_id, page_size, generation, reminders, has_more)
+        except Exception as ex:
+            logger.log('error', 'Redis ERROR in get_reminders_page: %s', ex)
+    return reminders, has_more
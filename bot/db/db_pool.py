@@ -0,0 +1,146 @@
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg_pool import AsyncConnectionPool
+
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+
+class DatabasePool:
+    """Ограниченный асинхронный пул соединений с PostgreSQL.
+
+    Соединения выдаются корутинам по требованию, поэтому медленный запрос одного
+    пользователя больше не блокирует цикл событий для остальных.
+
+    Атрибуты:
+        min_size (int): Минимальное количество открытых соединений.
+        max_size (int): Максимальное количество открытых соединений.
+        acquire_timeout (float): Время ожидания свободного соединения в секундах.
+        query_timeout (float): Максимальное время выполнения одного запроса в секундах.
+    """
+
+    def __init__(self, min_size: int, max_size: int, acquire_timeout: float, query_timeout: float) -> None:
+        """Инициализировать DatabasePool.
+
+        Аргументы:
+            min_size (int): Минимальное количество открытых соединений.
+            max_size (int): Максимальное количество открытых соединений.
+            acquire_timeout (float): Время ожидания свободного соединения в секундах.
+            query_timeout (float): Максимальное время выполнения одного запроса в секундах.
+        """
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.acquire_timeout = acquire_timeout
+        self.query_timeout = query_timeout
+        self._pool: Optional[AsyncConnectionPool] = None
+
+    def _connection_kwargs(self) -> dict:
+        """Собрать параметры подключения из переменных окружения.
+
+        Возвращает:
+            dict: Параметры для psycopg.AsyncConnection.connect.
+        """
+        return {
+            "host": os.getenv("host"),
+            "user": os.getenv("user"),
+            "password": os.getenv("password"),
+            "dbname": os.getenv("db_name"),
+            "port": os.getenv("port"),
+            # Ограничение времени выполнения каждого запроса на стороне сервера
+            "options": f"-c statement_timeout={int(self.query_timeout * 1000)}",
+        }
+
+    @property
+    def is_open(self) -> bool:
+        """Открыт ли пул соединений."""
+        return self._pool is not None
+
+    async def open(self) -> None:
+        """Открыть пул и дождаться создания минимального количества соединений."""
+        if self._pool is not None:
+            return
+
+        pool = AsyncConnectionPool(
+            kwargs=self._connection_kwargs(),
+            min_size=self.min_size,
+            max_size=self.max_size,
+            timeout=self.acquire_timeout,
+            check=AsyncConnectionPool.check_connection,
+            name="bot_db",
+            open=False,
+        )
+        await pool.open(wait=True, timeout=self.acquire_timeout)
+        self._pool = pool
+        logger.log('info', 'Пул соединений PostgreSQL открыт: min=%s, max=%s', self.min_size, self.max_size)
+
+    async def close(self) -> None:
+        """Закрыть пул и все его соединения."""
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        await pool.close()
+        logger.log('info', 'Пул соединений PostgreSQL закрыт')
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """Получить соединение из пула на время одной транзакции.
+
+        Транзакция фиксируется при выходе из блока и откатывается при исключении.
+
+        Возвращает:
+            AsyncConnection: Проверенное соединение из пула.
+        """
+        if self._pool is None:
+            raise RuntimeError("Пул соединений PostgreSQL не открыт")
+
+        async with self._pool.connection() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def cursor(self) -> AsyncIterator[AsyncCursor]:
+        """Получить курсор на соединении из пула.
+
+        Возвращает:
+            AsyncCursor: Курсор для выполнения запросов.
+        """
+        async with self.connection() as conn:
+            async with conn.cursor() as cursor:
+                yield cursor
+
+    async def health_check(self) -> bool:
+        """Проверить, что база данных отвечает на запросы.
+
+        Возвращает:
+            bool: True, если запрос `SELECT 1` выполнен успешно.
+        """
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+                return (await cursor.fetchone()) == (1,)
+        except Exception as ex:
+            logger.log('error', 'PostgresSQL ERROR in health_check: %s', ex)
+            return False
+
+    def stats(self) -> dict:
+        """Вернуть статистику пула соединений.
+
+        Возвращает:
+            dict: Размер пула, количество свободных соединений и ожидающих клиентов.
+        """
+        if self._pool is None:
+            return {}
+        return self._pool.get_stats()
+
+
+db_pool = DatabasePool(
+    min_size=int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+    max_size=int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+    acquire_timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    query_timeout=float(os.getenv("DB_QUERY_TIMEOUT", 5)),
+)
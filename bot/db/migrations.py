@@ -0,0 +1,214 @@
+from typing import NamedTuple
+
+from bot.db.db_pool import db_pool
+from bot.logging.logger import logger
+
+
+class Migration(NamedTuple):
+    """Одна версия схемы базы данных.
+
+    Атрибуты:
+        version (int): Номер версии схемы.
+        description (str): Краткое описание изменений.
+        statements (tuple): SQL-запросы, переводящие схему в эту версию.
+    """
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "Таблицы пользователей и напоминаний", (
+        """CREATE TABLE IF NOT EXISTS main_users (
+            id serial PRIMARY KEY,
+            tg_id integer UNIQUE NOT NULL,
+            tg_username varchar(60) UNIQUE
+        )""",
+        """CREATE TABLE IF NOT EXISTS main_schedule (
+            id serial PRIMARY KEY,
+            reminder_text TEXT NOT NULL,
+            reminder_datetime TIMESTAMP NOT NULL,
+            fk_user_id integer NOT NULL REFERENCES main_users (tg_id) ON DELETE CASCADE
+        )""",
+    )),
+    Migration(2, "bigint для ID Telegram и индексы для списков и очистки", (
+        """ALTER TABLE main_users ALTER COLUMN tg_id TYPE bigint""",
+        """ALTER TABLE main_schedule ALTER COLUMN fk_user_id TYPE bigint""",
+        """ALTER TABLE main_schedule ALTER COLUMN id TYPE bigint""",
+        """ALTER SEQUENCE main_schedule_id_seq AS bigint""",
+        """CREATE INDEX IF NOT EXISTS main_schedule_user_datetime_idx
+           ON main_schedule (fk_user_id, reminder_datetime)""",
+        """CREATE INDEX IF NOT EXISTS main_schedule_datetime_idx
+           ON main_schedule (reminder_datetime)""",
+    )),
+    Migration(3, "ID задачи arq для каждого напоминания", (
+        """ALTER TABLE main_schedule ADD COLUMN IF NOT EXISTS job_id varchar(64)""",
+        """CREATE INDEX IF NOT EXISTS main_schedule_job_id_idx ON main_schedule (job_id)""",
+    )),
+    Migration(4, "Индекс для постраничного вывода списка по (reminder_datetime, id)", (
+        """CREATE INDEX IF NOT EXISTS main_schedule_user_datetime_id_idx
+           ON main_schedule (fk_user_id, reminder_datetime, id)""",
+        """DROP INDEX IF EXISTS main_schedule_user_datetime_idx""",
+    )),
+    Migration(5, "Уведомления об изменениях напоминаний для колеса таймеров", (
+        """CREATE OR REPLACE FUNCTION main_schedule_notify() RETURNS trigger AS $$
+           BEGIN
+               PERFORM pg_notify('main_schedule', TG_OP || ':' || COALESCE(NEW.id, OLD.id));
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        """DROP TRIGGER IF EXISTS main_schedule_notify ON main_schedule""",
+        """CREATE TRIGGER main_schedule_notify
+           AFTER INSERT OR DELETE OR UPDATE OF reminder_text, reminder_datetime ON main_schedule
+           FOR EACH ROW EXECUTE FUNCTION main_schedule_notify()""",
+    )),
+    Migration(6, "Правило повтора для повторяющихся напоминаний", (
+        """ALTER TABLE main_schedule ADD COLUMN IF NOT EXISTS recurrence varchar(8)""",
+        """DROP TRIGGER IF EXISTS main_schedule_notify ON main_schedule""",
+        """CREATE TRIGGER main_schedule_notify
+           AFTER INSERT OR DELETE OR UPDATE OF reminder_text, reminder_datetime, recurrence ON main_schedule
+           FOR EACH ROW EXECUTE FUNCTION main_schedule_notify()""",
+    )),
+    Migration(7, "Секционирование main_schedule по месяцам reminder_datetime", (
+        # Секция месяца создается отдельной таблицей и присоединяется к main_schedule;
+        # строки этого месяца, попавшие в секцию по умолчанию, переносятся в нее
+        """CREATE OR REPLACE FUNCTION main_schedule_add_partition(month timestamp) RETURNS boolean AS $$
+           DECLARE
+               lower_bound timestamp := date_trunc('month', month);
+               upper_bound timestamp := date_trunc('month', month) + interval '1 month';
+               partition text := 'main_schedule_' || to_char(date_trunc('month', month), 'YYYY_MM');
+           BEGIN
+               PERFORM pg_advisory_xact_lock(hashtext('main_schedule_partitions'));
+               IF to_regclass(partition) IS NOT NULL THEN
+                   RETURN false;
+               END IF;
+               EXECUTE format('CREATE TABLE %I (LIKE main_schedule INCLUDING DEFAULTS)', partition);
+               EXECUTE format(
+                   'WITH moved AS (DELETE FROM main_schedule_default
+                                   WHERE reminder_datetime >= %L AND reminder_datetime < %L RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved',
+                   lower_bound, upper_bound, partition
+               );
+               EXECUTE format('ALTER TABLE main_schedule ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                              partition, lower_bound, upper_bound);
+               RETURN true;
+           END;
+           $$ LANGUAGE plpgsql""",
+        """ALTER TABLE main_schedule RENAME TO main_schedule_unpartitioned""",
+        """ALTER TABLE main_schedule_unpartitioned RENAME CONSTRAINT main_schedule_pkey TO main_schedule_unpartitioned_pkey""",
+        """DROP TRIGGER IF EXISTS main_schedule_notify ON main_schedule_unpartitioned""",
+        """DROP INDEX IF EXISTS main_schedule_user_datetime_id_idx""",
+        """DROP INDEX IF EXISTS main_schedule_datetime_idx""",
+        """DROP INDEX IF EXISTS main_schedule_job_id_idx""",
+        """ALTER SEQUENCE main_schedule_id_seq OWNED BY NONE""",
+        # Ключ секционирования входит в первичный ключ; ID по-прежнему выдает общая последовательность
+        """CREATE TABLE main_schedule (
+            id bigint NOT NULL DEFAULT nextval('main_schedule_id_seq'),
+            reminder_text TEXT NOT NULL,
+            reminder_datetime TIMESTAMP NOT NULL,
+            fk_user_id bigint NOT NULL REFERENCES main_users (tg_id) ON DELETE CASCADE,
+            job_id varchar(64),
+            recurrence varchar(8),
+            PRIMARY KEY (id, reminder_datetime)
+        ) PARTITION BY RANGE (reminder_datetime)""",
+        """ALTER SEQUENCE main_schedule_id_seq OWNED BY main_schedule.id""",
+        """CREATE TABLE main_schedule_default PARTITION OF main_schedule DEFAULT""",
+        """CREATE INDEX main_schedule_user_datetime_id_idx ON main_schedule (fk_user_id, reminder_datetime, id)""",
+        """CREATE INDEX main_schedule_datetime_idx ON main_schedule (reminder_datetime)""",
+        """CREATE INDEX main_schedule_job_id_idx ON main_schedule (job_id)""",
+        # Повторяющиеся напоминания не дают удалить секцию, поиск по этому индексу не читает ее строки
+        """CREATE INDEX main_schedule_recurring_idx ON main_schedule (reminder_datetime) WHERE recurrence IS NOT NULL""",
+        """DO $$
+           DECLARE
+               month timestamp;
+           BEGIN
+               SELECT date_trunc('month', LEAST(MIN(reminder_datetime), now()::timestamp)) INTO month
+               FROM main_schedule_unpartitioned;
+               WHILE month < date_trunc('month', now()::timestamp) + interval '3 months' LOOP
+                   PERFORM main_schedule_add_partition(month);
+                   month := month + interval '1 month';
+               END LOOP;
+           END;
+           $$""",
+        # Строки копируются пачками по первичному ключу, чтобы ни одна вставка не держала всю таблицу
+        """DO $$
+           DECLARE
+               last_id bigint := 0;
+               batch_end bigint;
+           BEGIN
+               LOOP
+                   SELECT MAX(id) INTO batch_end FROM (
+                       SELECT id FROM main_schedule_unpartitioned WHERE id > last_id ORDER BY id LIMIT 10000
+                   ) AS batch;
+                   EXIT WHEN batch_end IS NULL;
+                   INSERT INTO main_schedule (id, reminder_text, reminder_datetime, fk_user_id, job_id, recurrence)
+                   SELECT id, reminder_text, reminder_datetime, fk_user_id, job_id, recurrence
+                   FROM main_schedule_unpartitioned WHERE id > last_id AND id <= batch_end;
+                   last_id := batch_end;
+               END LOOP;
+           END;
+           $$""",
+        """DROP TABLE main_schedule_unpartitioned""",
+        """CREATE TRIGGER main_schedule_notify
+           AFTER INSERT OR DELETE OR UPDATE OF reminder_text, reminder_datetime, recurrence ON main_schedule
+           FOR EACH ROW EXECUTE FUNCTION main_schedule_notify()""",
+        # Холодный архив отсоединенных секций для аналитики
+        """CREATE TABLE main_schedule_archive (LIKE main_schedule) PARTITION BY RANGE (reminder_datetime)""",
+    )),
+]
+
+
+async def get_schema_version() -> int:
+    """Получить номер примененной версии схемы.
+
+    Возвращает:
+        int: Номер последней примененной миграции или 0, если миграций не было.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""SELECT to_regclass('schema_version')""")
+        if (await cursor.fetchone())[0] is None:
+            return 0
+
+        await cursor.execute("""SELECT COALESCE(MAX(version), 0) FROM schema_version""")
+        return (await cursor.fetchone())[0]
+
+
+async def apply_migrations() -> int:
+    """Применить все еще не примененные миграции.
+
+    Миграции выполняются в одной транзакции под advisory-блокировкой, поэтому
+    бот и воркер, запущенные одновременно, не применят одну версию дважды.
+    Ограничение времени запроса пула (DB_QUERY_TIMEOUT) в этой транзакции
+    снимается: перестройка большой таблицы занимает больше нескольких секунд,
+    а откат по таймауту повторялся бы при каждом запуске.
+
+    Возвращает:
+        int: Номер версии схемы после применения миграций.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute("""SET LOCAL statement_timeout = 0""")
+        await cursor.execute("""SELECT pg_advisory_xact_lock(hashtext('main_schedule_migrations'))""")
+        await cursor.execute(
+            """CREATE TABLE IF NOT EXISTS schema_version (
+                version integer PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT now()
+            )"""
+        )
+        await cursor.execute("""SELECT COALESCE(MAX(version), 0) FROM schema_version""")
+        current = (await cursor.fetchone())[0]
+
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+
+            for statement in migration.statements:
+                await cursor.execute(statement)
+            await cursor.execute(
+                """INSERT INTO schema_version (version, description) VALUES (%s, %s)""",
+                (migration.version, migration.description)
+            )
+            current = migration.version
+            logger.log('info', 'Применена миграция схемы %s: %s', migration.version, migration.description)
+
+    return current
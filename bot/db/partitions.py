@@ -0,0 +1,176 @@
+import re
+from datetime import datetime
+from typing import List, NamedTuple
+
+from psycopg import sql
+
+from bot.db.db_pool import db_pool
+from bot.db.reminder_cache import reminder_cache
+from bot.logging.logger import logger
+
+# Секции main_schedule по месяцам reminder_datetime называются main_schedule_YYYY_MM,
+# отсоединенные в архив — main_schedule_archive_YYYY_MM
+PARTITION_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    """Месячная секция таблицы.
+
+    Атрибуты:
+        name (str): Имя таблицы секции.
+        lower (datetime): Начало месяца, включительно.
+        upper (datetime): Начало следующего месяца, не включительно.
+    """
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    """Начало месяца, отстоящего от moment на months месяцев.
+
+    Аргументы:
+        moment (datetime): Исходный момент.
+        months (int): Количество месяцев, может быть отрицательным.
+
+    Возвращает:
+        datetime: Полночь первого числа месяца.
+    """
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+async def list_partitions(table: str = 'main_schedule') -> List[Partition]:
+    """Получить месячные секции таблицы, упорядоченные по времени.
+
+    Аргументы:
+        table (str): Секционированная таблица.
+
+    Возвращает:
+        list: Секции без секции по умолчанию.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+               FROM pg_inherits JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+               WHERE pg_inherits.inhparent = %s::regclass""",
+            (table,)
+        )
+        rows = await cursor.fetchall()
+
+    partitions = []
+    for name, bounds in rows:
+        match = PARTITION_BOUNDS.search(bounds)
+        if match is not None:
+            partitions.append(Partition(name, *map(datetime.fromisoformat, match.groups())))
+    return sorted(partitions, key=lambda partition: partition.lower)
+
+
+async def ensure_partitions(now: datetime, ahead: int) -> int:
+    """Создать секции текущего месяца и ahead следующих месяцев, если их еще нет.
+
+    Также создаются секции прошедших месяцев, строки которых попали в секцию
+    по умолчанию: после этого их можно удалить вместе с секцией.
+
+    Аргументы:
+        now (datetime): Текущее время.
+        ahead (int): На сколько месяцев вперед создавать секции.
+
+    Возвращает:
+        int: Количество созданных секций.
+    """
+    months = [add_months(now, offset) for offset in range(ahead + 1)]
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT DISTINCT date_trunc('month', reminder_datetime) FROM main_schedule_default
+               WHERE reminder_datetime < %s""",
+            (months[0],)
+        )
+        months += [row[0] for row in await cursor.fetchall()]
+
+        created = 0
+        for month in months:
+            await cursor.execute("""SELECT main_schedule_add_partition(%s)""", (month,))
+            if (await cursor.fetchone())[0]:
+                created += 1
+                logger.log('info', 'Создана секция main_schedule за %s', month.strftime('%Y-%m'))
+    return created
+
+
+async def drop_expired_partitions(before: datetime, archive: bool = False) -> List[str]:
+    """Удалить секции, все напоминания которых просрочены.
+
+    Секция удаляется целиком, только если ее месяц закончился раньше before и в
+    ней нет повторяющихся напоминаний: их строка живет, пока задача доставки не
+    перенесет ее в секцию следующего повторения. Секции, в которые еще могут
+    попасть строки, не затрагиваются. Отсоединение и удаление секции не зависят
+    от количества строк в ней. После удаления секций кэш списков сбрасывается.
+
+    Аргументы:
+        before (datetime): Момент, раньше которого напоминания считаются просроченными.
+        archive (bool): Не удалять секцию, а присоединить ее к main_schedule_archive.
+
+    Возвращает:
+        list: Имена удаленных или перенесенных в архив секций.
+    """
+    removed = []
+    for partition in await list_partitions():
+        if partition.upper > before:
+            break
+
+        async with db_pool.cursor() as cursor:
+            name = sql.Identifier(partition.name)
+            # Отсоединение ждет запросы к main_schedule; при долгом ожидании проход повторится позже
+            await cursor.execute("""SET LOCAL lock_timeout = '5s'""")
+            await cursor.execute(
+                sql.SQL("""SELECT 1 FROM {} WHERE recurrence IS NOT NULL LIMIT 1""").format(name)
+            )
+            if await cursor.fetchone() is not None:
+                logger.log('info', 'Секция %s не удалена: в ней есть повторяющиеся напоминания', partition.name)
+                continue
+
+            await cursor.execute(sql.SQL("""ALTER TABLE main_schedule DETACH PARTITION {}""").format(name))
+            if archive:
+                await _archive_partition(cursor, partition)
+            else:
+                await cursor.execute(sql.SQL("""DROP TABLE {}""").format(name))
+        removed.append(partition.name)
+        logger.log('info', 'Секция %s %s', partition.name, 'перенесена в архив' if archive else 'удалена')
+
+    if removed:
+        await reminder_cache.invalidate_all()
+    return removed
+
+
+async def _archive_partition(cursor, partition: Partition) -> None:
+    """Присоединить отсоединенную секцию к архиву main_schedule_archive.
+
+    Внешний ключ на main_users снимается, чтобы удаление пользователя не
+    затрагивало архив. Если секция этого месяца уже есть в архиве, например
+    для строк, попавших в секцию по умолчанию позже, строки дописываются в нее.
+
+    Аргументы:
+        cursor: Курсор открытой транзакции.
+        partition (Partition): Отсоединенная секция.
+    """
+    name = sql.Identifier(partition.name)
+    archived_name = partition.name.replace('main_schedule_', 'main_schedule_archive_', 1)
+    archived = sql.Identifier(archived_name)
+    await cursor.execute("""SELECT to_regclass(%s)""", (archived_name,))
+    if (await cursor.fetchone())[0] is not None:
+        await cursor.execute(sql.SQL("""INSERT INTO {} SELECT * FROM {}""").format(archived, name))
+        await cursor.execute(sql.SQL("""DROP TABLE {}""").format(name))
+        return
+
+    await cursor.execute(
+        """SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'""",
+        (partition.name,)
+    )
+    for (constraint,) in await cursor.fetchall():
+        await cursor.execute(sql.SQL("""ALTER TABLE {} DROP CONSTRAINT {}""").format(name, sql.Identifier(constraint)))
+    await cursor.execute(sql.SQL("""ALTER TABLE {} RENAME TO {}""").format(name, archived))
+    await cursor.execute(
+        sql.SQL("""ALTER TABLE main_schedule_archive ATTACH PARTITION {} FOR VALUES FROM ({}) TO ({})""").format(
+            archived, sql.Literal(partition.lower), sql.Literal(partition.upper)
+        )
+    )
@@ -0,0 +1,181 @@
+import os
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+from bot.other_func.metrics import REMINDER_CACHE_LOOKUPS
+
+load_dotenv('.env')
+
+
+class ReminderPageCache:
+    """Кэш первой страницы списка напоминаний пользователя в Redis.
+
+    Кнопка "Список моих напоминаний" всегда открывает первую страницу, поэтому
+    кэшируется только она. Страница хранится под ключом с номером поколения
+    пользователя и общим номером поколения всех списков. Любое изменение
+    напоминаний пользователя после фиксации транзакции увеличивает его поколение,
+    а удаление секций — общее, поэтому страница, прочитанная из базы до
+    изменения, попадает под старый ключ и больше никогда не выдается, даже если
+    была записана в кэш уже после изменения.
+
+    Атрибуты:
+        ttl (int): Время жизни страницы в кэше в секундах.
+        prefix (str): Префикс ключей Redis.
+        hits (int): Количество попаданий в кэш.
+        misses (int): Количество промахов кэша.
+        invalidations (int): Количество сбросов страниц пользователей.
+    """
+
+    def __init__(self, ttl: int, prefix: str = 'reminders:') -> None:
+        """Инициализировать ReminderPageCache.
+
+        Аргументы:
+            ttl (int): Время жизни страницы в кэше в секундах, 0 отключает кэш.
+            prefix (str): Префикс ключей Redis.
+        """
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._redis: Optional[Any] = None
+        self._hit = REMINDER_CACHE_LOOKUPS.labels('hit').inc
+        self._miss = REMINDER_CACHE_LOOKUPS.labels('miss').inc
+
+    @property
+    def is_enabled(self) -> bool:
+        """Подключен ли кэш к Redis."""
+        return self._redis is not None and self.ttl > 0
+
+    def attach(self, redis: Optional[Any]) -> None:
+        """Подключить кэш к Redis.
+
+        Аргументы:
+            redis (Redis, optional): Клиент Redis, например ArqRedis, None отключает кэш.
+        """
+        self._redis = redis
+
+    def _generation_key(self, user_id: int) -> str:
+        """Ключ номера поколения страницы пользователя."""
+        return f'{self.prefix}{user_id}:gen'
+
+    def _epoch_key(self) -> str:
+        """Ключ общего номера поколения всех страниц."""
+        return f'{self.prefix}epoch'
+
+    def _page_key(self, user_id: int, page_size: int, generation: str) -> str:
+        """Ключ страницы пользователя заданного размера для заданного поколения."""
+        return f'{self.prefix}{user_id}:{page_size}:{generation}'
+
+    async def get(self, user_id: int, page_size: int) -> Tuple[str, Optional[Tuple[List[Dict[str, Any]], bool]]]:
+        """Получить первую страницу напоминаний пользователя из кэша.
+
+        Попадание учитывается вызывающим через record: страница с напоминаниями,
+        которые уже просрочены, не выдается и считается промахом.
+
+        Аргументы:
+            user_id (int): ID пользователя.
+            page_size (int): Количество напоминаний на странице.
+
+        Возвращает:
+            tuple: Номер поколения, который нужно передать в put, и страница —
+                   список напоминаний и признак следующей страницы — или None при промахе.
+        """
+        epoch, generation = await self._redis.mget(self._epoch_key(), self._generation_key(user_id))
+        generation = f'{int(epoch or 0)}.{int(generation or 0)}'
+        payload = await self._redis.get(self._page_key(user_id, page_size, generation))
+        if payload is None:
+            return generation, None
+
+        page = json.loads(payload)
+        for reminder in page["reminders"]:
+            reminder["datetime"] = datetime.fromisoformat(reminder["datetime"])
+        return generation, (page["reminders"], page["has_next"])
+
+    async def put(self, user_id: int, page_size: int, generation: str,
+                  reminders: List[Dict[str, Any]], has_next: bool) -> None:
+        """Сохранить первую страницу, прочитанную из базы данных.
+
+        Аргументы:
+            user_id (int): ID пользователя.
+            page_size (int): Количество напоминаний на странице.
+            generation (str): Номер поколения, полученный из get до чтения базы данных.
+            reminders (list): Напоминания страницы.
+            has_next (bool): Есть ли следующая страница.
+        """
+        payload = json.dumps({"reminders": reminders, "has_next": has_next},
+                             default=datetime.isoformat, ensure_ascii=False)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._page_key(user_id, page_size, generation), payload, ex=self.ttl)
+            # Номер поколения должен жить дольше любой страницы, иначе он сбросится к старому значению
+            pipe.expire(self._generation_key(user_id), self.ttl * 2)
+            await pipe.execute()
+
+    def record(self, hit: bool) -> None:
+        """Учесть попадание или промах в счетчиках.
+
+        Аргументы:
+            hit (bool): True, если страница выдана из кэша.
+        """
+        if hit:
+            self.hits += 1
+            self._hit()
+        else:
+            self.misses += 1
+            self._miss()
+
+    async def invalidate(self, *user_ids: int) -> None:
+        """Сбросить страницы пользователей после изменения их напоминаний.
+
+        Вызывается после фиксации транзакции. Ошибки Redis записываются в лог и не
+        прерывают изменение напоминаний.
+
+        Аргументы:
+            *user_ids (int): ID пользователей.
+        """
+        if not self.is_enabled or not user_ids:
+            return
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.incr(self._generation_key(user_id))
+                    pipe.expire(self._generation_key(user_id), self.ttl * 2)
+                await pipe.execute()
+            self.invalidations += len(user_ids)
+        except Exception as ex:
+            logger.log('error', 'Redis ERROR in reminder_cache.invalidate: %s', ex)
+
+    async def invalidate_all(self) -> None:
+        """Сбросить страницы всех пользователей, например после удаления секций.
+
+        Ошибки Redis записываются в лог.
+        """
+        if not self.is_enabled:
+            return
+
+        try:
+            await self._redis.incr(self._epoch_key())
+        except Exception as ex:
+            logger.log('error', 'Redis ERROR in reminder_cache.invalidate_all: %s', ex)
+
+    def stats(self) -> dict:
+        """Вернуть счетчики кэша.
+
+        Возвращает:
+            dict: Количество попаданий, промахов, сбросов и доля попаданий.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+reminder_cache = ReminderPageCache(ttl=int(os.getenv("REMINDER_CACHE_TTL", 300)))
@@ -0,0 +1,117 @@
+import os
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from bot.db.partitions import drop_expired_partitions, ensure_partitions
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+
+class ExpirySweeper:
+    """Единственная фоновая задача, обслуживающая месячные секции main_schedule.
+
+    Каждый проход заранее создает секции на ahead месяцев вперед и удаляет
+    целиком секции, месяц которых закончился больше grace секунд назад, вместо
+    удаления просроченных строк по одной. Доставленные напоминания удаляет
+    задача доставки, а просроченные строки живых секций не показываются в
+    списках и удаляются вместе со своей секцией.
+
+    Атрибуты:
+        interval (float): Пауза между проходами в секундах.
+        grace (float): Сколько секунд после срока строка не считается просроченной.
+        ahead (int): На сколько месяцев вперед создаются секции.
+        archive (bool): Переносить просроченные секции в main_schedule_archive вместо удаления.
+        last_removed (int): Количество секций, удаленных последним проходом.
+        last_duration (float): Длительность последнего прохода в секундах.
+        total_removed (int): Количество секций, удаленных с момента запуска.
+    """
+
+    def __init__(self, interval: float, grace: float = 0, ahead: int = 3, archive: bool = False) -> None:
+        """Инициализировать ExpirySweeper.
+
+        Аргументы:
+            interval (float): Пауза между проходами в секундах.
+            grace (float): Сколько секунд после срока строка не считается просроченной.
+            ahead (int): На сколько месяцев вперед создаются секции.
+            archive (bool): Переносить просроченные секции в main_schedule_archive вместо удаления.
+        """
+        self.interval = interval
+        self.grace = grace
+        self.ahead = ahead
+        self.archive = archive
+        self.last_removed = 0
+        self.last_duration = 0.0
+        self.total_removed = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Запущена ли фоновая задача."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Запустить фоновую задачу, если она еще не запущена."""
+        if self.is_running:
+            return
+
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="expiry_sweeper")
+        logger.log('info', 'Очистка просроченных напоминаний запущена: интервал %s с, секции на %s мес. вперед',
+                   self.interval, self.ahead)
+
+    async def stop(self) -> None:
+        """Остановить фоновую задачу, дождавшись завершения текущего прохода."""
+        if self._task is None:
+            return
+
+        self._stopping.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+        logger.log('info', 'Очистка просроченных напоминаний остановлена')
+
+    async def sweep(self) -> int:
+        """Выполнить один проход очистки.
+
+        Возвращает:
+            int: Количество удаленных секций.
+        """
+        started = time.perf_counter()
+        now = datetime.now()
+        created = await ensure_partitions(now, self.ahead)
+        removed = len(await drop_expired_partitions(now - timedelta(seconds=self.grace), self.archive))
+
+        self.last_removed = removed
+        self.last_duration = time.perf_counter() - started
+        self.total_removed += removed
+        logger.log('info', 'Очистка просроченных напоминаний: создано секций %s, удалено секций %s за %.1f мс',
+                   created, removed, self.last_duration * 1000)
+        return removed
+
+    async def _run(self) -> None:
+        """Повторять проходы очистки до сигнала остановки."""
+        while not self._stopping.is_set():
+            try:
+                await self.sweep()
+            except Exception as ex:
+                logger.log('error', 'PostgresSQL ERROR in expiry_sweeper: %s', ex)
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+expiry_sweeper = ExpirySweeper(
+    interval=float(os.getenv("EXPIRY_SWEEP_INTERVAL", 60)),
+    grace=float(os.getenv("EXPIRY_GRACE", 3600)),
+    ahead=int(os.getenv("PARTITION_AHEAD", 3)),
+    archive=os.getenv("PARTITION_ARCHIVE", "0") == "1",
+)
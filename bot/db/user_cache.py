@@ -0,0 +1,104 @@
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from bot.other_func.metrics import KNOWN_USER_LOOKUPS
+
+load_dotenv('.env')
+
+
+class KnownUserCache:
+    """Ограниченный LRU-кэш пользователей, уже сохраненных в main_users.
+
+    Для каждого tg_id хранится имя пользователя, записанное в базу. Пока оно не
+    изменилось, /start и установка напоминаний не обращаются к базе данных для
+    регистрации пользователя. Кэш живет в процессе, поэтому после удаления
+    пользователя из базы его нужно сбросить через discard.
+
+    Атрибуты:
+        maxsize (int): Максимальное количество хранимых пользователей.
+        hits (int): Количество попаданий в кэш.
+        misses (int): Количество промахов кэша.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Инициализировать KnownUserCache.
+
+        Аргументы:
+            maxsize (int): Максимальное количество хранимых пользователей, 0 отключает кэш.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[int, Optional[str]] = OrderedDict()
+        self._hit = KNOWN_USER_LOOKUPS.labels('hit').inc
+        self._miss = KNOWN_USER_LOOKUPS.labels('miss').inc
+
+    def is_known(self, user_id: int, username: Optional[str]) -> bool:
+        """Проверить, сохранен ли пользователь в базе с тем же именем.
+
+        Аргументы:
+            user_id (int): ID пользователя Telegram.
+            username (str, optional): Текущее имя пользователя.
+
+        Возвращает:
+            bool: True, если регистрацию можно пропустить.
+        """
+        if user_id not in self._data or self._data[user_id] != username:
+            self.misses += 1
+            self._miss()
+            return False
+
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        self._hit()
+        return True
+
+    def add(self, user_id: int, username: Optional[str]) -> None:
+        """Запомнить сохраненного пользователя, вытеснив самого давнего при переполнении.
+
+        Аргументы:
+            user_id (int): ID пользователя Telegram.
+            username (str, optional): Имя пользователя, записанное в базу.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._data[user_id] = username
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard(self, *user_ids: int) -> None:
+        """Забыть пользователей, например после их удаления из базы.
+
+        Аргументы:
+            *user_ids (int): ID пользователей Telegram.
+        """
+        for user_id in user_ids:
+            self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Очистить кэш и обнулить счетчики."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Вернуть счетчики кэша.
+
+        Возвращает:
+            dict: Размер кэша, количество попаданий и промахов и доля попаданий.
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+known_users = KnownUserCache(maxsize=int(os.getenv("KNOWN_USER_CACHE_SIZE", 100_000)))
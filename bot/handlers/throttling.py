@@ -0,0 +1,215 @@
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from aiogram import types
+from aiogram.dispatcher.handler import CancelHandler, current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+from bot.other_func.metrics import THROTTLE_DECISIONS
+
+load_dotenv('.env')
+
+# Бюджет обработчика по его имени: разбор напоминания — самая дорогая операция бота,
+# остальные обработчики (список, команды) расходуют общий дешевый бюджет
+PARSE_BUDGET = 'parse'
+DEFAULT_BUDGET = 'default'
+HANDLER_BUDGETS = {'get_reminder_text': PARSE_BUDGET}
+SLOW_DOWN_TEXT = "⚠ Слишком много сообщений. Подождите немного и повторите 🥷"
+
+
+class Budget(NamedTuple):
+    """Лимиты одного бюджета обработчиков на окно.
+
+    Атрибуты:
+        user_limit (int): Сколько обновлений одного пользователя пропускается за окно, 0 — без лимита.
+        global_limit (int): Сколько обновлений всех пользователей пропускается за окно, 0 — без лимита.
+    """
+    user_limit: int
+    global_limit: int
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Ограничение частоты обновлений пользователей и бота в целом по скользящему окну в Redis.
+
+    Счетчики хранятся в Redis по окнам фиксированной длины, а число обновлений за
+    последние window секунд оценивается как счетчик текущего окна плюс доля
+    предыдущего, поэтому лимит общий для всех процессов бота и не сбрасывается
+    на границе окна. Проверка пользователя выполняется одной транзакцией Redis;
+    общий счетчик увеличивается, только если пользователь уложился в свой лимит,
+    чтобы один флудящий пользователь не расходовал общий бюджет.
+
+    Сообщение для разбора напоминаний расходует бюджет по числу непустых строк,
+    ведь каждая строка разбирается как отдельное напоминание. Стоимость одного
+    сообщения не превышает лимит пользователя, поэтому сообщение с напоминаниями
+    списком проходит в пустом окне и расходует его целиком.
+
+    Обновление сверх лимита отбрасывается до обработчика, а пользователь один раз
+    за окно получает короткий ответ с просьбой подождать. При ошибке Redis
+    обновление пропускается.
+
+    Атрибуты:
+        redis: Клиент Redis, например ArqRedis.
+        budgets (dict): Лимиты по именам бюджетов.
+        window (float): Длина окна в секундах.
+        prefix (str): Префикс ключей Redis.
+        allowed (int): Количество пропущенных обновлений.
+        dropped (int): Количество отброшенных обновлений.
+    """
+
+    def __init__(self, redis: Any, budgets: Dict[str, Budget], window: float, prefix: str = 'throttle:') -> None:
+        """Инициализировать ThrottlingMiddleware.
+
+        Аргументы:
+            redis: Клиент Redis, например ArqRedis.
+            budgets (dict): Лимиты по именам бюджетов, должен содержать DEFAULT_BUDGET.
+            window (float): Длина окна в секундах.
+            prefix (str): Префикс ключей Redis.
+        """
+        super().__init__()
+        self.redis = redis
+        self.budgets = budgets
+        self.window = window
+        self.prefix = prefix
+        self.allowed = 0
+        self.dropped = 0
+
+    async def on_process_message(self, message: types.Message, data: dict) -> None:
+        """Проверить лимиты перед обработчиком сообщения."""
+        if not await self.allow(message.from_user.id, message.answer, cost=self.cost_of(message)):
+            raise CancelHandler()
+
+    async def on_process_callback_query(self, call: types.CallbackQuery, data: dict) -> None:
+        """Проверить лимиты перед обработчиком нажатия кнопки."""
+        if not await self.allow(call.from_user.id, call.answer):
+            raise CancelHandler()
+
+    @staticmethod
+    def budget_of(handler: Optional[Any]) -> str:
+        """Определить бюджет обработчика по его имени.
+
+        Аргументы:
+            handler (Callable, optional): Выбранный обработчик обновления.
+
+        Возвращает:
+            str: Имя бюджета.
+        """
+        name = getattr(getattr(handler, 'func', handler), '__name__', '')
+        return HANDLER_BUDGETS.get(name, DEFAULT_BUDGET)
+
+    @staticmethod
+    def cost_of(message: types.Message) -> int:
+        """Определить стоимость сообщения для бюджета разбора.
+
+        Аргументы:
+            message (types.Message): Входящее сообщение от пользователя.
+
+        Возвращает:
+            int: Количество непустых строк, но не меньше 1.
+        """
+        return max(sum(1 for line in (message.text or "").splitlines() if line.strip()), 1)
+
+    async def allow(self, user_id: int, reply: Callable[[str], Awaitable[Any]],
+                    now: Optional[float] = None, cost: int = 1) -> bool:
+        """Учесть обновление пользователя и решить, пропускать ли его.
+
+        Аргументы:
+            user_id (int): ID пользователя Telegram.
+            reply (Callable): Ответ на обновление, например message.answer или call.answer.
+            now (float, optional): Текущее время в секундах, по умолчанию time.time().
+            cost (int): Стоимость обновления для бюджета разбора, например количество строк сообщения.
+
+        Возвращает:
+            bool: True, если обновление нужно обработать.
+        """
+        budget_name = self.budget_of(current_handler.get(None))
+        budget = self.budgets.get(budget_name, self.budgets[DEFAULT_BUDGET])
+        if budget_name != PARSE_BUDGET:
+            cost = 1
+        elif budget.user_limit:
+            cost = min(cost, budget.user_limit)
+        try:
+            result = await self._check(budget_name, budget, user_id, time.time() if now is None else now, cost)
+        except Exception as ex:
+            logger.log('error', 'Redis ERROR in throttling: %s', ex)
+            result = 'allowed'
+
+        THROTTLE_DECISIONS.labels(budget_name, result).inc()
+        if result == 'allowed':
+            self.allowed += 1
+            return True
+
+        self.dropped += 1
+        logger.log('info', 'Обновление пользователя %s отброшено: лимит %s (%s)', user_id, budget_name, result)
+        try:
+            await self._slow_down(budget_name, user_id, reply)
+        except Exception as ex:
+            logger.log('error', 'Ошибка ответа на превышение лимита для пользователя %s: %s', user_id, ex)
+        return False
+
+    async def _check(self, budget_name: str, budget: Budget, user_id: int, now: float, cost: int = 1) -> str:
+        """Проверить лимит пользователя, затем общий лимит.
+
+        Счетчики увеличиваются на стоимость обновления cost.
+
+        Возвращает:
+            str: 'allowed', 'user' или 'global' — какой лимит превышен.
+        """
+        window = int(now // self.window)
+        elapsed = now / self.window - window
+        user_key = f'{self.prefix}{budget_name}:{user_id}:'
+        global_key = f'{self.prefix}{budget_name}:global:'
+
+        if budget.user_limit:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incrby(user_key + str(window), cost)
+                pipe.expire(user_key + str(window), int(self.window * 2) + 1)
+                pipe.get(user_key + str(window - 1))
+                current, _, previous = await pipe.execute()
+            if current + int(previous or 0) * (1 - elapsed) > budget.user_limit:
+                return 'user'
+
+        if budget.global_limit:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incrby(global_key + str(window), cost)
+                pipe.expire(global_key + str(window), int(self.window * 2) + 1)
+                pipe.get(global_key + str(window - 1))
+                current, _, previous = await pipe.execute()
+            if current + int(previous or 0) * (1 - elapsed) > budget.global_limit:
+                return 'global'
+        return 'allowed'
+
+    async def _slow_down(self, budget_name: str, user_id: int, reply: Callable[[str], Awaitable[Any]]) -> None:
+        """Ответить пользователю один раз за окно, что обновления отбрасываются."""
+        if await self.redis.set(f'{self.prefix}{budget_name}:{user_id}:warned', 1,
+                                ex=max(int(self.window), 1), nx=True):
+            await reply(SLOW_DOWN_TEXT)
+
+    def stats(self) -> dict:
+        """Вернуть счетчики ограничителя.
+
+        Возвращает:
+            dict: Количество пропущенных и отброшенных обновлений.
+        """
+        return {"allowed": self.allowed, "dropped": self.dropped}
+
+
+def throttling_middleware(redis: Any) -> ThrottlingMiddleware:
+    """Создать ThrottlingMiddleware с лимитами из окружения.
+
+    Аргументы:
+        redis: Клиент Redis, например ArqRedis.
+
+    Возвращает:
+        ThrottlingMiddleware: Middleware для dp.middleware.setup.
+    """
+    return ThrottlingMiddleware(
+        redis,
+        budgets={
+            PARSE_BUDGET: Budget(int(os.getenv("THROTTLE_PARSE_USER", 10)), int(os.getenv("THROTTLE_PARSE_GLOBAL", 600))),
+            DEFAULT_BUDGET: Budget(int(os.getenv("THROTTLE_USER", 30)), int(os.getenv("THROTTLE_GLOBAL", 3000))),
+        },
+        window=float(os.getenv("THROTTLE_WINDOW", 60)),
+    )
@@ -1,16 +1,36 @@
-import re
+import os
 import asyncio
+import re
 from datetime import datetime
 from functools import partial
+from typing import Awaitable, Callable, Optional, Tuple
 
 from aiogram import types, Dispatcher
 from aiogram.dispatcher.filters import Text
 from arq import ArqRedis
+from dotenv import load_dotenv
 
 from bot.db.db_func import *
-from bot.keyboards.user_keyboards import get_main_kb
+from bot.keyboards.user_keyboards import get_main_kb, get_page_kb, parse_page_cursor, reminder_page_cb
 from bot.logging.logger import logger
-from bot.other_func.reminder_analysis import analyze_reminder_handlers
+from bot.other_func.metrics import timed_handler
+from bot.other_func.profiling import profiler
+from bot.other_func.recurrence import describe_recurrence
+from bot.other_func.reminder_analysis import analyze_reminder_handlers, parse_reminders
+
+load_dotenv('.env')
+
+REMINDER_PAGE_SIZE = int(os.getenv("REMINDER_PAGE_SIZE", 10))
+# Ограничение Telegram на длину одного сообщения
+MESSAGE_LIMIT = 4096
+# Сколько символов текста напоминания показывается в списке и сводке
+REMINDER_PREVIEW_LENGTH = 300
+REMINDER_PAGE_HEADER = "🥷 Вот список ваших напоминаний 📃\n"
+# Сколько напоминаний можно добавить одним многострочным сообщением
+BULK_REMINDER_LIMIT = int(os.getenv("BULK_REMINDER_LIMIT", 50))
+# arq — задачи доставки в Redis, wheel — колесо таймеров bot.other_func.wheel_scheduler
+DELIVERY_BACKEND = os.getenv("DELIVERY_BACKEND", "arq")
+
 
 async def cmd_start(message: types.Message) -> None:
     """Обработать команду /start и отправить приветственное сообщение.
@@ -18,7 +38,7 @@ async def cmd_start(message: types.Message) -> None:
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
     """
-    logger.log('info', f'Команда /start выполнена пользователем: {message.from_user.id}')
+    logger.log('info', 'Команда /start выполнена пользователем: %s', message.from_user.id)
 
     await get_user(message=message)
 
@@ -32,111 +52,298 @@ async def cmd_start(message: types.Message) -> None:
     )
 
     await message.answer(start_text, parse_mode="html", reply_markup=get_main_kb())
-    logger.log('info', f'Приветственное сообщение отправлено пользователю: {message.from_user.id}')
+    logger.log('info', 'Приветственное сообщение отправлено пользователю: %s', message.from_user.id)
+
+
+def shorten(text: str, limit: int) -> str:
+    """Обрезать текст до limit символов, отметив обрезку многоточием.
+
+    Аргументы:
+        text (str): Исходный текст.
+        limit (int): Максимальная длина результата.
+
+    Возвращает:
+        str: Текст не длиннее limit символов.
+    """
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def render_reminder_line(number: int, reminder: dict) -> str:
+    """Собрать строку напоминания в списке.
+
+    Аргументы:
+        number (int): Порядковый номер напоминания в списке.
+        reminder (dict): Напоминание.
+
+    Возвращает:
+        str: Строка списка с обрезанным текстом напоминания.
+    """
+    text = shorten(reminder["text"], REMINDER_PREVIEW_LENGTH)
+    line = f'{number}. Напоминание: "{text}", Дата и время: {reminder["datetime"]}'
+    if reminder.get("recurrence"):
+        line += f', Повтор: {describe_recurrence(reminder["recurrence"])}'
+    return line
+
+
+def fit_reminder_page(reminders: list, start: int, from_end: bool = False) -> Tuple[list, int]:
+    """Оставить напоминания страницы, которые помещаются в одно сообщение Telegram.
+
+    Аргументы:
+        reminders (list): Напоминания страницы.
+        start (int): Порядковый номер первого напоминания на странице.
+        from_end (bool): Оставить последние напоминания, а не первые,
+            например для страницы, открытой кнопкой "Назад".
+
+    Возвращает:
+        tuple: Оставленные напоминания и порядковый номер первого из них.
+    """
+    length = len(REMINDER_PAGE_HEADER)
+    kept = 0
+    indexes = range(len(reminders) - 1, -1, -1) if from_end else range(len(reminders))
+    for index in indexes:
+        length += len(render_reminder_line(start + index, reminders[index])) + 1
+        if length > MESSAGE_LIMIT:
+            break
+        kept += 1
+
+    if from_end:
+        return reminders[len(reminders) - kept:], start + len(reminders) - kept
+    return reminders[:kept], start
+
+
+def render_reminder_page(reminders: list, start: int, user_id: int) -> str:
+    """Собрать текст страницы списка напоминаний.
+
+    Аргументы:
+        reminders (list): Напоминания страницы, отобранные fit_reminder_page.
+        start (int): Порядковый номер первого напоминания на странице.
+        user_id (int): ID пользователя для записи в лог.
+
+    Возвращает:
+        str: Текст страницы.
+    """
+    list_message = REMINDER_PAGE_HEADER
+    for i, reminder in enumerate(reminders, start):
+        list_message += '\n' + render_reminder_line(i, reminder)
+        logger.log('debug', 'Напоминание %s: "%s", Дата и время: %s для пользователя: %s', i, reminder["text"], reminder["datetime"], user_id)
+    return list_message
 
 
 async def list_reminder(message: types.Message) -> None:
-    """Отправить пользователю список напоминаний.
+    """Отправить пользователю первую страницу списка напоминаний.
 
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
     """
-    logger.log('info', f'Запрос списка напоминаний от пользователя: {message.from_user.id}')
+    logger.log('info', 'Запрос списка напоминаний от пользователя: %s', message.from_user.id)
 
     try:
-        list_message = "🥷 Вот список ваших напоминаний 📃\n"
-        reminders = await get_all_reminders(message)
+        reminders, has_next = await get_reminders_page(message.from_user.id, REMINDER_PAGE_SIZE)
 
         # Проверка на наличие напоминаний
         if not reminders:
-            logger.log('info', f'Список напоминаний пуст для пользователя: {message.from_user.id}')
+            logger.log('info', 'Список напоминаний пуст для пользователя: %s', message.from_user.id)
             raise TypeError("Список напоминаний пуст")
 
-        for i, reminder in enumerate(reminders, 1):
-            list_message += f'\n{i}. Напоминание: "{reminder["text"]}", Дата и время: {reminder["datetime"]}'
-            logger.log('info', f'Напоминание {i}: "{reminder["text"]}", Дата и время: {reminder["datetime"]} для пользователя: {message.from_user.id}')
-
-        await message.answer(list_message)
+        page, _ = fit_reminder_page(reminders, 1)
+        has_next = has_next or len(page) < len(reminders)
+        list_message = render_reminder_page(page, 1, message.from_user.id)
+        await message.answer(list_message, reply_markup=get_page_kb(page, 1, False, has_next))
 
     except TypeError:
         await message.answer("Список напоминаний пуст")
-        logger.log('error', f'Ошибка: Список напоминаний пуст для пользователя: {message.from_user.id}')
+        logger.log('error', 'Ошибка: Список напоминаний пуст для пользователя: %s', message.from_user.id)
     except Exception as e:
         await message.answer("Произошла ошибка")
-        logger.log('error', f'Произошла ошибка: {e}')
+        logger.log('error', 'Произошла ошибка: %s', e)
+
+
+async def list_reminder_page(call: types.CallbackQuery, callback_data: dict) -> None:
+    """Показать предыдущую или следующую страницу списка напоминаний.
+
+    Аргументы:
+        call (types.CallbackQuery): Нажатие кнопки под списком.
+        callback_data (dict): Направление, порядковый номер, время и ID крайнего напоминания страницы.
+    """
+    user_id = call.from_user.id
+    logger.log('info', 'Переход к странице списка напоминаний (%s) от пользователя: %s', callback_data["direction"], user_id)
+
+    try:
+        number = int(callback_data["number"])
+        cursor = parse_page_cursor(callback_data)
+        backward = callback_data["direction"] == 'prev'
+        reminders, has_more = await get_reminders_page(user_id, REMINDER_PAGE_SIZE, cursor, backward)
+
+        if backward:
+            has_prev, has_next = has_more, True
+            start = number - len(reminders) if has_more else 1
+        else:
+            has_prev, has_next = True, has_more
+            start = number + 1
 
+        # Напоминания соседней страницы могли быть удалены: показываем список с начала
+        if not reminders:
+            reminders, has_next = await get_reminders_page(user_id, REMINDER_PAGE_SIZE)
+            has_prev, start, backward = False, 1, False
+        if not reminders:
+            await call.message.edit_text("Список напоминаний пуст")
+        else:
+            # Не поместившиеся в сообщение напоминания остаются для следующего перехода в ту же сторону
+            page, start = fit_reminder_page(reminders, start, from_end=backward)
+            if backward:
+                has_prev = has_prev or len(page) < len(reminders)
+            else:
+                has_next = has_next or len(page) < len(reminders)
+            await call.message.edit_text(render_reminder_page(page, start, user_id),
+                                         reply_markup=get_page_kb(page, start, has_prev, has_next))
+        await call.answer()
+    except Exception as e:
+        await call.answer("Произошла ошибка")
+        logger.log('error', 'Произошла ошибка для пользователя: %s. Ошибка: %s', user_id, e)
+
+
+def render_bulk_summary(created: list, failed: list) -> str:
+    """Собрать ответ на сообщение с несколькими напоминаниями.
+
+    Аргументы:
+        created (list): Установленные напоминания (ReminderParse).
+        failed (list): Строки сообщения, из которых не удалось установить напоминание.
+
+    Возвращает:
+        str: Текст ответа, не длиннее одного сообщения Telegram.
+    """
+    lines = [f"📝 Установлено напоминаний: {len(created)} из {len(created) + len(failed)}"]
+    lines += [f'• "{shorten(parsed.text, REMINDER_PREVIEW_LENGTH)}" — 🗓 {parsed.date_str} ⏰ {parsed.time_str}'
+              + (f' 🔁 {describe_recurrence(parsed.recurrence)}' if parsed.recurrence else '') for parsed in created]
+    if failed:
+        lines.append("\n⚠ Не удалось установить (укажите дату и время, минимальное время - 1 минута):")
+        lines += [f"• {shorten(line, REMINDER_PREVIEW_LENGTH)}" for line in failed]
+    return shorten("\n".join(lines), MESSAGE_LIMIT)
 
-async def get_reminder_text(message: types.Message, redis_pool: ArqRedis) -> None:
+
+async def create_reminders(message: types.Message, lines: list, redis_pool: Optional[ArqRedis]) -> None:
+    """Установить напоминания из каждой строки сообщения и ответить одной сводкой.
+
+    Строки разбираются пачкой, напоминания сохраняются одной транзакцией,
+    а задачи доставки ставятся одним pipeline Redis.
+
+    Аргументы:
+        message (types.Message): Входящее сообщение от пользователя.
+        lines (list): Непустые строки сообщения.
+        redis_pool (ArqRedis, optional): Пул соединений Redis для планирования задач.
+    """
+    if len(lines) > BULK_REMINDER_LIMIT:
+        await message.reply(f"⚠ Одним сообщением можно установить не больше {BULK_REMINDER_LIMIT} напоминаний")
+        return
+
+    await message.answer("Идёт анализ ваших напоминаний...")
+    now = datetime.now()
+    created, failed = [], []
+    for line, parsed in zip(lines, await parse_reminders(lines)):
+        if parsed is None or parsed.from_date < now:
+            failed.append(line)
+        else:
+            created.append(parsed)
+
+    try:
+        await set_info_reminds(message.from_user.id, created, redis_pool, user=message.from_user)
+    except Exception as e:
+        await message.reply("Произошла ошибка при сохранении напоминаний.")
+        logger.log('error', 'PostgresSQL ERROR in set_info_reminds для пользователя: %s. Ошибка: %s', message.from_user.id, e)
+        return
+
+    await message.answer(render_bulk_summary(created, failed))
+    logger.log('info', 'Установлено напоминаний для пользователя: %s, %s из %s строк', message.from_user.id, len(created), len(lines))
+
+
+async def get_reminder_text(message: types.Message, redis_pool: Optional[ArqRedis]) -> None:
     """Анализировать и установить напоминание на основе ввода пользователя.
 
+    Если сообщение состоит из нескольких строк, каждая строка считается
+    отдельным напоминанием.
+
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
-        redis_pool (ArqRedis): Пул соединений Redis для планирования задач.
+        redis_pool (ArqRedis, optional): Пул соединений Redis для планирования задач.
+            Если не передан, напоминание только сохраняется в базе данных.
     """
-    logger.log('info', f'Получение текста напоминания от пользователя: {message.from_user.id}')
+    logger.log('info', 'Получение текста напоминания от пользователя: %s', message.from_user.id)
+
+    lines = [line.strip() for line in (message.text or "").splitlines() if line.strip()]
+    if len(lines) > 1:
+        try:
+            await create_reminders(message, lines, redis_pool)
+        except Exception as e:
+            await message.reply("Произошла ошибка при анализе напоминаний.")
+            logger.log('error', 'Произошла ошибка для пользователя: %s. Ошибка: %s', message.from_user.id, e)
+        return
 
     try:
         await message.answer("Идёт анализ вашего напоминания...")
-        logger.log('info', f'Отправка сообщения об анализе напоминания для пользователя: {message.from_user.id}')
+        logger.log('info', 'Отправка сообщения об анализе напоминания для пользователя: %s', message.from_user.id)
 
-        text_remind, from_date, date_str, time_str = await analyze_reminder_handlers(message=message)
+        parsed = await analyze_reminder_handlers(message=message)
+        text_remind, from_date, date_str, time_str = parsed[:4]
 
         # Проверка на корректность времени для установки напоминания
         if from_date < datetime.now():
             ex_message = "⚠ Минимальное время - 1 минута"
             await message.answer(ex_message)
-            logger.log('error', f'Попытка установить напоминание через минуту для пользователя: {message.from_user.id}')
+            logger.log('error', 'Попытка установить напоминание через минуту для пользователя: %s', message.from_user.id)
+        # Ответ об установке отправляется, только если напоминание и его задача доставки сохранены
+        elif await set_info_remind(message=message, parsed=parsed, redis_pool=redis_pool) is None:
+            await message.reply("Произошла ошибка при сохранении напоминания. Попробуйте еще раз позже.")
+            logger.log('error', 'Напоминание не сохранено для пользователя: %s', message.from_user.id)
         else:
-            await message.answer(f'📝 Ваше напоминание: "{text_remind}"\n🗓 Дата: {date_str} \n⏰ Время: {time_str}')
-            await redis_pool.enqueue_job("send_message", _defer_until=from_date, chat_id=message.from_user.id, 
-                                           text=f"Пришло время:\n{text_remind}")
-            await set_info_remind(message=message)
-            logger.log('info', f'Напоминание установлено для пользователя: {message.from_user.id}, текст: "{text_remind}", время: {from_date}')
-            asyncio.create_task(delete_expired_rows())
+            reply = f'📝 Ваше напоминание: "{text_remind}"\n🗓 Дата: {date_str} \n⏰ Время: {time_str}'
+            if parsed.recurrence:
+                reply += f'\n🔁 Повтор: {describe_recurrence(parsed.recurrence)}'
+            await message.answer(reply)
+            logger.log('info', 'Напоминание установлено для пользователя: %s, текст: "%s", время: %s', message.from_user.id, text_remind, from_date)
 
     except (IndexError, ValueError) as e:
         await message.reply("⚠ Введите напоминание еще раз, но, указав дату и время 🥷\n⚠ Минимальное время - 1 минута 🥷")
-        logger.log('error', f'Ошибка при анализе напоминания для пользователя: {message.from_user.id}. Ошибка: {e}')
+        logger.log('error', 'Ошибка при анализе напоминания для пользователя: %s. Ошибка: %s', message.from_user.id, e)
     except Exception as e:
         await message.reply("Произошла ошибка при анализе напоминания.")
-        logger.log('error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: {e}')
+        logger.log('error', 'Произошла ошибка для пользователя: %s. Ошибка: %s', message.from_user.id, e)
 
 
-async def handle_delete_reminder(message: types.Message) -> None:
+async def handle_delete_reminder(message: types.Message, redis_pool: ArqRedis) -> None:
     """Обработать удаление напоминания.
 
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
+        redis_pool (ArqRedis): Пул соединений Redis для отмены задачи доставки.
     """
-    logger.log('info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
+    logger.log('info', 'Команда /delete_reminder выполнена пользователем: %s', message.from_user.id)
 
     try:
         # Проверка на корректный номер напоминания
         reminder_number = int(message.text.split()[1])
-        reminders = await get_all_reminders(message)
+        deleted = await delete_reminder_at(message.from_user.id, reminder_number, redis_pool)
 
-        if reminder_number < 1 or reminder_number > len(reminders):
+        if deleted is None:
             raise ValueError("Номер напоминания вне диапазона.")
 
-        reminder_id = reminders[reminder_number - 1]['id']
-        result = await delete_reminder(message, reminder_id)
-        await message.reply(result)
-        logger.log('info', f'Напоминание с ID {reminder_id} удалено для пользователя: {message.from_user.id}')
+        await message.reply(f'Напоминание "{deleted["text"]}" успешно удалено.')
+        logger.log('info', 'Напоминание с ID %s удалено для пользователя: %s', deleted["id"], message.from_user.id)
     except (IndexError, ValueError) as e:
         await message.reply("Пожалуйста, укажите корректный номер напоминания.")
-        logger.log('error', f'Ошибка: неверный номер напоминания для пользователя: {message.from_user.id}. Ошибка: {e}')
+        logger.log('error', 'Ошибка: неверный номер напоминания для пользователя: %s. Ошибка: %s', message.from_user.id, e)
     except Exception as e:
         await message.reply("Произошла ошибка при удалении напоминания.")
-        logger.log('error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: {e}')
+        logger.log('error', 'Произошла ошибка для пользователя: %s. Ошибка: %s', message.from_user.id, e)
 
 
-async def handle_edit_reminder(message: types.Message) -> None:
+async def handle_edit_reminder(message: types.Message, redis_pool: ArqRedis) -> None:
     """Обработать редактирование напоминания.
 
     Аргументы:
         message (types.Message): Входящее сообщение от пользователя.
+        redis_pool (ArqRedis): Пул соединений Redis для переноса задачи доставки.
     """
-    logger.log('info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
+    logger.log('info', 'Команда /edit_reminder выполнена пользователем: %s', message.from_user.id)
 
     try:
         # Проверка на корректность формата ввода
@@ -150,35 +357,89 @@ async def handle_edit_reminder(message: types.Message) -> None:
 
         new_date = datetime.strptime(new_date_str, "%Y-%m-%d %H:%M:%S")
 
-        reminders = await get_all_reminders(message)
+        # Проверка на корректность времени, как при установке напоминания
+        if new_date < datetime.now():
+            await message.reply("⚠ Минимальное время - 1 минута")
+            logger.log('error', 'Попытка перенести напоминание в прошлое для пользователя: %s', message.from_user.id)
+            return
+
+        updated = await update_reminder_at(message.from_user.id, reminder_number, new_text, new_date, redis_pool)
 
         # Проверка на корректный номер напоминания
-        if reminder_number < 1 or reminder_number > len(reminders):
+        if updated is None:
             raise ValueError("Номер напоминания вне диапазона.")
 
-        reminder_id = reminders[reminder_number - 1]['id']
-        result = await update_reminder(reminder_id, new_text, new_date, message.from_user.id)
-        await message.reply(result)
-        logger.log('info', f'Напоминание с ID {reminder_id} обновлено для пользователя: {message.from_user.id}')
+        await message.reply(f'Напоминание успешно обновлено!\n📝 "{updated["text"]}"\n🗓 {updated["datetime"]}')
+        logger.log('info', 'Напоминание с ID %s обновлено для пользователя: %s', updated["id"], message.from_user.id)
 
     except ValueError as e:
         await message.reply("Пожалуйста, укажите корректный номер напоминания, новый текст и дату.")
-        logger.log('error', f'Ошибка: {e} для пользователя: {message.from_user.id}')
+        logger.log('error', 'Ошибка: %s для пользователя: %s', e, message.from_user.id)
 
     except Exception as e:
         await message.reply("Произошла ошибка при редактировании напоминания.")
-        logger.log('error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: {e}')
+        logger.log('error', 'Произошла ошибка для пользователя: %s. Ошибка: %s', message.from_user.id, e)
+
+
+async def cmd_profile(message: types.Message) -> None:
+    """Обработать команду администратора /profile on|off|dump.
+
+    on включает профилирование обработчиков, off выключает, dump сохраняет
+    профили самых долгих вызовов на диск.
+
+    Аргументы:
+        message (types.Message): Входящее сообщение от пользователя.
+    """
+    if message.from_user.id not in profiler.admin_ids:
+        logger.log('error', 'Команда /profile от пользователя без прав: %s', message.from_user.id)
+        return
+
+    action = message.get_args().strip()
+    if action == 'on':
+        profiler.start()
+        await message.reply("Профилирование включено")
+    elif action == 'off':
+        profiler.stop()
+        await message.reply("Профилирование выключено")
+    elif action == 'dump':
+        paths = await asyncio.to_thread(profiler.dump)
+        await message.reply(f"Сохранено профилей: {len(paths)} в {profiler.directory}")
+    else:
+        await message.reply("Использование: /profile on|off|dump")
+    logger.log('info', 'Команда /profile %s выполнена пользователем: %s', action, message.from_user.id)
+
+
+def instrument(handler: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+    """Обернуть обработчик метриками и профилировщиком.
+
+    Аргументы:
+        handler (Callable): Обработчик обновления.
+
+    Возвращает:
+        Callable: Обернутый обработчик.
+    """
+    return timed_handler(profiler.wrap(handler))
 
 
 def register_user_handlers(dp: Dispatcher, redis_pool: ArqRedis) -> None:
     """Зарегистрировать обработчики команд пользователя в диспетчере.
 
+    Время выполнения и исключения каждого обработчика записываются в метрики.
+    Команда /profile регистрируется, только если заданы ADMIN_IDS. Если
+    DELIVERY_BACKEND не arq, обработчики не ставят задачи в очередь: напоминания
+    доставляет колесо таймеров по изменениям в main_schedule.
+
     Аргументы:
         dp (Dispatcher): Диспетчер для регистрации обработчиков.
         redis_pool (ArqRedis): Пул соединений Redis для планирования задач.
     """
-    dp.register_message_handler(cmd_start, commands=['start'])
-    dp.register_message_handler(handle_delete_reminder, commands=['delete_reminder'])
-    dp.register_message_handler(handle_edit_reminder, commands=['edit_reminder'])
-    dp.register_message_handler(list_reminder, Text(equals="Список моих напоминаний"))
-    dp.register_message_handler(partial(get_reminder_text, redis_pool=redis_pool))  # type: ignore
\ No newline at end of file
+    if DELIVERY_BACKEND != "arq":
+        redis_pool = None
+    dp.register_message_handler(instrument(cmd_start), commands=['start'])
+    if profiler.admin_ids:
+        dp.register_message_handler(cmd_profile, commands=['profile'])
+    dp.register_message_handler(instrument(partial(handle_delete_reminder, redis_pool=redis_pool)), commands=['delete_reminder'])  # type: ignore
+    dp.register_message_handler(instrument(partial(handle_edit_reminder, redis_pool=redis_pool)), commands=['edit_reminder'])  # type: ignore
+    dp.register_message_handler(instrument(list_reminder), Text(equals="Список моих напоминаний"))
+    dp.register_callback_query_handler(instrument(list_reminder_page), reminder_page_cb.filter())
+    dp.register_message_handler(instrument(partial(get_reminder_text, redis_pool=redis_pool)))  # type: ignore
@@ -1,4 +1,13 @@
-from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
+from datetime import datetime
+from typing import Optional
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+from aiogram.utils.callback_data import CallbackData
+
+# Кнопки листания списка: направление, порядковый номер, время и ID крайнего напоминания страницы
+reminder_page_cb = CallbackData('rl', 'direction', 'number', 'datetime', 'id')
+PAGE_DATETIME_FORMAT = '%Y%m%d%H%M%S%f'
+
 
 def get_main_kb() -> ReplyKeyboardMarkup:
     """Создать и вернуть основную клавиатуру для бота.
@@ -12,4 +21,47 @@ def get_main_kb() -> ReplyKeyboardMarkup:
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
     btn_we = KeyboardButton('Список моих напоминаний')
     keyboard.add(btn_we)
-    return keyboard
\ No newline at end of file
+    return keyboard
+
+
+def get_page_kb(page: list[dict], start: int, has_prev: bool, has_next: bool) -> Optional[InlineKeyboardMarkup]:
+    """Создать кнопки перехода к предыдущей и следующей странице списка напоминаний.
+
+    Аргументы:
+        page (list): Напоминания текущей страницы.
+        start (int): Порядковый номер первого напоминания на странице.
+        has_prev (bool): Есть ли предыдущая страница.
+        has_next (bool): Есть ли следующая страница.
+
+    Возвращает:
+        InlineKeyboardMarkup | None: Клавиатура с кнопками или None, если список помещается на одну страницу.
+    """
+    buttons = []
+    if has_prev:
+        first = page[0]
+        buttons.append(InlineKeyboardButton('◀ Назад', callback_data=reminder_page_cb.new(
+            direction='prev', number=start,
+            datetime=first["datetime"].strftime(PAGE_DATETIME_FORMAT), id=first["id"],
+        )))
+    if has_next:
+        last = page[-1]
+        buttons.append(InlineKeyboardButton('Вперед ▶', callback_data=reminder_page_cb.new(
+            direction='next', number=start + len(page) - 1,
+            datetime=last["datetime"].strftime(PAGE_DATETIME_FORMAT), id=last["id"],
+        )))
+    if not buttons:
+        return None
+
+    return InlineKeyboardMarkup().row(*buttons)
+
+
+def parse_page_cursor(callback_data: dict) -> tuple[datetime, int]:
+    """Получить время и ID крайнего напоминания страницы из данных кнопки.
+
+    Аргументы:
+        callback_data (dict): Данные кнопки, разобранные reminder_page_cb.
+
+    Возвращает:
+        tuple: Время и ID напоминания.
+    """
+    return datetime.strptime(callback_data["datetime"], PAGE_DATETIME_FORMAT), int(callback_data["id"])
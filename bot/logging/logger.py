@@ -1,36 +1,213 @@
+import os
+import atexit
+import json
 import logging
+import queue
+import sys
+import time
+from datetime import datetime
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any, Optional
+
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from dotenv import load_dotenv
+
+load_dotenv('.env')
+
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+
+
+class SizeTimeRotatingFileHandler(RotatingFileHandler):
+    """Файловый обработчик с ротацией по размеру и по времени.
+
+    Файл ротируется, когда его размер превышает max_bytes или с последней
+    ротации прошло interval секунд. Старые файлы нумеруются как у RotatingFileHandler.
+
+    Атрибуты:
+        interval (float): Период ротации по времени в секундах, 0 отключает ее.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, interval: float) -> None:
+        """Инициализировать SizeTimeRotatingFileHandler.
+
+        Аргументы:
+            filename (str): Имя файла лога.
+            max_bytes (int): Максимальный размер файла в байтах, 0 отключает ротацию по размеру.
+            backup_count (int): Количество хранимых старых файлов, 0 отключает ротацию.
+            interval (float): Период ротации по времени в секундах, 0 отключает ее.
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Проверить, нужно ли ротировать файл перед записью."""
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        """Ротировать файл и назначить следующую ротацию по времени."""
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей лога в одну строку JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Преобразовать запись в строку JSON с полями user_id и handler."""
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname.lower(),
+            "message": record.getMessage(),
+            "user_id": getattr(record, 'user_id', None),
+            "handler": getattr(record, 'handler', None) or record.funcName,
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueListener(QueueListener):
+    """Фоновый поток, который строит записи лога из очереди и передает их обработчикам.
+
+    Вызывающий поток кладет в очередь только кортеж с шаблоном и аргументами, а
+    LogRecord создается и форматируется здесь. Поэтому аргументы не должны
+    изменяться после вызова лога: в коде бота это числа, строки и даты.
+    """
+
+    def __init__(self, records: queue.SimpleQueue, logger: logging.Logger, *handlers: logging.Handler) -> None:
+        """Инициализировать RecordQueueListener.
+
+        Аргументы:
+            records (queue.SimpleQueue): Очередь записей.
+            logger (logging.Logger): Логгер, от имени которого создаются записи.
+            *handlers (logging.Handler): Обработчики записей.
+        """
+        super().__init__(records, *handlers, respect_handler_level=True)
+        self.logger = logger
+
+    def prepare(self, item: tuple) -> logging.LogRecord:
+        """Создать LogRecord из элемента очереди."""
+        created, levelno, message, args, func_name, extra = item
+        record = self.logger.makeRecord(self.logger.name, levelno, '', 0, message, args, None,
+                                        func=func_name, extra=extra)
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return record
+
 
 class BotLogger:
     """Логгер для бота, который записывает сообщения в указанный файл.
 
+    Записи передаются через очередь фоновому потоку, который форматирует их в
+    строки JSON и пишет в файл, поэтому обработчики не ждут диска. Уровень
+    проверяется до построения записи, а сообщение собирается из шаблона с %
+    только в фоновом потоке.
+
     Атрибуты:
-        logger (logging.Logger): Объект логгера для записи логов.
+        logger (logging.Logger): Объект логгера, задающий минимальный уровень.
+        listener (RecordQueueListener): Фоновый поток записи в файл.
     """
 
-    def __init__(self, log_file: str) -> None:
+    def __init__(self, log_file: str, level: str = 'info', max_bytes: int = 0,
+                 backup_count: int = 0, interval: float = 0, name: str = "bot_logger") -> None:
         """Инициализировать BotLogger.
 
         Аргументы:
             log_file (str): Имя файла для записи логов.
+            level (str): Минимальный записываемый уровень ('debug', 'info', 'warning', 'error').
+            max_bytes (int): Размер файла, после которого он ротируется, 0 отключает ротацию по размеру.
+            backup_count (int): Количество хранимых старых файлов, 0 отключает ротацию.
+            interval (float): Период ротации по времени в секундах, 0 отключает ее.
+            name (str): Имя логгера в модуле logging.
         """
-        self.logger = logging.getLogger("bot_logger")
-        self.logger.setLevel(logging.DEBUG)
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(LEVELS.get(level.lower(), logging.INFO))
+
+        file_handler = SizeTimeRotatingFileHandler(log_file, max_bytes, backup_count, interval)
+        file_handler.setFormatter(JsonFormatter())
+
+        self._records: queue.SimpleQueue = queue.SimpleQueue()
+        self.listener = RecordQueueListener(self._records, self.logger, file_handler)
+        self._running = False
+        self.start()
+        atexit.register(self.stop)
+
+    @property
+    def is_running(self) -> bool:
+        """Запущен ли фоновый поток записи."""
+        return self._running
+
+    def start(self) -> None:
+        """Запустить фоновый поток записи, если он еще не запущен."""
+        if self._running:
+            return
 
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        self.listener.start()
+        self._running = True
 
-    def log(self, level: str, message: str) -> None:
+    def stop(self) -> None:
+        """Дописать оставшиеся записи в файл и остановить фоновый поток."""
+        if not self._running:
+            return
+
+        self._running = False
+        self.listener.stop()
+
+    def is_enabled(self, level: str) -> bool:
+        """Будет ли записано сообщение заданного уровня.
+
+        Аргументы:
+            level (str): Уровень логирования.
+
+        Возвращает:
+            bool: True, если уровень не ниже минимального.
+        """
+        return self.logger.isEnabledFor(LEVELS.get(level, logging.INFO))
+
+    def log(self, level: str, message: str, *args: Any, user_id: Optional[int] = None,
+            **fields: Any) -> None:
         """Записать сообщение в лог с заданным уровнем.
 
         Аргументы:
-            level (str): Уровень логирования ('info' или 'error').
-            message (str): Сообщение для записи в лог.
+            level (str): Уровень логирования ('debug', 'info', 'warning', 'error').
+            message (str): Сообщение или шаблон с % для записи в лог.
+            *args: Аргументы шаблона, подставляются только если запись будет сохранена.
+            user_id (int, optional): ID пользователя. По умолчанию берется из обрабатываемого обновления.
+            **fields: Дополнительные поля записи JSON.
         """
-        if level == 'info':
-            self.logger.info(message)
-        elif level == 'error':
-            self.logger.error(message)
+        levelno = LEVELS.get(level)
+        if levelno is None or not self.logger.isEnabledFor(levelno):
+            return
+
+        if user_id is None:
+            user = types.User.get_current()
+            user_id = user.id if user is not None else None
+        handler = current_handler.get(None)
+        handler = getattr(handler, 'func', handler)
+        func_name = sys._getframe(1).f_code.co_name
+
+        self._records.put_nowait((time.time(), levelno, message, args, func_name, {
+            "user_id": user_id,
+            "handler": getattr(handler, '__name__', None),
+            "fields": fields,
+        }))
+
 
-logger = BotLogger('bot.log')
\ No newline at end of file
+logger = BotLogger(
+    os.getenv("LOG_FILE", 'bot.log'),
+    level=os.getenv("LOG_LEVEL", 'info'),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", 5)),
+    interval=float(os.getenv("LOG_ROTATE_INTERVAL", 86400)),
+)
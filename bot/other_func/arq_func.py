@@ -1,37 +1,135 @@
 import os
 
 from aiogram import Bot
+from arq import Retry, cron
 from arq.connections import RedisSettings
+from arq.constants import default_queue_name
+from arq.utils import ms_to_datetime
 from dotenv import load_dotenv
 
+from bot.db.db_func import complete_reminder, load_reminder
+from bot.db.db_pool import db_pool
+from bot.db.reminder_cache import reminder_cache
+from bot.logging.logger import logger
+from bot.other_func.delivery import delivery_engine
+from bot.other_func.job_recovery import recover_jobs
+from bot.other_func.metrics import metrics_server, queue_depth_refresher
+from bot.other_func.profiling import profiler
+from bot.other_func.reminder_jobs import (delivery_kwargs, job_deserializer, job_serializer, migrate_legacy_jobs,
+                                          reconcile_jobs)
+
 load_dotenv('.env')
 
+# Через сколько секунд arq повторяет задачу, если напоминание не удалось доставить
+DELIVERY_RETRY_DEFER = 60
+# Через сколько секунд arq повторяет задачу, строка которой еще не видна: задача ставится
+# в очередь до фиксации транзакции со строкой и может начаться раньше нее
+MISSING_REMINDER_RETRY_DEFER = 5
+
 async def startup(ctx: dict) -> None:
-    """Инициализировать бота при запуске.
+    """Инициализировать бота и сервер метрик при запуске.
+
+    Задачи, поставленные в очередь до перехода на msgpack, переводятся в новый формат.
+    Если RECOVER_ON_STARTUP=1, недостающие задачи восстанавливаются из main_schedule,
+    например после очистки Redis.
 
     Аргументы:
-        ctx (dict): Контекст, в который будет добавлен объект бота.
+        ctx (dict): Контекст, в который будут добавлены объект бота и сервер метрик.
     """
     ctx['bot'] = Bot(token=os.getenv("TOKEN_API"))
+    reminder_cache.attach(ctx['redis'])
+    await db_pool.open()
+    await migrate_legacy_jobs(ctx['redis'])
+    if os.getenv("RECOVER_ON_STARTUP", "0") == "1":
+        await recover_jobs(ctx['redis'])
+    ctx['metrics'] = metrics_server("WORKER_METRICS_PORT", 9101)
+    ctx['metrics'].add_refresher(queue_depth_refresher(ctx['redis'], default_queue_name))
+    await ctx['metrics'].start()
+    if profiler.enabled:
+        profiler.start()
 
 async def shutdown(ctx: dict) -> None:
-    """Закрыть сессию бота при завершении работы.
+    """Закрыть сессию бота и сервер метрик при завершении работы.
 
     Аргументы:
-        ctx (dict): Контекст, содержащий объект бота.
+        ctx (dict): Контекст, содержащий объект бота и сервер метрик.
     """
+    await ctx['metrics'].stop()
+    profiler.stop()
+    profiler.dump()
+    logger.log('info', 'Статистика доставки напоминаний: %s', delivery_engine.stats())
     await ctx['bot'].session.close()
+    await db_pool.close()
 
-async def send_message(ctx: dict, chat_id: int, text: str) -> None:
-    """Отправить сообщение в указанный чат.
+async def send_message(ctx: dict, chat_id: int, text: str) -> bool:
+    """Отправить сообщение в указанный чат через движок доставки.
 
     Аргументы:
-        ctx (dict): Контекст, содержащий объект бота.
+        ctx (dict): Контекст, содержащий объект бота и запланированное время задачи.
         chat_id (int): ID чата, куда будет отправлено сообщение.
         text (str): Текст сообщения для отправки.
+
+    Возвращает:
+        bool: True, если сообщение доставлено.
     """
     bot: Bot = ctx['bot']
-    await bot.send_message(chat_id, text)
+    scheduled = ms_to_datetime(ctx['score']) if ctx.get('score') else None
+    return await delivery_engine.deliver(bot, chat_id, text, scheduled=scheduled)
+
+async def send_reminder(ctx: dict, reminder_id: int) -> bool:
+    """Доставить напоминание по его ID, загрузив текст из базы данных.
+
+    Строка удаляется, а повторяющееся напоминание переносится на следующее
+    повторение только после успешной отправки, поэтому при падении воркера
+    во время отправки arq повторит задачу и найдет напоминание. Неудачная
+    отправка повторяется задачей arq через DELIVERY_RETRY_DEFER секунд; после
+    последней попытки однократное напоминание остается в базе данных, а
+    повторяющееся переносится, чтобы не прервать повторы. Если строки с этой
+    задачей нет, задача повторяется через MISSING_REMINDER_RETRY_DEFER секунд:
+    транзакция, поставившая задачу, могла еще не зафиксироваться. После
+    последней попытки считается, что напоминание удалено или перенесено другой
+    задачей, и сообщение не отправляется.
+
+    Аргументы:
+        ctx (dict): Контекст, содержащий объект бота, пул Redis, ID задачи, номер попытки
+            и запланированное время задачи.
+        reminder_id (int): ID напоминания.
+
+    Возвращает:
+        bool: True, если сообщение доставлено.
+
+    Исключения:
+        Retry: Если напоминание не найдено или не доставлено и у задачи остались попытки.
+    """
+    reminder = await load_reminder(reminder_id, ctx.get('job_id'))
+    if reminder is None:
+        if ctx.get('job_try', 1) < WorkerSettings.max_tries:
+            raise Retry(defer=MISSING_REMINDER_RETRY_DEFER)
+        logger.log('info', 'Напоминание %s не доставлено: оно удалено или перенесено', reminder_id)
+        return False
+
+    chat_id, text_remind, recurrence = reminder
+    delivered = await send_message(ctx, **delivery_kwargs(chat_id, text_remind))
+    if not delivered and ctx.get('job_try', 1) < WorkerSettings.max_tries:
+        raise Retry(defer=DELIVERY_RETRY_DEFER)
+
+    if delivered or recurrence:
+        await complete_reminder(reminder_id, ctx.get('job_id'), ctx.get('redis'))
+    else:
+        logger.log('error', 'Напоминание %s не доставлено после %s попыток задачи и осталось в базе данных',
+                   reminder_id, ctx.get('job_try', 1))
+    return delivered
+
+async def reconcile_reminder_jobs(ctx: dict) -> int:
+    """Удалить из очереди задачи доставки удаленных напоминаний.
+
+    Аргументы:
+        ctx (dict): Контекст, содержащий пул соединений Redis.
+
+    Возвращает:
+        int: Количество удаленных задач.
+    """
+    return await reconcile_jobs(ctx['redis'])
 
 class WorkerSettings:
     """Настройки рабочего процесса для ARQ.
@@ -41,8 +139,21 @@ class WorkerSettings:
         on_startup (callable): Функция для выполнения при запуске.
         on_shutdown (callable): Функция для выполнения при завершении работы.
         functions (list): Список функций, доступных для выполнения.
+        cron_jobs (list): Периодические задачи воркера.
+        max_jobs (int): Максимальное количество одновременно выполняемых задач.
+        max_tries (int): Максимальное количество попыток одной задачи.
+        keep_result (int): Срок хранения результатов задач, 0 — результаты не хранятся.
+        job_serializer (callable): Сериализатор задач, тот же, что у пула бота.
+        job_deserializer (callable): Десериализатор задач.
     """
     redis_settings = RedisSettings
     on_startup = startup
     on_shutdown = shutdown
-    functions = [send_message]
\ No newline at end of file
+    # send_message остается для задач, поставленных до send_reminder, и для колеса таймеров
+    functions = [profiler.wrap(send_reminder), profiler.wrap(send_message)]
+    cron_jobs = [cron(reconcile_reminder_jobs, minute=set(range(0, 60, 10)))]
+    max_jobs = int(os.getenv("WORKER_MAX_JOBS", 100))
+    max_tries = 5
+    keep_result = 0
+    job_serializer = job_serializer
+    job_deserializer = job_deserializer
@@ -0,0 +1,279 @@
+import os
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.utils.exceptions import (BadRequest, ConflictError, MigrateToChat, NotFound, RetryAfter,
+                                      TelegramAPIError, Unauthorized)
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+from bot.other_func.metrics import DELIVERIES, DELIVERY_LAG_SECONDS
+
+load_dotenv('.env')
+
+# Ошибки, после которых повторная отправка не поможет: бот заблокирован, чат не найден и т.п.
+PERMANENT_ERRORS = (BadRequest, ConflictError, MigrateToChat, NotFound, Unauthorized)
+
+
+class TokenBucket:
+    """Ограничитель частоты "корзина токенов" с очередностью ожидающих.
+
+    Каждый вызов acquire резервирует ближайший свободный токен, поэтому ожидающие
+    отправки обслуживаются в порядке прихода и не соревнуются за освободившийся токен.
+    Вызов pause останавливает выдачу токенов, например на время RetryAfter.
+
+    Атрибуты:
+        rate (float): Количество токенов, добавляемых в секунду.
+        capacity (int): Максимальное количество токенов, доступных сразу.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Инициализировать TokenBucket.
+
+        Аргументы:
+            rate (float): Количество токенов, добавляемых в секунду.
+            capacity (int): Максимальное количество токенов, доступных сразу.
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._interval = 1 / rate
+        self._next_free = 0.0
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Зарезервировать токен.
+
+        Возвращает:
+            float: Сколько секунд нужно подождать до использования токена.
+        """
+        now = time.monotonic()
+        burst = (self.capacity - 1) * self._interval
+        slot = max(self._next_free, now - burst)
+        self._next_free = slot + self._interval
+        return max(slot - now, 0.0)
+
+    def pause(self, delay: float) -> None:
+        """Не выдавать токены заданное время.
+
+        Аргументы:
+            delay (float): Время паузы в секундах.
+        """
+        until = time.monotonic() + delay
+        self._paused_until = max(self._paused_until, until)
+        self._next_free = max(self._next_free, until)
+
+    async def acquire(self) -> None:
+        """Дождаться свободного токена."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        # Пауза, начатая во время ожидания, откладывает и уже зарезервированный токен
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+
+class ChatLimiter:
+    """Ограничитель частоты отправки сообщений в каждый отдельный чат.
+
+    Атрибуты:
+        interval (float): Минимальный интервал между сообщениями в один чат в секундах.
+        max_chats (int): Количество отслеживаемых чатов, после которого устаревшие записи удаляются.
+    """
+
+    def __init__(self, interval: float, max_chats: int = 10000) -> None:
+        """Инициализировать ChatLimiter.
+
+        Аргументы:
+            interval (float): Минимальный интервал между сообщениями в один чат в секундах.
+            max_chats (int): Количество отслеживаемых чатов, после которого устаревшие записи удаляются.
+        """
+        self.interval = interval
+        self.max_chats = max_chats
+        self._next_free: dict[int, float] = {}
+
+    def reserve(self, chat_id: int) -> float:
+        """Зарезервировать время отправки сообщения в чат.
+
+        Аргументы:
+            chat_id (int): ID чата.
+
+        Возвращает:
+            float: Сколько секунд нужно подождать до отправки.
+        """
+        now = time.monotonic()
+        if len(self._next_free) >= self.max_chats:
+            self._next_free = {chat: slot for chat, slot in self._next_free.items() if slot > now}
+
+        slot = max(self._next_free.get(chat_id, 0.0), now)
+        self._next_free[chat_id] = slot + self.interval
+        return slot - now
+
+    def postpone(self, chat_id: int, delay: float) -> None:
+        """Запретить отправку в чат на заданное время, например после RetryAfter.
+
+        Аргументы:
+            chat_id (int): ID чата.
+            delay (float): Время запрета в секундах.
+        """
+        until = time.monotonic() + delay
+        self._next_free[chat_id] = max(self._next_free.get(chat_id, 0.0), until)
+
+    async def acquire(self, chat_id: int) -> None:
+        """Дождаться своей очереди на отправку в чат.
+
+        Аргументы:
+            chat_id (int): ID чата.
+        """
+        delay = self.reserve(chat_id)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class DeliveryEngine:
+    """Отправка напоминаний с учетом ограничений Telegram.
+
+    Каждое сообщение проходит через ограничитель чата, общую корзину токенов и
+    ограничение на количество одновременных запросов. Временные ошибки повторяются
+    с экспоненциальной задержкой, а RetryAfter — через указанное Telegram время.
+    RetryAfter относится ко всему боту, поэтому на это время останавливается
+    и отправка в остальные чаты.
+
+    Атрибуты:
+        bucket (TokenBucket): Общее ограничение частоты отправки.
+        chats (ChatLimiter): Ограничение частоты отправки в каждый чат.
+        concurrency (int): Максимальное количество одновременных запросов к Telegram.
+        max_retries (int): Максимальное количество повторов одного сообщения.
+        backoff (float): Начальная задержка перед повтором в секундах.
+        delivered (int): Количество доставленных сообщений.
+        failed (int): Количество сообщений, которые не удалось доставить.
+        retries (int): Количество повторных попыток.
+    """
+
+    def __init__(self, rate: float, burst: int, chat_interval: float, concurrency: int,
+                 max_retries: int, backoff: float) -> None:
+        """Инициализировать DeliveryEngine.
+
+        Аргументы:
+            rate (float): Максимальное количество сообщений в секунду для всего бота.
+            burst (int): Количество сообщений, которое можно отправить сразу после простоя.
+            chat_interval (float): Минимальный интервал между сообщениями в один чат в секундах.
+            concurrency (int): Максимальное количество одновременных запросов к Telegram.
+            max_retries (int): Максимальное количество повторов одного сообщения.
+            backoff (float): Начальная задержка перед повтором в секундах.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.chats = ChatLimiter(chat_interval)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Обнулить счетчики доставки."""
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._first_delivery: Optional[float] = None
+        self._last_delivery: Optional[float] = None
+
+    async def deliver(self, bot: Bot, chat_id: int, text: str,
+                      scheduled: Optional[datetime] = None) -> bool:
+        """Отправить сообщение, соблюдая ограничения и повторяя временные ошибки.
+
+        Аргументы:
+            bot (Bot): Объект бота.
+            chat_id (int): ID чата, куда будет отправлено сообщение.
+            text (str): Текст сообщения.
+            scheduled (datetime, optional): Запланированное время доставки для подсчета задержки.
+
+        Возвращает:
+            bool: True, если сообщение доставлено.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+
+        attempt = 0
+        while True:
+            await self.chats.acquire(chat_id)
+            await self.bucket.acquire()
+            try:
+                async with self._slots:
+                    await bot.send_message(chat_id, text)
+            except RetryAfter as e:
+                delay = e.timeout
+                self.chats.postpone(chat_id, delay)
+                self.bucket.pause(delay)
+            except PERMANENT_ERRORS as e:
+                self.failed += 1
+                DELIVERIES.labels('failed').inc()
+                logger.log('error', 'Напоминание для чата %s не доставлено: %s', chat_id, e)
+                return False
+            except (TelegramAPIError, asyncio.TimeoutError) as e:
+                delay = self.backoff * 2 ** attempt
+                logger.log('error', 'Ошибка отправки в чат %s, повтор через %s с: %s', chat_id, delay, e)
+            else:
+                self._record(scheduled)
+                return True
+
+            attempt += 1
+            if attempt > self.max_retries:
+                self.failed += 1
+                DELIVERIES.labels('failed').inc()
+                logger.log('error', 'Напоминание для чата %s не доставлено после %s попыток', chat_id, attempt)
+                return False
+            self.retries += 1
+            DELIVERIES.labels('retried').inc()
+            await asyncio.sleep(delay)
+
+    def _record(self, scheduled: Optional[datetime]) -> None:
+        """Учесть успешную доставку в счетчиках.
+
+        Аргументы:
+            scheduled (datetime, optional): Запланированное время доставки.
+        """
+        now = time.monotonic()
+        self.delivered += 1
+        DELIVERIES.labels('delivered').inc()
+        self._first_delivery = self._first_delivery or now
+        self._last_delivery = now
+        if scheduled is not None:
+            lag = max((datetime.now(scheduled.tzinfo) - scheduled).total_seconds(), 0.0)
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            DELIVERY_LAG_SECONDS.observe(lag)
+
+    def stats(self) -> dict:
+        """Вернуть счетчики доставки.
+
+        Возвращает:
+            dict: Количество доставленных, недоставленных сообщений и повторов,
+                  скорость доставки в сообщениях в секунду, средняя и максимальная
+                  задержка относительно запланированного времени в секундах.
+        """
+        elapsed = (self._last_delivery or 0.0) - (self._first_delivery or 0.0)
+        rate = self.delivered / elapsed if elapsed > 0 else 0.0
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate": round(rate, 2),
+            "lag_avg": round(self._lag_total / self.delivered, 3) if self.delivered else 0.0,
+            "lag_max": round(self._lag_max, 3),
+        }
+
+
+delivery_engine = DeliveryEngine(
+    rate=float(os.getenv("DELIVERY_RATE", 25)),
+    burst=int(os.getenv("DELIVERY_BURST", 5)),
+    chat_interval=float(os.getenv("DELIVERY_CHAT_INTERVAL", 1)),
+    concurrency=int(os.getenv("DELIVERY_CONCURRENCY", 20)),
+    max_retries=int(os.getenv("DELIVERY_MAX_RETRIES", 5)),
+    backoff=float(os.getenv("DELIVERY_BACKOFF", 1)),
+)
@@ -0,0 +1,177 @@
+import os
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from arq import ArqRedis, create_pool
+from arq.connections import RedisSettings
+from arq.constants import in_progress_key_prefix, job_key_prefix
+from dotenv import load_dotenv
+
+from bot.db.db_pool import db_pool
+from bot.logging.logger import logger
+from bot.other_func.reminder_jobs import add_enqueue, job_deserializer, job_serializer, new_job_id
+
+load_dotenv('.env')
+
+# Напоминания, срок которых прошел не больше этого времени назад, тоже ставятся в очередь:
+# задача доставки удаляет строку, поэтому оставшаяся строка еще не доставлена
+RECOVER_LOOKBACK = timedelta(seconds=float(os.getenv("RECOVER_LOOKBACK", 3600)))
+# Как часто recover_jobs пишет в лог прогресс, в секундах
+RECOVER_PROGRESS_INTERVAL = 5.0
+
+
+class RecoveryStats(NamedTuple):
+    """Итог восстановления очереди.
+
+    Атрибуты:
+        scanned (int): Количество просмотренных напоминаний.
+        enqueued (int): Количество поставленных в очередь задач.
+        elapsed (float): Длительность восстановления в секундах.
+    """
+    scanned: int
+    enqueued: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Скорость просмотра напоминаний в строках в секунду."""
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+
+async def recover_jobs(redis_pool: ArqRedis, batch_size: int = 1000, lookback: timedelta = RECOVER_LOOKBACK,
+                       dry_run: bool = False) -> RecoveryStats:
+    """Поставить в очередь задачи доставки для напоминаний, у которых их нет.
+
+    Напоминания читаются серверным курсором пачками по batch_size, поэтому
+    память не зависит от размера таблицы. Для каждой пачки одним pipeline
+    проверяется, есть ли в Redis задача напоминания, и вторым pipeline ставятся
+    недостающие задачи с прежним ID. Напоминаниям без ID задачи он назначается
+    в базе данных только если поле все еще пустое. Поэтому повторный запуск
+    не создает дубликатов, а запуск вместе с ботом не перезаписывает его задачи.
+    Повторяющиеся напоминания восстанавливаются независимо от lookback: иначе
+    строка застрянет в старой секции и не даст ее удалить.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis с сериализатором задач бота.
+        batch_size (int): Количество напоминаний в одной пачке.
+        lookback (timedelta): Насколько давно могло наступить время напоминания.
+        dry_run (bool): Только посчитать недостающие задачи, ничего не меняя.
+
+    Возвращает:
+        RecoveryStats: Количество просмотренных напоминаний и поставленных задач.
+    """
+    started = time.perf_counter()
+    next_progress = started + RECOVER_PROGRESS_INTERVAL
+    scanned = enqueued = 0
+
+    async with db_pool.connection() as connection:
+        async with connection.cursor(name='recover_jobs') as cursor:
+            cursor.itersize = batch_size
+            await cursor.execute(
+                """SELECT id, job_id, reminder_datetime FROM main_schedule
+                   WHERE reminder_datetime >= %s OR recurrence IS NOT NULL ORDER BY reminder_datetime""",
+                (datetime.now() - lookback,)
+            )
+            while rows := await cursor.fetchmany(batch_size):
+                scanned += len(rows)
+                enqueued += await _recover_batch(redis_pool, rows, dry_run)
+
+                if time.perf_counter() >= next_progress:
+                    next_progress = time.perf_counter() + RECOVER_PROGRESS_INTERVAL
+                    elapsed = time.perf_counter() - started
+                    logger.log('info', 'Восстановление очереди: просмотрено %s, поставлено %s, %.0f строк/с',
+                               scanned, enqueued, scanned / elapsed)
+
+    stats = RecoveryStats(scanned, enqueued, time.perf_counter() - started)
+    logger.log('info', 'Восстановление очереди завершено: просмотрено %s, поставлено %s за %.1f с, %.0f строк/с',
+               stats.scanned, stats.enqueued, stats.elapsed, stats.rate)
+    return stats
+
+
+async def _recover_batch(redis_pool: ArqRedis, rows: list, dry_run: bool) -> int:
+    """Поставить недостающие задачи для одной пачки напоминаний.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        rows (list): Строки (ID напоминания, ID задачи, время напоминания).
+        dry_run (bool): Только посчитать недостающие задачи.
+
+    Возвращает:
+        int: Количество недостающих задач.
+    """
+    linked = [row for row in rows if row[1]]
+    async with redis_pool.pipeline(transaction=False) as pipe:
+        for _, job_id, _ in linked:
+            pipe.exists(job_key_prefix + job_id, in_progress_key_prefix + job_id)
+        live = await pipe.execute()
+
+    missing = [(reminder_id, job_id, when) for (reminder_id, job_id, when), exists in zip(linked, live) if not exists]
+    unlinked = [(reminder_id, when) for reminder_id, job_id, when in rows if not job_id]
+    if dry_run:
+        return len(missing) + len(unlinked)
+
+    if unlinked:
+        missing += await _link_jobs(unlinked)
+    if not missing:
+        return 0
+
+    async with redis_pool.pipeline(transaction=False) as pipe:
+        for reminder_id, job_id, when in missing:
+            add_enqueue(pipe, redis_pool, job_id, when, reminder_id)
+        await pipe.execute()
+    return len(missing)
+
+
+async def _link_jobs(unlinked: list) -> list:
+    """Назначить ID задач напоминаниям, у которых его нет.
+
+    Аргументы:
+        unlinked (list): Пары (ID напоминания, время напоминания).
+
+    Возвращает:
+        list: Тройки (ID напоминания, ID задачи, время) для напоминаний, которым ID назначен.
+    """
+    job_ids = {reminder_id: new_job_id() for reminder_id, _ in unlinked}
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """UPDATE main_schedule AS schedule SET job_id = new.job_id
+               FROM unnest(%s::bigint[], %s::varchar[]) AS new(id, job_id)
+               WHERE schedule.id = new.id AND schedule.job_id IS NULL
+               RETURNING schedule.id""",
+            (list(job_ids), list(job_ids.values()))
+        )
+        updated = {row[0] for row in await cursor.fetchall()}
+    return [(reminder_id, job_ids[reminder_id], when) for reminder_id, when in unlinked if reminder_id in updated]
+
+
+async def main(args: argparse.Namespace) -> RecoveryStats:
+    """Восстановить очередь задач доставки из main_schedule.
+
+    Аргументы:
+        args (argparse.Namespace): Параметры командной строки.
+
+    Возвращает:
+        RecoveryStats: Итог восстановления.
+    """
+    redis_pool = await create_pool(RedisSettings, job_serializer=job_serializer, job_deserializer=job_deserializer)
+    await db_pool.open()
+    try:
+        stats = await recover_jobs(redis_pool, args.batch_size, timedelta(seconds=args.lookback), args.dry_run)
+    finally:
+        await db_pool.close()
+        await redis_pool.close()
+    print(f"{'would enqueue' if args.dry_run else 'enqueued'} {stats.enqueued} of {stats.scanned} reminders "
+          f"in {stats.elapsed:.1f}s ({stats.rate:.0f} rows/s)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Восстановление очереди задач доставки из main_schedule")
+    parser.add_argument("--batch-size", type=int, default=1000, help="напоминаний в одной пачке")
+    parser.add_argument("--lookback", type=float, default=RECOVER_LOOKBACK.total_seconds(),
+                        help="сколько секунд назад могло наступить время напоминания")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать недостающие задачи")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,187 @@
+import os
+import functools
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+# Границы для быстрых операций: обработчики, запросы и разбор занимают от долей миллисекунды до секунд
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Задержка доставки измеряется от запланированного времени и может доходить до минут
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+HANDLER_SECONDS = Histogram('nudgeninja_handler_seconds', 'Время выполнения обработчика обновления',
+                            ['handler'], buckets=LATENCY_BUCKETS)
+HANDLER_ERRORS = Counter('nudgeninja_handler_errors_total', 'Необработанные исключения в обработчиках',
+                         ['handler'])
+DB_SECONDS = Histogram('nudgeninja_db_seconds', 'Время выполнения функций db_func',
+                       ['function'], buckets=LATENCY_BUCKETS)
+PARSE_SECONDS = Histogram('nudgeninja_parse_seconds', 'Время разбора текста напоминания',
+                          ['path'], buckets=LATENCY_BUCKETS)
+DELIVERY_LAG_SECONDS = Histogram('nudgeninja_delivery_lag_seconds',
+                                 'Задержка доставки относительно запланированного времени',
+                                 buckets=LAG_BUCKETS)
+DELIVERIES = Counter('nudgeninja_deliveries_total', 'Результаты доставки напоминаний', ['result'])
+QUEUE_DEPTH = Gauge('nudgeninja_queue_depth', 'Количество задач в очереди arq')
+KNOWN_USER_LOOKUPS = Counter('nudgeninja_known_user_lookups_total',
+                            'Проверки пользователя в кэше известных пользователей', ['result'])
+REMINDER_CACHE_LOOKUPS = Counter('nudgeninja_reminder_cache_lookups_total',
+                                 'Чтения первой страницы списка напоминаний из кэша Redis', ['result'])
+THROTTLE_DECISIONS = Counter('nudgeninja_throttle_total', 'Решения ограничителя частоты обновлений',
+                            ['budget', 'result'])
+
+
+def timed(histogram: Histogram, name: Optional[str] = None,
+          errors: Optional[Counter] = None) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Декоратор, записывающий время выполнения корутины в гистограмму.
+
+    Обертка сохраняет __wrapped__, поэтому aiogram видит аргументы исходной
+    функции, а patch в тестах по-прежнему подменяет функцию по имени модуля.
+
+    Аргументы:
+        histogram (Histogram): Гистограмма с одной меткой.
+        name (str, optional): Значение метки. По умолчанию имя функции.
+        errors (Counter, optional): Счетчик исключений с той же меткой.
+
+    Возвращает:
+        Callable: Декоратор.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        label = name or getattr(func, 'func', func).__name__
+        # Дочерние метрики создаются один раз, а не при каждом вызове
+        observe = histogram.labels(label).observe
+        count_error = errors.labels(label).inc if errors is not None else None
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                if count_error is not None:
+                    count_error()
+                raise
+            finally:
+                observe(time.perf_counter() - started)
+
+        wrapper.__name__ = label
+        return wrapper
+
+    return decorator
+
+
+def timed_handler(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Обернуть обработчик aiogram, включая зарегистрированный через partial.
+
+    Аргументы:
+        handler (Callable): Обработчик обновления.
+
+    Возвращает:
+        Callable: Обработчик, записывающий время выполнения и исключения.
+    """
+    return timed(HANDLER_SECONDS, errors=HANDLER_ERRORS)(handler)
+
+
+class MetricsServer:
+    """HTTP сервер с метриками в текстовом формате Prometheus.
+
+    Перед каждым ответом вызываются функции обновления, например подсчет
+    длины очереди, поэтому значения, требующие запроса к Redis, считаются
+    только когда их запрашивают.
+
+    Атрибуты:
+        host (str): Адрес, на котором слушает сервер.
+        port (int): Порт сервера, 0 отключает его.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        """Инициализировать MetricsServer.
+
+        Аргументы:
+            host (str): Адрес, на котором слушает сервер.
+            port (int): Порт сервера, 0 отключает его.
+        """
+        self.host = host
+        self.port = port
+        self._refreshers: List[Callable[[], Awaitable[None]]] = []
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_refresher(self, refresher: Callable[[], Awaitable[None]]) -> None:
+        """Добавить функцию, обновляющую метрики перед ответом.
+
+        Аргументы:
+            refresher (Callable): Корутина без аргументов.
+        """
+        self._refreshers.append(refresher)
+
+    def make_app(self) -> web.Application:
+        """Создать приложение aiohttp с путем /metrics.
+
+        Возвращает:
+            web.Application: Приложение aiohttp.
+        """
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Отдать текущие значения метрик."""
+        for refresher in self._refreshers:
+            try:
+                await refresher()
+            except Exception as e:
+                logger.log('error', 'Ошибка обновления метрик: %s', e)
+        return web.Response(body=generate_latest(REGISTRY), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+    async def start(self) -> None:
+        """Запустить сервер, если он включен."""
+        if self.port <= 0 or self._runner is not None:
+            return
+
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.log('info', 'Метрики доступны на %s:%s/metrics', self.host, self.port)
+
+    async def stop(self) -> None:
+        """Остановить сервер."""
+        if self._runner is None:
+            return
+
+        runner, self._runner = self._runner, None
+        await runner.cleanup()
+
+
+def queue_depth_refresher(redis: Any, queue_name: str) -> Callable[[], Awaitable[None]]:
+    """Создать функцию обновления длины очереди arq.
+
+    Аргументы:
+        redis (ArqRedis): Пул соединений Redis.
+        queue_name (str): Имя очереди arq.
+
+    Возвращает:
+        Callable: Корутина, записывающая длину очереди в QUEUE_DEPTH.
+    """
+    async def refresh() -> None:
+        QUEUE_DEPTH.set(await redis.zcard(queue_name))
+
+    return refresh
+
+
+def metrics_server(port_env: str, default_port: int) -> MetricsServer:
+    """Создать MetricsServer с настройками из окружения.
+
+    Аргументы:
+        port_env (str): Имя переменной окружения с портом.
+        default_port (int): Порт по умолчанию.
+
+    Возвращает:
+        MetricsServer: Сервер метрик.
+    """
+    return MetricsServer(os.getenv("METRICS_HOST", "0.0.0.0"), int(os.getenv(port_env, default_port)))
@@ -0,0 +1,166 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+
+def _init_worker() -> None:
+    """Загрузить словари periodparser один раз при старте процесса-воркера."""
+    import periodparser as pp
+
+    pp.extract("завтра в 10:00")
+
+
+class ParseExecutor:
+    """Пул процессов для разбора сообщений вне цикла событий.
+
+    Количество одновременно ожидающих разбора сообщений ограничено: когда очередь
+    заполнена, новые вызовы ждут свободного места, а не копятся в памяти. Место
+    в очереди освобождается, только когда процесс-воркер закончил разбор, а пул
+    с разбором, не уложившимся в timeout, заменяется новым, поэтому зависший
+    разбор не занимает воркер и не выпадает из учета очереди.
+
+    Атрибуты:
+        workers (int): Количество процессов-воркеров, 0 отключает пул.
+        max_pending (int): Максимальное количество разборов в очереди и в работе.
+        timeout (float): Максимальное время разбора одного сообщения в секундах.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float) -> None:
+        """Инициализировать ParseExecutor.
+
+        Аргументы:
+            workers (int): Количество процессов-воркеров, 0 отключает пул.
+            max_pending (int): Максимальное количество разборов в очереди и в работе.
+            timeout (float): Максимальное время разбора одного сообщения в секундах.
+        """
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Запущен ли пул процессов."""
+        return self._pool is not None
+
+    def start(self) -> None:
+        """Запустить пул процессов, если он включен и еще не запущен."""
+        if self.workers <= 0 or self._pool is not None:
+            return
+
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self._slots = asyncio.Semaphore(self.max_pending)
+        logger.log('info', 'Пул разбора сообщений запущен: воркеров %s, очередь %s', self.workers, self.max_pending)
+
+    def shutdown(self) -> None:
+        """Остановить пул процессов, отменив еще не начатые разборы."""
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        pool.shutdown(wait=True, cancel_futures=True)
+        logger.log('info', 'Пул разбора сообщений остановлен')
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполнить функцию в процессе-воркере.
+
+        Если пул не запущен или уже остановлен, функция выполняется в текущем
+        процессе, как при выключенном пуле.
+
+        Аргументы:
+            func (Callable): Функция уровня модуля, которую можно передать в другой процесс.
+            *args: Аргументы функции.
+
+        Возвращает:
+            Any: Результат функции.
+
+        Исключения:
+            asyncio.TimeoutError: Если разбор не уложился в timeout.
+            BrokenProcessPool: Если пул сломался не из-за замены после таймаута
+                или разбор не удался и в замененном пуле.
+        """
+        return await self._submit(func, args, retry=True)
+
+    async def _submit(self, func: Callable[..., Any], args: tuple, retry: bool) -> Any:
+        """Выполнить функцию в текущем пуле, заняв место в очереди.
+
+        Аргументы:
+            func (Callable): Функция уровня модуля.
+            args (tuple): Аргументы функции.
+            retry (bool): Повторить разбор в новом пуле, если текущий заменен из-за таймаута другого разбора.
+
+        Возвращает:
+            Any: Результат функции.
+        """
+        if self._pool is None:
+            return func(*args)
+
+        await self._slots.acquire()
+        pool = self._pool
+        if pool is None:
+            self._slots.release()
+            return func(*args)
+        try:
+            future = asyncio.wrap_future(pool.submit(func, *args))
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            # shield: по таймауту отменяется только ожидание, а future завершится вместе с разбором
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._recycle(pool)
+            raise
+        except BrokenProcessPool:
+            # Пул заменен из-за таймаута другого разбора: повторить разбор в новом пуле один раз
+            if pool is self._pool or not retry:
+                raise
+            return await self._submit(func, args, retry=False)
+
+    def _release(self, future: asyncio.Future) -> None:
+        """Освободить место в очереди после окончания разбора в процессе-воркере."""
+        self._slots.release()
+        # Ошибка разбора, который уже не ждут после таймаута, не должна попадать в лог asyncio
+        if not future.cancelled():
+            future.exception()
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        """Заменить пул с зависшим разбором новым и завершить его процессы.
+
+        Разборы, выполнявшиеся в старом пуле, завершаются с BrokenProcessPool
+        и освобождают свои места в очереди.
+
+        Аргументы:
+            pool (ProcessPoolExecutor): Пул, в котором разбор не уложился в timeout.
+        """
+        if pool is not self._pool:
+            return
+
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        # shutdown(wait=False) не останавливает процесс, занятый зависшим разбором: он держал бы
+        # CPU и память до конца разбора. Публичного способа остановить его у ProcessPoolExecutor нет,
+        # а процессы, которые он сам создает, доступны только через _processes (словарь PID -> Process
+        # со времен Python 3.2). Если атрибут изменится, пул просто останавливается без terminate.
+        processes = getattr(pool, '_processes', None) or {}
+        for process in list(processes.values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.log('warning', 'Разбор сообщения не уложился в %s с, пул разбора пересоздан', self.timeout)
+
+
+parse_executor = ParseExecutor(
+    workers=int(os.getenv("PARSE_WORKERS", 0)),
+    max_pending=int(os.getenv("PARSE_QUEUE_SIZE", 64)),
+    timeout=float(os.getenv("PARSE_TIMEOUT", 5)),
+)
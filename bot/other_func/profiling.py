@@ -0,0 +1,247 @@
+import os
+import functools
+import heapq
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional
+
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+
+def _frame_label(frame: Any) -> str:
+    """Подпись кадра стека в формате "функция (файл:строка)"."""
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+
+
+class ProfiledCall:
+    """Один вызов профилируемой корутины и собранные для него сэмплы стека.
+
+    Атрибуты:
+        name (str): Имя профилируемой функции.
+        started_at (datetime): Время начала вызова.
+        duration (float): Длительность вызова в секундах, заполняется по завершении.
+        samples (Counter): Количество сэмплов для каждого стека, стек записан через ';' от корня к листу.
+    """
+
+    __slots__ = ('name', 'coro', 'started_at', 'started', 'duration', 'samples')
+
+    def __init__(self, name: str, coro: Any) -> None:
+        """Инициализировать ProfiledCall.
+
+        Аргументы:
+            name (str): Имя профилируемой функции.
+            coro (Coroutine): Выполняемая корутина.
+        """
+        self.name = name
+        self.coro = coro
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+
+
+class Profiler:
+    """Сэмплирующий профилировщик обработчиков и задач воркера.
+
+    Фоновый поток раз в interval секунд снимает стек каждой выполняющейся
+    профилируемой корутины: если корутина сейчас работает, берется стек потока
+    цикла событий, а если ждет, то цепочка await, на которой она остановилась.
+    Поэтому профиль показывает и время CPU, и ожидание базы данных или сети.
+    Для каждого вызова стеки сворачиваются в формат collapsed stacks, а хранятся
+    только keep самых долгих вызовов.
+
+    Если профилирование не включено переменной окружения и нет администраторов,
+    которые могут включить его командой, wrap возвращает функцию без обертки.
+
+    Атрибуты:
+        enabled (bool): Включено ли профилирование при запуске.
+        admin_ids (frozenset): ID пользователей, которым доступна команда /profile.
+        interval (float): Период снятия сэмплов в секундах.
+        keep (int): Количество хранимых самых долгих вызовов.
+        directory (Path): Каталог для сохранения профилей.
+    """
+
+    def __init__(self, enabled: bool, admin_ids: frozenset, interval: float, keep: int, directory: str) -> None:
+        """Инициализировать Profiler.
+
+        Аргументы:
+            enabled (bool): Включено ли профилирование при запуске.
+            admin_ids (frozenset): ID пользователей, которым доступна команда /profile.
+            interval (float): Период снятия сэмплов в секундах.
+            keep (int): Количество хранимых самых долгих вызовов.
+            directory (str): Каталог для сохранения профилей.
+        """
+        self.enabled = enabled
+        self.admin_ids = admin_ids
+        self.interval = interval
+        self.keep = keep
+        self.directory = Path(directory)
+        self.active = False
+        self._calls: set[ProfiledCall] = set()
+        self._slowest: list[tuple[float, int, ProfiledCall]] = []
+        self._order = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+
+    @property
+    def available(self) -> bool:
+        """Может ли профилирование быть включено в этом процессе."""
+        return self.enabled or bool(self.admin_ids)
+
+    def wrap(self, func: Callable[..., Awaitable[Any]], name: Optional[str] = None) -> Callable[..., Awaitable[Any]]:
+        """Обернуть корутину для профилирования.
+
+        Пока профилировщик не запущен, обертка только проверяет флаг.
+
+        Аргументы:
+            func (Callable): Корутина или partial от нее.
+            name (str, optional): Имя в профилях. По умолчанию имя функции.
+
+        Возвращает:
+            Callable: Обертка или сама func, если профилирование недоступно.
+        """
+        if not self.available:
+            return func
+
+        label = name or getattr(func, 'func', func).__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self.active:
+                return await func(*args, **kwargs)
+
+            call = ProfiledCall(label, func(*args, **kwargs))
+            self._calls.add(call)
+            try:
+                return await call.coro
+            finally:
+                self._calls.discard(call)
+                call.duration = time.perf_counter() - call.started
+                self._remember(call)
+
+        wrapper.__name__ = label
+        return wrapper
+
+    def start(self) -> None:
+        """Запустить сэмплирование. Вызывается из потока цикла событий."""
+        if self.active:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        self.active = True
+        logger.log('info', 'Профилирование включено: период %s с, хранится %s вызовов', self.interval, self.keep)
+
+    def stop(self) -> None:
+        """Остановить сэмплирование, сохранив собранные профили в памяти."""
+        if not self.active:
+            return
+
+        self.active = False
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        logger.log('info', 'Профилирование выключено')
+
+    def slowest(self) -> List[ProfiledCall]:
+        """Вернуть сохраненные вызовы от самого долгого к самому быстрому."""
+        return [call for _, _, call in sorted(self._slowest, key=lambda item: item[0], reverse=True)]
+
+    def dump(self) -> List[Path]:
+        """Сохранить профили самых долгих вызовов и очистить их.
+
+        Каждый вызов записывается в отдельный файл .collapsed, который можно
+        передать flamegraph.pl или открыть в speedscope.
+
+        Возвращает:
+            list: Пути к записанным файлам.
+        """
+        calls, self._slowest = self.slowest(), []
+        if not calls:
+            return []
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for call in calls:
+            path = self.directory / (f'{call.started_at:%Y%m%d-%H%M%S-%f}-{call.name}-'
+                                     f'{call.duration * 1000:.0f}ms.collapsed')
+            lines = [f'{call.name};{stack} {count}' for stack, count in call.samples.most_common()]
+            path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            paths.append(path)
+        logger.log('info', 'Сохранено профилей: %s в %s', len(paths), self.directory)
+        return paths
+
+    def _remember(self, call: ProfiledCall) -> None:
+        """Сохранить вызов, если он входит в keep самых долгих."""
+        item = (call.duration, next(self._order), call)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, item)
+        elif call.duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def _sample_loop(self) -> None:
+        """Снимать сэмплы стеков, пока профилировщик не остановлен."""
+        while not self._stopped.wait(self.interval):
+            loop_frame = sys._current_frames().get(self._loop_thread_id)
+            for call in list(self._calls):
+                stack = self._stack(call.coro, loop_frame)
+                if stack:
+                    call.samples[';'.join(stack)] += 1
+
+    @staticmethod
+    def _stack(coro: Any, loop_frame: Any) -> List[str]:
+        """Стек корутины от корня к листу.
+
+        Аргументы:
+            coro (Coroutine): Профилируемая корутина.
+            loop_frame (FrameType, optional): Текущий кадр потока цикла событий.
+
+        Возвращает:
+            list: Подписи кадров или пустой список, если стек снять не удалось.
+        """
+        root = coro.cr_frame
+        if root is None:
+            return []
+
+        if coro.cr_running:
+            stack = []
+            frame = loop_frame
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame is root:
+                    return stack[::-1]
+                frame = frame.f_back
+            return []
+
+        stack = []
+        awaited = coro
+        while awaited is not None:
+            frame = getattr(awaited, 'cr_frame', None) or getattr(awaited, 'gi_frame', None)
+            if frame is None:
+                stack.append(type(awaited).__name__)
+                break
+            stack.append(_frame_label(frame))
+            awaited = getattr(awaited, 'cr_await', None) or getattr(awaited, 'gi_yieldfrom', None)
+        return stack
+
+
+profiler = Profiler(
+    enabled=os.getenv("PROFILE_ENABLED", "0") == "1",
+    admin_ids=frozenset(int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()),
+    interval=float(os.getenv("PROFILE_INTERVAL", 0.005)),
+    keep=int(os.getenv("PROFILE_KEEP", 20)),
+    directory=os.getenv("PROFILE_DIR", "profiles"),
+)
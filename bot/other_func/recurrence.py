@@ -0,0 +1,121 @@
+import re
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+# Правило повтора хранится в main_schedule.recurrence строкой из нескольких символов:
+# "D" — каждый день, "W" и номера дней недели (0 — понедельник) — по этим дням, например "W024".
+# Время повтора берется из reminder_datetime, поэтому правило не зависит от даты.
+DAILY = 'D'
+WEEKLY = 'W'
+# Время повтора, если в сообщении оно не указано
+DEFAULT_TIME = time(9, 0)
+
+WEEKDAY_STEMS = ('понедельник', 'вторник', 'сред', 'четверг', 'пятниц', 'суббот', 'воскресен')
+WEEKDAY_PLURALS = ('понедельникам', 'вторникам', 'средам', 'четвергам', 'пятницам', 'субботам', 'воскресеньям')
+_DAY = r'(?:понедельник(?:ам)?|вторник(?:ам)?|сред(?:у|ам)|четверг(?:ам)?|пятниц(?:у|ам)|суббот(?:у|ам)|воскресень(?:е|ям))'
+RECURRENCE_PHRASE = re.compile(
+    r'(?<!\S)(?:'
+    r'(?P<daily>каждый\s+день|ежедневно)'
+    r'|(?P<weekly>каждую\s+неделю|еженедельно)'
+    r'|(?P<workdays>по\s+будням)'
+    r'|(?P<weekends>по\s+выходным)'
+    rf'|(?P<days>(?:по|каждый|каждую|каждое)\s+{_DAY}(?:(?:\s*,\s*|\s+и\s+){_DAY})*)'
+    r')(?!\S)',
+    re.IGNORECASE
+)
+RECURRENCE_TIME = re.compile(r'(?<!\S)в\s+([01]?\d|2[0-3]):([0-5]\d)(?!\S)', re.IGNORECASE)
+
+
+def matches(rule: str, moment: datetime) -> bool:
+    """Проверить, приходится ли момент на день повтора.
+
+    Аргументы:
+        rule (str): Правило повтора.
+        moment (datetime): Проверяемый момент.
+
+    Возвращает:
+        bool: True, если в этот день напоминание повторяется.
+    """
+    return rule == DAILY or str(moment.weekday()) in rule[1:]
+
+
+def next_occurrence(rule: str, previous: datetime, now: Optional[datetime] = None) -> datetime:
+    """Вычислить следующее повторение напоминания.
+
+    Следующее повторение наступает в то же время дня, что и previous, позже now.
+    Повторы, пропущенные за время простоя, не навёрстываются.
+
+    Аргументы:
+        rule (str): Правило повтора.
+        previous (datetime): Время предыдущего повторения.
+        now (datetime, optional): Текущее время, по умолчанию datetime.now().
+
+    Возвращает:
+        datetime: Время следующего повторения.
+    """
+    now = now or datetime.now()
+    candidate = max(previous, datetime.combine(now.date() - timedelta(days=1), previous.time()))
+    while True:
+        candidate += timedelta(days=1)
+        if candidate > now and matches(rule, candidate):
+            return candidate
+
+
+def parse_recurrence(user_message: str, now: Optional[datetime] = None) -> Optional[tuple[str, datetime, str]]:
+    """Найти в сообщении фразу повтора, например "каждый день в 9:00" или "по понедельникам".
+
+    Аргументы:
+        user_message (str): Текст сообщения пользователя.
+        now (datetime, optional): Текущее время, по умолчанию datetime.now().
+
+    Возвращает:
+        tuple | None: Текст напоминания, время первого повторения и правило повтора
+                      или None, если фразы повтора нет.
+    """
+    match = RECURRENCE_PHRASE.search(user_message)
+    if match is None:
+        return None
+
+    now = now or datetime.now()
+    if match.group('daily'):
+        rule = DAILY
+    elif match.group('weekly'):
+        rule = WEEKLY + str(now.weekday())
+    elif match.group('workdays'):
+        rule = WEEKLY + '01234'
+    elif match.group('weekends'):
+        rule = WEEKLY + '56'
+    else:
+        words = match.group('days').lower().split()
+        days = {index for word in words for index, stem in enumerate(WEEKDAY_STEMS) if word.startswith(stem)}
+        rule = WEEKLY + ''.join(map(str, sorted(days)))
+
+    rest = user_message[:match.start()] + ' ' + user_message[match.end():]
+    at = RECURRENCE_TIME.search(rest)
+    if at is not None:
+        at_time = time(int(at.group(1)), int(at.group(2)))
+        rest = rest[:at.start()] + ' ' + rest[at.end():]
+    else:
+        at_time = DEFAULT_TIME
+
+    # Первое повторение — ближайший подходящий день, начиная с сегодняшнего
+    first = next_occurrence(rule, datetime.combine(now.date() - timedelta(days=1), at_time), now)
+    return ' '.join(rest.split()), first, rule
+
+
+def describe_recurrence(rule: str) -> str:
+    """Описать правило повтора для пользователя.
+
+    Аргументы:
+        rule (str): Правило повтора.
+
+    Возвращает:
+        str: Описание, например "каждый день" или "по понедельникам, средам".
+    """
+    if rule == DAILY:
+        return 'каждый день'
+    if rule == WEEKLY + '01234':
+        return 'по будням'
+    if rule == WEEKLY + '56':
+        return 'по выходным'
+    return 'по ' + ', '.join(WEEKDAY_PLURALS[int(day)] for day in rule[1:])
@@ -1,28 +1,363 @@
-from datetime import datetime
+import os
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
 import periodparser as pp
 from aiogram import types
+from dotenv import load_dotenv
 
-async def analyze_reminder_handlers(message: types.Message) -> tuple[str, datetime, str, str]:
-    """Анализировать текст сообщения и извлечь напоминание и дату.
+from bot.other_func.metrics import PARSE_SECONDS
+from bot.other_func.parse_executor import parse_executor
+from bot.other_func.recurrence import parse_recurrence
+
+load_dotenv('.env')
+
+
+class ReminderParse(NamedTuple):
+    """Результат разбора сообщения с напоминанием.
+
+    Атрибуты:
+        text (str): Текст напоминания без даты и времени.
+        from_date (datetime): Дата и время напоминания.
+        date_str (str): Строковое представление даты.
+        time_str (str): Строковое представление времени.
+        recurrence (str, optional): Правило повтора или None для однократного напоминания.
+    """
+    text: str
+    from_date: datetime
+    date_str: str
+    time_str: str
+    recurrence: Optional[str] = None
+
+
+class ParseCache:
+    """Ограниченный LRU-кэш результатов разбора сообщений.
+
+    Ключ кэша — нормализованный текст и текущая минута. periodparser отсчитывает
+    относительные фразы ("через 10 минут") от текущего времени с точностью до минуты,
+    поэтому результат из прошлой минуты никогда не будет выдан повторно.
+
+    Атрибуты:
+        maxsize (int): Максимальное количество хранимых результатов.
+        hits (int): Количество попаданий в кэш.
+        misses (int): Количество промахов кэша.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Инициализировать ParseCache.
+
+        Аргументы:
+            maxsize (int): Максимальное количество хранимых результатов.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[str, datetime], ReminderParse] = OrderedDict()
+
+    @staticmethod
+    def make_key(text: str, now: Optional[datetime] = None) -> tuple[str, datetime]:
+        """Построить ключ кэша для текста сообщения.
+
+        Аргументы:
+            text (str): Текст сообщения.
+            now (datetime, optional): Текущее время, по умолчанию datetime.now().
+
+        Возвращает:
+            tuple: Нормализованный текст и начало текущей минуты.
+        """
+        now = now or datetime.now()
+        return ' '.join(text.split()), now.replace(second=0, microsecond=0)
+
+    def get(self, key: tuple[str, datetime]) -> Optional[ReminderParse]:
+        """Получить результат разбора из кэша.
+
+        Аргументы:
+            key (tuple): Ключ, построенный make_key.
+
+        Возвращает:
+            ReminderParse | None: Сохраненный результат или None при промахе.
+        """
+        parsed = self._data.get(key)
+        if parsed is None:
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return parsed
+
+    def put(self, key: tuple[str, datetime], parsed: ReminderParse) -> None:
+        """Сохранить результат разбора, вытеснив самый старый при переполнении.
+
+        Аргументы:
+            key (tuple): Ключ, построенный make_key.
+            parsed (ReminderParse): Результат разбора.
+        """
+        self._data[key] = parsed
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очистить кэш и обнулить счетчики."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Вернуть счетчики кэша.
+
+        Возвращает:
+            dict: Размер кэша, количество попаданий и промахов.
+        """
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+parse_cache = ParseCache(maxsize=int(os.getenv("PARSE_CACHE_SIZE", 1024)))
+
+
+# Быстрый разбор самых частых форм сообщений без periodparser
+FAST_RELATIVE = re.compile(
+    r'(?<!\S)через\s+(\d{1,5})\s+(минуту|минуты|минут|мин|часов|часа|час)(?!\S)', re.IGNORECASE
+)
+# periodparser читает часы 0-4 как дневные ("завтра в 1:00" — 13:00), их разбор остается ему
+FAST_DAY_AT = re.compile(
+    r'(?<!\S)(завтра|послезавтра)\s+в\s+(0?[5-9]|1\d|2[0-3]):([0-5]\d)(?!\S)', re.IGNORECASE
+)
+# Единственное намеренное расхождение с periodparser: он не понимает YYYY-MM-DD, оставляет дату
+# в тексте и берет время на сегодня, а быстрый разбор берет явную дату (см. tests/test_fast_path.py)
+FAST_EXPLICIT = re.compile(
+    r'(?<!\S)(\d{4}-\d{2}-\d{2}\s+(?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d)?)(?!\S)'
+)
+FAST_PLAIN_WORD = re.compile(r'[^\W\d_]+')
+# Начала слов, которые periodparser может принять за дату или время
+FAST_DATE_STEMS = (
+    'завтр', 'послезавтр', 'сегодн', 'вчер', 'позавчер', 'через', 'сейчас', 'утр', 'вечер', 'дн', 'ден',
+    'ноч', 'полдн', 'полноч', 'обед', 'понедельн', 'вторн', 'сред', 'четверг', 'пятниц', 'суббот',
+    'воскрес', 'январ', 'феврал', 'март', 'апрел', 'июн', 'июл', 'август', 'сентябр',
+    'октябр', 'ноябр', 'декабр', 'мин', 'час', 'сек', 'недел', 'месяц', 'год', 'лет', 'сутк', 'выходн',
+    'будн', 'кажд', 'следующ', 'прошл', 'полчас', 'неск',
+)
+FAST_DATE_WORDS = frozenset({'май', 'мая', 'мае', 'маю', 'маем'})
+# Предлоги и союзы, которые periodparser присоединяет к соседней фразе времени
+FAST_JOINED_WORDS = frozenset({'в', 'во', 'на', 'с', 'со', 'и'})
+
+
+def format_reminder(text_remind: str, from_date: datetime) -> ReminderParse:
+    """Собрать результат разбора со строковыми представлениями даты и времени.
 
     Аргументы:
-        message (types.Message): Входящее сообщение от пользователя.
+        text_remind (str): Текст напоминания.
+        from_date (datetime): Дата и время напоминания.
+
+    Возвращает:
+        ReminderParse: Текст напоминания, дата и их строковые представления.
+    """
+    return ReminderParse(text_remind, from_date, from_date.strftime("%d %B"), from_date.strftime("%H:%M"))
+
+
+def fast_extract(user_message: str, now: Optional[datetime] = None) -> Optional[ReminderParse]:
+    """Разобрать частые формы сообщений без вызова periodparser.
+
+    Поддерживаются фразы "через N минут/часов", "завтра в HH:MM", "послезавтра в HH:MM"
+    и явная дата "YYYY-MM-DD HH:MM". Остальной текст должен состоять из обычных слов,
+    иначе разбор передается periodparser.
+
+    Аргументы:
+        user_message (str): Текст сообщения пользователя.
+        now (datetime, optional): Текущее время, по умолчанию datetime.now().
 
     Возвращает:
-        tuple: Кортеж, содержащий текст напоминания, дату начала,
-               строковое представление даты и время.
+        ReminderParse | None: Результат разбора или None, если форма не распознана.
     """
-    user_message = message.text
+    matches = [
+        (pattern, match)
+        for pattern in (FAST_RELATIVE, FAST_DAY_AT, FAST_EXPLICIT)
+        for match in pattern.finditer(user_message)
+    ]
+    if len(matches) != 1:
+        return None
+
+    pattern, match = matches[0]
+    before, after = user_message[:match.start()].split(), user_message[match.end():].split()
+    neighbours = before[-1:] + after[:1]
+    if any(word.lower() in FAST_JOINED_WORDS for word in neighbours):
+        return None
+
+    words = before + after
+    for word in words:
+        lowered = word.lower()
+        if not FAST_PLAIN_WORD.fullmatch(word) or lowered.startswith(FAST_DATE_STEMS) or lowered in FAST_DATE_WORDS:
+            return None
+
+    # periodparser отсчитывает относительное время от начала текущей минуты
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    if pattern is FAST_RELATIVE:
+        amount, unit = int(match.group(1)), match.group(2).lower()
+        delta = timedelta(hours=amount) if unit.startswith('час') else timedelta(minutes=amount)
+        from_date = now + delta
+    elif pattern is FAST_DAY_AT:
+        days = 2 if match.group(1).lower() == 'послезавтра' else 1
+        from_date = (now + timedelta(days=days)).replace(hour=int(match.group(2)), minute=int(match.group(3)))
+    else:
+        try:
+            from_date = datetime.fromisoformat(' '.join(match.group(1).split()))
+        except ValueError:
+            return None
+
+    return format_reminder(' '.join(words), from_date)
+
+
+def recurring_extract(user_message: str, now: Optional[datetime] = None) -> Optional[ReminderParse]:
+    """Разобрать повторяющееся напоминание, например "каждый день в 9:00".
+
+    Аргументы:
+        user_message (str): Текст сообщения пользователя.
+        now (datetime, optional): Текущее время, по умолчанию datetime.now().
 
+    Возвращает:
+        ReminderParse | None: Первое повторение с правилом повтора или None,
+                              если в сообщении нет фразы повтора.
+    """
+    found = parse_recurrence(user_message, now)
+    if found is None:
+        return None
+    text_remind, first, rule = found
+    return format_reminder(text_remind, first)._replace(recurrence=rule)
+
+
+def extract_reminder(user_message: str) -> ReminderParse:
+    """Разобрать текст сообщения с помощью periodparser.
+
+    Аргументы:
+        user_message (str): Текст сообщения пользователя.
+
+    Возвращает:
+        ReminderParse: Текст напоминания, дата и их строковые представления.
+    """
     result_text = pp.extract(user_message)
     result_text.tokens.remove('{0}')
     text_remind = ' '.join(result_text.tokens)
     from_date = result_text.dates[0].date_from
 
-    date_str = from_date.strftime("%d %B")
-    time_str = from_date.strftime("%H:%M")
+    return format_reminder(text_remind, from_date)
+
+
+def extract_reminders(user_messages: list[str]) -> list[Optional[ReminderParse]]:
+    """Разобрать несколько сообщений с помощью periodparser за один вызов.
+
+    Аргументы:
+        user_messages (list): Тексты сообщений пользователя.
+
+    Возвращает:
+        list: Результаты разбора в том же порядке, None для сообщений без даты.
+    """
+    parsed: list[Optional[ReminderParse]] = []
+    for user_message in user_messages:
+        try:
+            parsed.append(extract_reminder(user_message))
+        except (IndexError, ValueError):
+            parsed.append(None)
+    return parsed
+
+
+async def parse_reminder(user_message: str) -> ReminderParse:
+    """Разобрать текст сообщения, используя кэш результатов.
+
+    Повторяющиеся напоминания и частые формы сообщений разбираются без
+    periodparser, остальные — periodparser. Если пул разбора запущен,
+    periodparser выполняется в отдельном процессе. Время успешного разбора
+    записывается в метрики с меткой способа разбора.
+
+    Аргументы:
+        user_message (str): Текст сообщения пользователя.
+
+    Возвращает:
+        ReminderParse: Текст напоминания, дата и их строковые представления.
+    """
+    started = time.perf_counter()
+    path = 'recurring'
+    parsed = recurring_extract(user_message)
+    if parsed is None:
+        path = 'cache'
+        key = parse_cache.make_key(user_message)
+        parsed = parse_cache.get(key)
+    if parsed is None:
+        path = 'fast'
+        parsed = fast_extract(user_message)
+    if parsed is None:
+        path = 'periodparser'
+        if parse_executor.is_running:
+            parsed = await parse_executor.run(extract_reminder, user_message)
+        else:
+            parsed = extract_reminder(user_message)
+        parse_cache.put(key, parsed)
+    PARSE_SECONDS.labels(path).observe(time.perf_counter() - started)
+    return parsed
+
+
+async def parse_reminders(user_messages: list[str]) -> list[Optional[ReminderParse]]:
+    """Разобрать пачку сообщений, используя кэш результатов.
+
+    Повтор, кэш и быстрый разбор проверяются для каждого сообщения, а оставшиеся
+    сообщения разбираются periodparser пачками: по одной пачке на процесс пула
+    разбора или одной пачкой в текущем процессе, если пул не запущен.
+
+    Аргументы:
+        user_messages (list): Тексты сообщений пользователя.
+
+    Возвращает:
+        list: Результаты разбора в том же порядке, None для сообщений без даты.
+    """
+    started = time.perf_counter()
+    now = datetime.now()
+    results: list[Optional[ReminderParse]] = []
+    slow: list[int] = []
+    for index, user_message in enumerate(user_messages):
+        parsed = recurring_extract(user_message, now)
+        if parsed is None:
+            parsed = parse_cache.get(parse_cache.make_key(user_message, now))
+        if parsed is None:
+            parsed = fast_extract(user_message, now)
+        if parsed is None:
+            slow.append(index)
+        results.append(parsed)
+
+    if slow:
+        texts = [user_messages[index] for index in slow]
+        if parse_executor.is_running:
+            size = -(-len(texts) // parse_executor.workers)
+            chunks = await asyncio.gather(*(
+                parse_executor.run(extract_reminders, texts[start:start + size])
+                for start in range(0, len(texts), size)
+            ))
+            parsed_slow = [parsed for chunk in chunks for parsed in chunk]
+        else:
+            parsed_slow = extract_reminders(texts)
+        for index, parsed in zip(slow, parsed_slow):
+            results[index] = parsed
+            if parsed is not None:
+                parse_cache.put(parse_cache.make_key(user_messages[index], now), parsed)
+
+    PARSE_SECONDS.labels('batch').observe(time.perf_counter() - started)
+    return results
+
+
+async def analyze_reminder_handlers(message: types.Message) -> ReminderParse:
+    """Анализировать текст сообщения и извлечь напоминание и дату.
+
+    Аргументы:
+        message (types.Message): Входящее сообщение от пользователя.
 
-    return text_remind, from_date, date_str, time_str
+    Возвращает:
+        ReminderParse: Кортеж, содержащий текст напоминания, дату начала,
+                       строковое представление даты и время.
+    """
+    return await parse_reminder(message.text)
 
 
 async def analyze_reminder_db(message: types.Message) -> tuple[str, datetime]:
@@ -34,11 +369,5 @@ async def analyze_reminder_db(message: types.Message) -> tuple[str, datetime]:
     Возвращает:
         tuple: Кортеж, содержащий текст напоминания и дату начала.
     """
-    user_message = message.text
-
-    result_text = pp.extract(user_message)
-    result_text.tokens.remove('{0}')
-    text_remind = ' '.join(result_text.tokens)
-    from_date = result_text.dates[0].date_from
-
-    return text_remind, from_date
\ No newline at end of file
+    parsed = await parse_reminder(message.text)
+    return parsed.text, parsed.from_date
@@ -0,0 +1,318 @@
+import os
+import pickle
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import uuid4
+
+import msgpack
+from arq import ArqRedis
+from arq.constants import expires_extra_ms, in_progress_key_prefix, job_key_prefix
+from arq.jobs import deserialize_job, deserialize_job_raw, serialize_job
+from arq.utils import timestamp_ms, to_unix_ms
+from dotenv import load_dotenv
+
+from bot.db.db_pool import db_pool
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+# Префикс ID задач доставки напоминаний, чужие задачи сверка не трогает
+JOB_ID_PREFIX = 'reminder:'
+# Задачи моложе этого срока сверка не удаляет: их строка может быть еще не зафиксирована
+RECONCILE_GRACE = timedelta(seconds=int(os.getenv("RECONCILE_GRACE", 300)))
+
+
+def job_serializer(data: dict) -> bytes:
+    """Сериализовать задачу arq в msgpack.
+
+    Объекты, которых нет в msgpack, например исключения в результатах
+    неудачных задач, записываются их repr.
+
+    Аргументы:
+        data (dict): Задача или результат в формате arq.
+
+    Возвращает:
+        bytes: Сериализованные данные.
+    """
+    return msgpack.packb(data, use_bin_type=True, default=repr)
+
+
+def job_deserializer(payload: bytes) -> dict:
+    """Десериализовать задачу arq из msgpack или из прежнего формата pickle.
+
+    Задачи, поставленные до перехода на msgpack, начинаются с байта протокола
+    pickle 0x80, который в msgpack означал бы пустой словарь.
+
+    Аргументы:
+        payload (bytes): Сериализованные данные.
+
+    Возвращает:
+        dict: Задача или результат в формате arq.
+    """
+    if payload[:1] == b'\x80':
+        return pickle.loads(payload)
+    return msgpack.unpackb(payload, raw=False)
+
+
+def new_job_id() -> str:
+    """Создать уникальный ID задачи доставки напоминания.
+
+    Возвращает:
+        str: ID задачи с префиксом JOB_ID_PREFIX.
+    """
+    return f'{JOB_ID_PREFIX}{uuid4().hex}'
+
+
+def delivery_kwargs(chat_id: int, text_remind: str) -> dict:
+    """Собрать аргументы задачи send_message для напоминания.
+
+    Аргументы:
+        chat_id (int): ID чата, куда будет отправлено напоминание.
+        text_remind (str): Текст напоминания.
+
+    Возвращает:
+        dict: Аргументы функции send_message.
+    """
+    return {"chat_id": chat_id, "text": f"Пришло время:\n{text_remind}"}
+
+
+def reminder_job_kwargs(reminder_id: int) -> dict:
+    """Собрать аргументы задачи send_reminder для напоминания.
+
+    Задача несет только ID напоминания, а текст загружается при отправке.
+
+    Аргументы:
+        reminder_id (int): ID напоминания.
+
+    Возвращает:
+        dict: Аргументы функции send_reminder.
+    """
+    return {"reminder_id": reminder_id}
+
+
+def add_enqueue(pipe: Any, redis_pool: ArqRedis, job_id: str, when: datetime, reminder_id: int) -> None:
+    """Добавить в pipeline команды постановки задачи send_reminder в очередь.
+
+    Команды совпадают с теми, что выполняет ArqRedis.enqueue_job.
+
+    Аргументы:
+        pipe (Pipeline): Pipeline Redis.
+        redis_pool (ArqRedis): Пул соединений Redis с настройками очереди.
+        job_id (str): ID задачи.
+        when (datetime): Время выполнения задачи.
+        reminder_id (int): ID доставляемого напоминания.
+    """
+    enqueue_time_ms = timestamp_ms()
+    score = to_unix_ms(when)
+    expires_ms = max(score - enqueue_time_ms, 0) + expires_extra_ms
+    job = serialize_job(
+        "send_reminder", (), reminder_job_kwargs(reminder_id), None, enqueue_time_ms,
+        serializer=redis_pool.job_serializer
+    )
+    pipe.psetex(job_key_prefix + job_id, expires_ms, job)
+    pipe.zadd(redis_pool.default_queue_name, {job_id: score})
+
+
+def add_cancel(pipe: Any, redis_pool: ArqRedis, job_id: str) -> None:
+    """Добавить в pipeline команды удаления задачи из очереди.
+
+    Аргументы:
+        pipe (Pipeline): Pipeline Redis.
+        redis_pool (ArqRedis): Пул соединений Redis с настройками очереди.
+        job_id (str): ID задачи.
+    """
+    pipe.zrem(redis_pool.default_queue_name, job_id)
+    pipe.delete(job_key_prefix + job_id)
+
+
+async def reschedule_job(redis_pool: ArqRedis, old_job_id: Optional[str], job_id: str,
+                         when: datetime, reminder_id: int) -> None:
+    """Атомарно заменить задачу доставки новой.
+
+    Удаление старой задачи и постановка новой выполняются в одной транзакции Redis.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        old_job_id (str, optional): ID заменяемой задачи.
+        job_id (str): ID новой задачи.
+        when (datetime): Время выполнения новой задачи.
+        reminder_id (int): ID доставляемого напоминания.
+    """
+    async with redis_pool.pipeline(transaction=True) as pipe:
+        if old_job_id:
+            add_cancel(pipe, redis_pool, old_job_id)
+        add_enqueue(pipe, redis_pool, job_id, when, reminder_id)
+        await pipe.execute()
+
+
+async def cancel_job(redis_pool: ArqRedis, job_id: Optional[str]) -> bool:
+    """Удалить задачу доставки из очереди.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        job_id (str, optional): ID задачи.
+
+    Возвращает:
+        bool: True, если задача была в очереди.
+    """
+    if not job_id:
+        return False
+
+    async with redis_pool.pipeline(transaction=True) as pipe:
+        add_cancel(pipe, redis_pool, job_id)
+        removed, _ = await pipe.execute()
+    return bool(removed)
+
+
+async def reconcile_jobs(redis_pool: ArqRedis, batch_size: int = 500) -> int:
+    """Удалить из очереди задачи доставки, для которых нет строки в main_schedule.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        batch_size (int): Количество задач, проверяемых одним запросом к базе данных.
+
+    Возвращает:
+        int: Количество удаленных задач.
+    """
+    purged = 0
+    batch: list[str] = []
+
+    async for member, _ in redis_pool.zscan_iter(redis_pool.default_queue_name, count=batch_size):
+        job_id = member.decode() if isinstance(member, bytes) else member
+        if job_id.startswith(JOB_ID_PREFIX):
+            batch.append(job_id)
+        if len(batch) >= batch_size:
+            purged += await _purge_orphans(redis_pool, batch)
+            batch = []
+
+    if batch:
+        purged += await _purge_orphans(redis_pool, batch)
+
+    logger.log('info', 'Сверка задач доставки: удалено %s задач без напоминаний', purged)
+    return purged
+
+
+async def _purge_orphans(redis_pool: ArqRedis, job_ids: list[str]) -> int:
+    """Удалить задачи из пачки, которые не связаны ни с одним напоминанием.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        job_ids (list): ID задач из очереди.
+
+    Возвращает:
+        int: Количество удаленных задач.
+    """
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT job_id FROM main_schedule WHERE job_id = ANY(%s)""",
+            (job_ids,)
+        )
+        linked = {row[0] for row in await cursor.fetchall()}
+
+    orphans = [job_id for job_id in job_ids if job_id not in linked]
+    if not orphans:
+        return 0
+
+    async with redis_pool.pipeline(transaction=False) as pipe:
+        for job_id in orphans:
+            pipe.get(job_key_prefix + job_id)
+            pipe.exists(in_progress_key_prefix + job_id)
+        replies = await pipe.execute()
+
+    deadline = datetime.now().astimezone() - RECONCILE_GRACE
+    purged = 0
+    async with redis_pool.pipeline(transaction=True) as pipe:
+        for job_id, payload, in_progress in zip(orphans, replies[::2], replies[1::2]):
+            if in_progress:
+                continue
+            if payload is not None:
+                enqueue_time = deserialize_job(payload, deserializer=redis_pool.job_deserializer).enqueue_time
+                if enqueue_time > deadline:
+                    continue
+            add_cancel(pipe, redis_pool, job_id)
+            purged += 1
+        await pipe.execute()
+
+    return purged
+
+
+async def migrate_legacy_jobs(redis_pool: ArqRedis, batch_size: int = 500) -> int:
+    """Перевести задачи, поставленные до перехода на msgpack, в новый формат.
+
+    Задачи send_message с полным текстом, у которых есть строка в main_schedule,
+    заменяются задачами send_reminder с ID напоминания. Остальные задачи только
+    пересериализуются в msgpack. ID задачи, время выполнения и срок жизни ключа
+    сохраняются, а задачи, которые уже выполняются, не трогаются. Повторный
+    запуск ничего не меняет.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis с сериализатором msgpack.
+        batch_size (int): Количество задач, обрабатываемых за один проход.
+
+    Возвращает:
+        int: Количество переведенных задач.
+    """
+    migrated = 0
+    batch: list[str] = []
+
+    async for member, _ in redis_pool.zscan_iter(redis_pool.default_queue_name, count=batch_size):
+        batch.append(member.decode() if isinstance(member, bytes) else member)
+        if len(batch) >= batch_size:
+            migrated += await _migrate_batch(redis_pool, batch)
+            batch = []
+
+    if batch:
+        migrated += await _migrate_batch(redis_pool, batch)
+
+    logger.log('info', 'Перевод задач доставки в msgpack: переведено %s задач', migrated)
+    return migrated
+
+
+async def _migrate_batch(redis_pool: ArqRedis, job_ids: list[str]) -> int:
+    """Перевести в msgpack задачи из пачки, сериализованные pickle.
+
+    Аргументы:
+        redis_pool (ArqRedis): Пул соединений Redis.
+        job_ids (list): ID задач из очереди.
+
+    Возвращает:
+        int: Количество переведенных задач.
+    """
+    async with redis_pool.pipeline(transaction=False) as pipe:
+        for job_id in job_ids:
+            pipe.get(job_key_prefix + job_id)
+            pipe.exists(in_progress_key_prefix + job_id)
+        replies = await pipe.execute()
+
+    legacy = {
+        job_id: deserialize_job_raw(payload, deserializer=pickle.loads)
+        for job_id, payload, in_progress in zip(job_ids, replies[::2], replies[1::2])
+        if payload is not None and payload[:1] == b'\x80' and not in_progress
+    }
+    if not legacy:
+        return 0
+
+    async with db_pool.cursor() as cursor:
+        await cursor.execute(
+            """SELECT job_id, id FROM main_schedule WHERE job_id = ANY(%s)""",
+            (list(legacy),)
+        )
+        reminders = dict(await cursor.fetchall())
+
+    migrated = 0
+    async with redis_pool.pipeline(transaction=False) as pipe:
+        for job_id, (function, args, kwargs, job_try, enqueue_time_ms) in legacy.items():
+            if function == "send_message" and job_id in reminders:
+                function, args, kwargs = "send_reminder", (), reminder_job_kwargs(reminders[job_id])
+            try:
+                job = serialize_job(function, args, kwargs, job_try, enqueue_time_ms,
+                                    serializer=redis_pool.job_serializer)
+            except Exception as ex:
+                logger.log('error', 'Задача %s не переведена в msgpack: %s', job_id, ex)
+                continue
+            # XX: задача, которую воркер успел выполнить и удалить, не создается заново
+            pipe.set(job_key_prefix + job_id, job, xx=True, keepttl=True)
+            migrated += 1
+        await pipe.execute()
+
+    return migrated
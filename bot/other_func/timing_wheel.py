@@ -0,0 +1,122 @@
+from typing import Dict, Hashable, List
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров.
+
+    Время измеряется целыми тиками. Уровень 0 хранит таймеры ближайших
+    2**slot_bits тиков, каждый следующий уровень — в 2**slot_bits раз более
+    длинный отрезок. Уровень таймера выбирается по оставшемуся до него времени,
+    а слот — по группе бит его тика, и таймер опускается на нижние уровни, когда
+    текущий тик доходит до начала этой группы. Таймеры дальше горизонта лежат в
+    последнем слоте верхнего уровня и перекладываются при каждом его обороте.
+
+    Вставка и отмена — O(1): слот — это словарь ключ -> тик, а для каждого ключа
+    хранится ссылка на его слот.
+
+    Атрибуты:
+        slot_bits (int): Двоичный логарифм количества слотов на уровне.
+        levels (int): Количество уровней.
+        current (int): Следующий необработанный тик.
+    """
+
+    def __init__(self, slot_bits: int = 8, levels: int = 4, start_tick: int = 0) -> None:
+        """Инициализировать TimingWheel.
+
+        Аргументы:
+            slot_bits (int): Двоичный логарифм количества слотов на уровне.
+            levels (int): Количество уровней, горизонт равен 2**(slot_bits * levels) тиков.
+            start_tick (int): Первый тик, который будет обработан.
+        """
+        self.slot_bits = slot_bits
+        self.levels = levels
+        self.current = start_tick
+        self._mask = (1 << slot_bits) - 1
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._where: Dict[Hashable, Dict[Hashable, int]] = {}
+
+    def __len__(self) -> int:
+        """Количество запланированных таймеров."""
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Запланирован ли таймер с ключом key."""
+        return key in self._where
+
+    def insert(self, key: Hashable, tick: int) -> None:
+        """Запланировать таймер или перенести уже запланированный.
+
+        Аргументы:
+            key (Hashable): Ключ таймера, например ID напоминания.
+            tick (int): Тик срабатывания. Прошедшие тики срабатывают при следующем advance.
+        """
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            del slot[key]
+        self._place(key, tick)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Отменить таймер.
+
+        Аргументы:
+            key (Hashable): Ключ таймера.
+
+        Возвращает:
+            bool: True, если таймер был запланирован.
+        """
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del slot[key]
+        return True
+
+    def advance(self, tick: int) -> List[Hashable]:
+        """Обработать все тики до tick включительно.
+
+        Аргументы:
+            tick (int): Текущий тик.
+
+        Возвращает:
+            list: Ключи сработавших таймеров в порядке их тиков.
+        """
+        fired: List[Hashable] = []
+        bits, mask = self.slot_bits, self._mask
+        while self.current <= tick:
+            now = self.current
+            # Сверху вниз: таймеры, опущенные с верхнего уровня, могут сразу опуститься еще ниже
+            for level in range(self.levels - 1, 0, -1):
+                if now & ((1 << (bits * level)) - 1):
+                    continue
+                slot = self._wheels[level][(now >> (bits * level)) & mask]
+                if slot:
+                    moved = list(slot.items())
+                    slot.clear()
+                    for key, due in moved:
+                        self._place(key, due)
+
+            slot = self._wheels[0][now & mask]
+            if slot:
+                for key in slot:
+                    del self._where[key]
+                fired.extend(slot)
+                slot.clear()
+            self.current = now + 1
+        return fired
+
+    def _place(self, key: Hashable, tick: int) -> None:
+        """Положить таймер в слот, соответствующий его тику."""
+        bits = self.slot_bits
+        tick = max(tick, self.current)
+        delta = tick - self.current
+        level = (delta.bit_length() - 1) // bits if delta else 0
+        if level >= self.levels:
+            # За горизонтом: слот верхнего уровня, который опустится последним
+            level = self.levels - 1
+            index = ((self.current >> (bits * level)) - 1) & self._mask
+        else:
+            index = (tick >> (bits * level)) & self._mask
+        slot = self._wheels[level][index]
+        slot[key] = tick
+        self._where[key] = slot
@@ -0,0 +1,149 @@
+import os
+import asyncio
+import hmac
+from typing import Optional
+
+from aiogram import Bot, Dispatcher, types
+from aiohttp import web
+from dotenv import load_dotenv
+
+from bot.logging.logger import logger
+
+load_dotenv('.env')
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """Прием обновлений Telegram через webhook на aiohttp.
+
+    Обновление подтверждается сразу после постановки в обработку, а количество
+    одновременно обрабатываемых обновлений ограничено: когда все места заняты,
+    новые запросы ждут свободного места, и Telegram не присылает больше, чем бот успевает.
+
+    Атрибуты:
+        dp (Dispatcher): Диспетчер, обрабатывающий обновления.
+        path (str): Путь, на который Telegram присылает обновления.
+        secret_token (str): Секрет из заголовка X-Telegram-Bot-Api-Secret-Token, пустая строка отключает проверку.
+        max_concurrency (int): Максимальное количество одновременно обрабатываемых обновлений.
+        drain_timeout (float): Сколько секунд ждать завершения обработки при остановке.
+        accepted (int): Количество принятых обновлений.
+        rejected (int): Количество отклоненных запросов.
+    """
+
+    def __init__(self, dp: Dispatcher, path: str, secret_token: str,
+                 max_concurrency: int, drain_timeout: float) -> None:
+        """Инициализировать WebhookServer.
+
+        Аргументы:
+            dp (Dispatcher): Диспетчер, обрабатывающий обновления.
+            path (str): Путь, на который Telegram присылает обновления.
+            secret_token (str): Секрет из заголовка X-Telegram-Bot-Api-Secret-Token, пустая строка отключает проверку.
+            max_concurrency (int): Максимальное количество одновременно обрабатываемых обновлений.
+            drain_timeout (float): Сколько секунд ждать завершения обработки при остановке.
+        """
+        self.dp = dp
+        self.path = path
+        self.secret_token = secret_token
+        self.max_concurrency = max_concurrency
+        self.drain_timeout = drain_timeout
+        self.accepted = 0
+        self.rejected = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closing = False
+
+    @property
+    def in_flight(self) -> int:
+        """Количество обновлений, которые сейчас обрабатываются."""
+        return len(self._tasks)
+
+    def make_app(self) -> web.Application:
+        """Создать приложение aiohttp с обработчиком webhook.
+
+        Возвращает:
+            web.Application: Приложение aiohttp.
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Принять обновление от Telegram и поставить его в обработку.
+
+        Аргументы:
+            request (web.Request): Запрос от Telegram.
+
+        Возвращает:
+            web.Response: 200 при успехе, 401 при неверном секрете, 400 при неверном
+                          теле запроса и 503 во время остановки.
+        """
+        if self.secret_token and not hmac.compare_digest(
+                request.headers.get(SECRET_HEADER, ''), self.secret_token):
+            self.rejected += 1
+            return web.Response(status=401)
+        if self._closing:
+            self.rejected += 1
+            return web.Response(status=503)
+
+        try:
+            update = types.Update(**await request.json())
+        except (ValueError, TypeError):
+            self.rejected += 1
+            return web.Response(status=400)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        await self._slots.acquire()
+
+        Dispatcher.set_current(self.dp)
+        Bot.set_current(self.dp.bot)
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.accepted += 1
+        return web.Response()
+
+    async def _process(self, update: types.Update) -> None:
+        """Обработать обновление и освободить место.
+
+        Аргументы:
+            update (types.Update): Обновление Telegram.
+        """
+        try:
+            await self.dp.process_update(update)
+        except Exception as e:
+            logger.log('error', 'Ошибка обработки обновления %s: %s', update.update_id, e)
+        finally:
+            self._slots.release()
+
+    async def drain(self) -> None:
+        """Перестать принимать обновления и дождаться обработки уже принятых."""
+        self._closing = True
+        if not self._tasks:
+            return
+
+        logger.log('info', 'Ожидание обработки %s обновлений перед остановкой', len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.log('error', 'Обработка %s обновлений прервана при остановке', len(pending))
+
+
+def webhook_server(dp: Dispatcher) -> WebhookServer:
+    """Создать WebhookServer с настройками из окружения.
+
+    Аргументы:
+        dp (Dispatcher): Диспетчер, обрабатывающий обновления.
+
+    Возвращает:
+        WebhookServer: Сервер приема обновлений.
+    """
+    return WebhookServer(
+        dp,
+        path=os.getenv("WEBHOOK_PATH", "/webhook"),
+        secret_token=os.getenv("WEBHOOK_SECRET", ""),
+        max_concurrency=int(os.getenv("WEBHOOK_CONCURRENCY", 100)),
+        drain_timeout=float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", 30)),
+    )
@@ -0,0 +1,302 @@
+import os
+import asyncio
+import math
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import psycopg
+from aiogram import Bot
+from arq import create_pool
+from arq.connections import RedisSettings
+from dotenv import load_dotenv
+
+from bot.db.db_func import complete_reminder
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.reminder_cache import reminder_cache
+from bot.logging.logger import logger
+from bot.other_func.arq_func import send_message
+from bot.other_func.delivery import delivery_engine
+from bot.other_func.reminder_jobs import delivery_kwargs
+from bot.other_func.timing_wheel import TimingWheel
+
+load_dotenv('.env')
+
+# Канал LISTEN/NOTIFY, в который триггер main_schedule пишет изменения напоминаний
+NOTIFY_CHANNEL = 'main_schedule'
+
+
+class WheelScheduler:
+    """Доставка напоминаний по иерархическому колесу таймеров в процессе.
+
+    Альтернатива очереди arq: в памяти держатся только напоминания ближайшего
+    окна window, загруженные из PostgreSQL. Окно пополняется по частям, а
+    изменения напоминаний приходят через LISTEN/NOTIFY от триггера таблицы
+    main_schedule и сразу вставляют или отменяют таймер. Сработавшие таймеры
+    отправляются той же функцией send_message, что и задачи arq.
+
+    Текст напоминания загружается вместе с таймером. Только после успешной
+    отправки однократное напоминание удаляется из базы данных, а повторяющееся
+    переносится на следующее повторение, и новое время приходит обратно
+    уведомлением триггера. Поэтому перезапуск не отправляет доставленные
+    напоминания повторно, а неудачная отправка не теряет напоминание.
+
+    Атрибуты:
+        tick (float): Длительность тика колеса в секундах.
+        window (float): На сколько секунд вперед загружаются напоминания.
+        catchup (float): За сколько секунд в прошлом напоминания догружаются при запуске.
+        wheel (TimingWheel): Колесо таймеров с ID напоминаний.
+        fired (int): Количество сработавших таймеров.
+    """
+
+    def __init__(self, tick: float, window: float, catchup: float) -> None:
+        """Инициализировать WheelScheduler.
+
+        Аргументы:
+            tick (float): Длительность тика колеса в секундах.
+            window (float): На сколько секунд вперед загружаются напоминания.
+            catchup (float): За сколько секунд в прошлом напоминания догружаются при запуске.
+        """
+        self.tick = tick
+        self.window = window
+        self.catchup = catchup
+        self.wheel = TimingWheel(start_tick=self._tick_of(time.time()))
+        self.fired = 0
+        self._reminders: Dict[int, Tuple[int, str, datetime, Optional[str]]] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._sends: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+        # Пополнение окна и изменения из NOTIFY применяются по очереди, чтобы
+        # снимок курсора не перезаписал более позднее изменение
+        self._lock = asyncio.Lock()
+
+    def _tick_of(self, timestamp: float) -> int:
+        """Первый тик, не раньше которого наступает момент timestamp."""
+        return math.ceil(timestamp / self.tick)
+
+    def __len__(self) -> int:
+        """Количество запланированных напоминаний."""
+        return len(self.wheel)
+
+    def schedule(self, reminder_id: int, chat_id: int, text: str, when: datetime,
+                 recurrence: Optional[str] = None) -> None:
+        """Запланировать напоминание или перенести уже запланированное.
+
+        Напоминания позже загруженного окна не планируются: они придут при пополнении.
+
+        Аргументы:
+            reminder_id (int): ID напоминания.
+            chat_id (int): ID чата пользователя.
+            text (str): Текст напоминания.
+            when (datetime): Время напоминания.
+            recurrence (str, optional): Правило повтора повторяющегося напоминания.
+        """
+        if self._loaded_until is not None and when >= self._loaded_until:
+            self.cancel(reminder_id)
+            return
+        self._reminders[reminder_id] = (chat_id, text, when, recurrence)
+        self.wheel.insert(reminder_id, self._tick_of(when.timestamp()))
+
+    def cancel(self, reminder_id: int) -> None:
+        """Отменить напоминание.
+
+        Аргументы:
+            reminder_id (int): ID напоминания.
+        """
+        self.wheel.cancel(reminder_id)
+        self._reminders.pop(reminder_id, None)
+
+    async def refill(self, until: datetime, since: Optional[datetime] = None) -> int:
+        """Загрузить напоминания от конца загруженного окна до until.
+
+        Строки читаются серверным курсором, поэтому память не зависит от их количества.
+
+        Аргументы:
+            until (datetime): Новый конец окна.
+            since (datetime, optional): Начало загрузки. По умолчанию конец загруженного окна.
+
+        Возвращает:
+            int: Количество загруженных напоминаний.
+        """
+        since = since or self._loaded_until
+        loaded = 0
+        async with self._lock:
+            async with db_pool.connection() as connection:
+                async with connection.cursor(name='wheel_refill') as cursor:
+                    cursor.itersize = 5000
+                    await cursor.execute(
+                        """SELECT id, fk_user_id, reminder_text, reminder_datetime, recurrence FROM main_schedule
+                           WHERE reminder_datetime >= %s AND reminder_datetime < %s""",
+                        (since, until)
+                    )
+                    async for reminder_id, chat_id, text, when, recurrence in cursor:
+                        self._reminders[reminder_id] = (chat_id, text, when, recurrence)
+                        self.wheel.insert(reminder_id, self._tick_of(when.timestamp()))
+                        loaded += 1
+            self._loaded_until = until
+        return loaded
+
+    async def reload(self, since: datetime) -> int:
+        """Загрузить окно заново, отбросив запланированные таймеры.
+
+        Аргументы:
+            since (datetime): Начало загрузки.
+
+        Возвращает:
+            int: Количество загруженных напоминаний.
+        """
+        async with self._lock:
+            self.wheel = TimingWheel(start_tick=self.wheel.current)
+            self._reminders.clear()
+        return await self.refill(datetime.now() + timedelta(seconds=self.window), since)
+
+    async def apply_change(self, payload: str) -> None:
+        """Применить изменение напоминания из уведомления триггера.
+
+        Аргументы:
+            payload (str): Строка "операция:ID" из NOTIFY.
+        """
+        operation, reminder_id = payload.split(':', 1)
+        reminder_id = int(reminder_id)
+        async with self._lock:
+            # Строку сработавшего напоминания удаляет сам планировщик после отправки, поэтому
+            # удаление несработавшего таймера — это удаление напоминания пользователем
+            if operation == 'DELETE':
+                self.cancel(reminder_id)
+                return
+
+            async with db_pool.cursor() as cursor:
+                await cursor.execute(
+                    """SELECT fk_user_id, reminder_text, reminder_datetime, recurrence FROM main_schedule
+                       WHERE id = %s""",
+                    (reminder_id,)
+                )
+                row = await cursor.fetchone()
+            if row is None:
+                self.cancel(reminder_id)
+            else:
+                self.schedule(reminder_id, *row)
+
+    def _fire(self, reminder_ids: Iterable[int], bot: Bot) -> None:
+        """Отправить сработавшие напоминания, каждое в отдельной задаче."""
+        for reminder_id in reminder_ids:
+            reminder = self._reminders.pop(reminder_id, None)
+            if reminder is None:
+                continue
+            chat_id, text, when, _ = reminder
+            self.fired += 1
+            self._spawn(self._deliver(bot, reminder_id, chat_id, text, when))
+
+    def _spawn(self, coroutine) -> None:
+        """Запустить задачу, которую run дождется при остановке."""
+        task = asyncio.create_task(coroutine)
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _deliver(self, bot: Bot, reminder_id: int, chat_id: int, text: str, when: datetime) -> None:
+        """Отправить напоминание через send_message и после доставки завершить его в базе данных."""
+        ctx = {'bot': bot, 'score': int(when.timestamp() * 1000)}
+        if not await send_message(ctx, **delivery_kwargs(chat_id, text)):
+            logger.log('error', 'Напоминание %s не доставлено колесом таймеров и осталось в базе данных', reminder_id)
+            return
+        try:
+            await complete_reminder(reminder_id, None, when=when)
+        except Exception as ex:
+            logger.log('error', 'PostgresSQL ERROR in wheel_scheduler complete: %s', ex)
+
+    async def _listen(self) -> None:
+        """Получать уведомления об изменениях напоминаний, переподключаясь при ошибках."""
+        # При первом подключении догружаются напоминания за последние catchup секунд,
+        # при переподключении — начиная с первого необработанного тика
+        since = datetime.now() - timedelta(seconds=self.catchup)
+        while not self._stopping.is_set():
+            try:
+                connection = await psycopg.AsyncConnection.connect(**db_pool._connection_kwargs(), autocommit=True)
+                async with connection:
+                    await connection.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    # Изменения, пропущенные до LISTEN, подхватывает полная перезагрузка окна
+                    loaded = await self.reload(since)
+                    logger.log('info', 'Колесо таймеров загружено: %s напоминаний', loaded)
+                    async for notify in connection.notifies():
+                        await self.apply_change(notify.payload)
+            except Exception as ex:
+                logger.log('error', 'PostgresSQL ERROR in wheel_scheduler listener: %s', ex)
+                since = datetime.fromtimestamp((self.wheel.current - 1) * self.tick) + timedelta(microseconds=1)
+                await asyncio.sleep(1)
+
+    async def run(self, bot: Bot) -> None:
+        """Срабатывать таймеры и пополнять окно до вызова stop.
+
+        Аргументы:
+            bot (Bot): Объект бота для отправки напоминаний.
+        """
+        self._stopping = asyncio.Event()
+        listener = asyncio.create_task(self._listen(), name="wheel_listener")
+        refill_every = self.window / 4
+        next_refill = time.monotonic() + refill_every
+        logger.log('info', 'Планировщик на колесе таймеров запущен: тик %s с, окно %s с', self.tick, self.window)
+        try:
+            while not self._stopping.is_set():
+                now = time.time()
+                self._fire(self.wheel.advance(int(now // self.tick)), bot)
+
+                if time.monotonic() >= next_refill and self._loaded_until is not None:
+                    next_refill = time.monotonic() + refill_every
+                    try:
+                        loaded = await self.refill(datetime.now() + timedelta(seconds=self.window))
+                        logger.log('info', 'Окно колеса таймеров пополнено: %s напоминаний, всего %s', loaded, len(self))
+                    except Exception as ex:
+                        logger.log('error', 'PostgresSQL ERROR in wheel_scheduler refill: %s', ex)
+
+                # Просыпаться на границе следующего тика
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.tick - time.time() % self.tick)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            if self._sends:
+                await asyncio.gather(*self._sends, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Попросить run завершиться после текущего тика."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+
+wheel_scheduler = WheelScheduler(
+    tick=float(os.getenv("WHEEL_TICK", 0.1)),
+    window=float(os.getenv("WHEEL_WINDOW", 3600)),
+    catchup=float(os.getenv("WHEEL_CATCHUP", 60)),
+)
+
+
+async def main() -> None:
+    """Запустить доставку напоминаний на колесе таймеров до SIGINT или SIGTERM.
+
+    Redis нужен только кэшу списков: доставленные напоминания сбрасывают его так же, как в воркере arq.
+    """
+    redis = await create_pool(RedisSettings)
+    reminder_cache.attach(redis)
+    await db_pool.open()
+    await apply_migrations()
+    bot = Bot(token=os.getenv("TOKEN_API"))
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, wheel_scheduler.stop)
+
+    try:
+        await wheel_scheduler.run(bot)
+    finally:
+        logger.log('info', 'Статистика доставки напоминаний: %s', delivery_engine.stats())
+        await (await bot.get_session()).close()
+        await db_pool.close()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
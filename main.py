@@ -12,12 +12,21 @@
 #    ```
 #    python main.py
 #    ```
+#    По умолчанию бот получает обновления через long polling. Для приема обновлений
+#    через webhook заполните переменные WEBHOOK_* в .env и выполните:
+#    ```
+#    python main.py --mode webhook
+#    ```
 #
 # 3. Запустите воркер:
 #    Откройте второй терминал и выполните:
 #    ```
 #    arq bot.other_func.arq_func.WorkerSettings
 #    ```
+#    При DELIVERY_BACKEND=wheel вместо воркера arq запустите колесо таймеров:
+#    ```
+#    python -m bot.other_func.wheel_scheduler
+#    ```
 #
 # Важно:
 # - Убедитесь, что файл .env создан и заполнен необходимыми значениями, включая токен вашего Telegram бота (переменная TOKEN_API).
@@ -26,19 +35,35 @@
 # Следуя этим шагам, вы сможете успешно запустить ваше приложение и начать взаимодействовать с ботом!
 
 import os
+import argparse
 import asyncio
+import signal
 
 from aiogram import Bot, Dispatcher, types
+from aiohttp import web
 from arq import create_pool, ArqRedis
 from arq.connections import RedisSettings
+from arq.constants import default_queue_name
 from dotenv import load_dotenv
 
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.reminder_cache import reminder_cache
+from bot.db.sweeper import expiry_sweeper
+from bot.handlers.throttling import throttling_middleware
 from bot.handlers.user_handlers import register_user_handlers
+from bot.logging.logger import logger
+from bot.other_func.metrics import metrics_server, queue_depth_refresher
+from bot.other_func.parse_executor import parse_executor
+from bot.other_func.profiling import profiler
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+from bot.other_func.webhook import webhook_server
 
 load_dotenv('.env')
 
 def register_handler(dp: Dispatcher, redis_pool: ArqRedis) -> None:
-    """Регистрация обработчиков пользователей."""
+    """Регистрация обработчиков пользователей и ограничения частоты обновлений."""
+    dp.middleware.setup(throttling_middleware(redis_pool))
     register_user_handlers(dp, redis_pool)
 
 
@@ -52,10 +77,63 @@ async def set_bot_commands(bot: Bot) -> None:
     await bot.set_my_commands(commands)
 
 
-async def main() -> None:
-    """Основная функция для запуска бота."""
+async def run_webhook(dp: Dispatcher) -> None:
+    """Принимать обновления через webhook до сигнала остановки.
+
+    При остановке сервер перестает принимать новые обновления и дожидается
+    обработки уже принятых.
+
+    Аргументы:
+        dp (Dispatcher): Диспетчер, обрабатывающий обновления.
+    """
+    server = webhook_server(dp)
+    webhook_url = os.getenv("WEBHOOK_URL")
+    if webhook_url:
+        await dp.bot.set_webhook(
+            webhook_url.rstrip("/") + server.path,
+            secret_token=server.secret_token or None,
+            max_connections=min(server.max_concurrency, 100),
+        )
+
+    runner = web.AppRunner(server.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, os.getenv("WEBHOOK_HOST", "0.0.0.0"), int(os.getenv("WEBHOOK_PORT", 8080)))
+    await site.start()
+    logger.log('info', 'Webhook запущен на %s%s', site.name, server.path)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+    finally:
+        await server.drain()
+        await runner.cleanup()
+        logger.log('info', 'Webhook остановлен: принято %s, отклонено %s', server.accepted, server.rejected)
+
+
+async def main(mode: str = "polling") -> None:
+    """Основная функция для запуска бота.
+
+    Аргументы:
+        mode (str): Способ получения обновлений: "polling" или "webhook".
+    """
     token: str = os.getenv("TOKEN_API")
-    redis_pool: ArqRedis = await create_pool(RedisSettings)
+    redis_pool: ArqRedis = await create_pool(RedisSettings, job_serializer=job_serializer,
+                                             job_deserializer=job_deserializer)
+    reminder_cache.attach(redis_pool)
+
+    await db_pool.open()
+    await apply_migrations()
+    expiry_sweeper.start()
+    parse_executor.start()
+    metrics = metrics_server("METRICS_PORT", 9100)
+    metrics.add_refresher(queue_depth_refresher(redis_pool, default_queue_name))
+    await metrics.start()
+    if profiler.enabled:
+        profiler.start()
 
     bot: Bot = Bot(token)
     dp: Dispatcher = Dispatcher(bot)
@@ -63,7 +141,21 @@ async def main() -> None:
     
     await set_bot_commands(bot)
     
-    await dp.start_polling()
+    try:
+        if mode == "webhook":
+            await run_webhook(dp)
+        else:
+            await dp.start_polling()
+    finally:
+        await metrics.stop()
+        profiler.stop()
+        profiler.dump()
+        await expiry_sweeper.stop()
+        parse_executor.shutdown()
+        await db_pool.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Запуск бота NudgeNinja")
+    parser.add_argument("--mode", choices=("polling", "webhook"), default="polling",
+                        help="способ получения обновлений от Telegram")
+    asyncio.run(main(parser.parse_args().mode))
\ No newline at end of file
@@ -0,0 +1,15 @@
+def assert_logged(mock_log, level: str, text: str) -> None:
+    """Проверить, что через замененный logger.log записано сообщение.
+
+    Шаблон с % и его аргументы собираются так же, как при записи в файл.
+
+    Аргументы:
+        mock_log (MagicMock): Замена logger.log.
+        level (str): Ожидаемый уровень.
+        text (str): Ожидаемый текст после подстановки аргументов.
+    """
+    logged = [
+        (call.args[0], call.args[1] % call.args[2:] if len(call.args) > 2 else call.args[1])
+        for call in mock_log.call_args_list
+    ]
+    assert (level, text) in logged, f'{(level, text)} не найдено среди {logged}'
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Логгер бота создается при импорте bot.logging.logger: тесты пишут лог во временный
+# каталог, а не в bot.log в корне проекта
+os.environ["LOG_FILE"] = os.path.join(tempfile.mkdtemp(prefix="nudgeninja-tests-"), "bot.log")
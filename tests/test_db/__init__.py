@@ -0,0 +1,2 @@
+# Диапазон ID Telegram, который тесты используют в реальной базе данных
+TEST_USER_ID = 990_000_000
@@ -0,0 +1,54 @@
+import os
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg.conninfo import conninfo_to_dict
+
+from bot.db.db_pool import db_pool
+from bot.db.migrations import apply_migrations
+from bot.db.user_cache import known_users
+from tests.test_db import TEST_USER_ID
+
+
+@pytest_asyncio.fixture
+async def database(monkeypatch):
+    """Открыть пул соединений с отдельной тестовой базой данных и применить миграции.
+
+    База данных задается строкой подключения TEST_DATABASE_URL, а не настройками
+    бота из .env: тесты применяют миграции, массово добавляют строки и удаляют
+    пользователей. Тест пропускается, если TEST_DATABASE_URL не задана или
+    PostgreSQL недоступен. После теста удаляются пользователи из тестового
+    диапазона вместе с их напоминаниями, а кэш известных пользователей очищается.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL не задана")
+
+    # Пул и LISTEN колеса таймеров читают параметры подключения из окружения
+    params = conninfo_to_dict(url)
+    for env, key in (("host", "host"), ("user", "user"), ("password", "password"), ("db_name", "dbname"),
+                     ("port", "port")):
+        if key in params:
+            monkeypatch.setenv(env, str(params[key]))
+        else:
+            monkeypatch.delenv(env, raising=False)
+
+    try:
+        connection = await psycopg.AsyncConnection.connect(url, connect_timeout=2)
+        await connection.close()
+    except psycopg.OperationalError as ex:
+        pytest.skip(f"PostgreSQL недоступен: {ex}")
+
+    await db_pool.open()
+    await apply_migrations()
+    try:
+        yield db_pool
+    finally:
+        async with db_pool.cursor() as cursor:
+            await cursor.execute(
+                """DELETE FROM main_users WHERE tg_id >= %s AND tg_id < %s""",
+                (TEST_USER_ID, TEST_USER_ID + 1_000_000)
+            )
+        known_users.clear()
+        await db_pool.close()
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import patch
+
+from bot.db.db_pool import DatabasePool
+
+@pytest.mark.asyncio
+async def test_connection_requires_open_pool() -> None:
+    """Тест получения соединения из неоткрытого пула.
+
+    Проверяет, что функция сразу сообщает об ошибке, а не ждет соединения.
+    """
+    pool = DatabasePool(min_size=1, max_size=2, acquire_timeout=1, query_timeout=1)
+
+    with pytest.raises(RuntimeError):
+        async with pool.connection():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_health_check_closed_pool() -> None:
+    """Тест проверки здоровья для неоткрытого пула.
+
+    Проверяет, что функция возвращает False и логирует ошибку.
+    """
+    pool = DatabasePool(min_size=1, max_size=2, acquire_timeout=1, query_timeout=1)
+
+    with patch('bot.db.db_pool.logger.log') as mock_log:
+        assert await pool.health_check() is False
+        mock_log.assert_called_once()
+
+
+def test_pool_limits_and_query_timeout() -> None:
+    """Тест настроек пула.
+
+    Проверяет, что максимальный размер не меньше минимального, а таймаут запроса
+    передается серверу в миллисекундах.
+    """
+    pool = DatabasePool(min_size=5, max_size=2, acquire_timeout=1, query_timeout=2.5)
+
+    assert pool.max_size == 5
+    assert pool._connection_kwargs()["options"] == "-c statement_timeout=2500"
@@ -0,0 +1,280 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from arq import ArqRedis, Retry
+from arq.constants import job_key_prefix
+from arq.jobs import deserialize_job
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.db.db_func import (delete_reminder, delete_reminder_at, get_all_reminders, set_info_remind, set_info_reminds,
+                            update_reminder, update_reminder_at)
+from bot.other_func.arq_func import WorkerSettings, send_reminder
+from bot.other_func.reminder_analysis import format_reminder
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+from tests.test_db import TEST_USER_ID
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def make_redis() -> ArqRedis:
+    """Создать ArqRedis поверх Redis в памяти."""
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+    from redis.asyncio import ConnectionPool
+
+    return ArqRedis(connection_pool=ConnectionPool(
+        connection_class=FakeAsyncRedisConnection, server=fakeredis.FakeServer()
+    ), job_serializer=job_serializer, job_deserializer=job_deserializer)
+
+
+@pytest.mark.asyncio
+async def test_edit_and_delete_follow_the_job(database) -> None:
+    """Тест связи напоминания с задачей arq.
+
+    Проверяет, что редактирование заменяет задачу доставки, а удаление убирает ее из очереди.
+    """
+    redis = make_redis()
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_USER_ID + 1, username=None))
+    when = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (message.from_user.id,))
+
+    reminder_id = await set_info_remind(message, format_reminder("старый", when), redis)
+    assert reminder_id == (await get_all_reminders(message))[0]["id"]
+    first = (await redis.zrange(redis.default_queue_name, 0, -1))[0].decode()
+
+    result = await update_reminder(reminder_id, "новый", when + timedelta(hours=1), message.from_user.id, redis)
+
+    assert result == "Напоминание успешно обновлено!"
+    queue = [job_id.decode() for job_id in await redis.zrange(redis.default_queue_name, 0, -1)]
+    assert len(queue) == 1 and queue[0] != first
+    job = deserialize_job(await redis.get(job_key_prefix + queue[0]), deserializer=job_deserializer)
+    assert (job.function, job.kwargs) == ("send_reminder", {"reminder_id": reminder_id})
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT job_id FROM main_schedule WHERE id = %s""", (reminder_id,))
+        assert (await cursor.fetchone())[0] == queue[0]
+
+    assert await delete_reminder(message, reminder_id, redis) == "Напоминание успешно удалено."
+    assert await redis.zcard(redis.default_queue_name) == 0
+    assert not await redis.exists(job_key_prefix + queue[0])
+
+
+@pytest.mark.asyncio
+async def test_numbers_follow_the_list_order(database) -> None:
+    """Тест редактирования и удаления по номеру в списке.
+
+    Проверяет, что номер указывает на то же напоминание, что и в списке, в том
+    числе для напоминаний с одинаковым временем и при скрытом просроченном
+    напоминании, а задача доставки заменяется или удаляется вместе со строкой.
+    """
+    redis = make_redis()
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_USER_ID + 10, username=None))
+    when = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (message.from_user.id,))
+        await cursor.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id) VALUES (%s, %s, %s)""",
+            ("просроченное", when - timedelta(days=2), message.from_user.id)
+        )
+    await set_info_reminds(message.from_user.id, [
+        format_reminder(text, when + timedelta(hours=hours))
+        for text, hours in (("третье", 2), ("первое", 0), ("второе", 0))
+    ], redis)
+    listed = await get_all_reminders(message)
+    assert [reminder["text"] for reminder in listed] == ["первое", "второе", "третье"]
+
+    assert await delete_reminder_at(message.from_user.id, 4, redis) is None
+    deleted = await delete_reminder_at(message.from_user.id, 2, redis)
+    assert (deleted["id"], deleted["text"]) == (listed[1]["id"], "второе")
+    assert await redis.zcard(redis.default_queue_name) == 2
+
+    # Перенос на другой месяц перемещает строку в другую секцию main_schedule
+    new_date = when + timedelta(days=40)
+    updated = await update_reminder_at(message.from_user.id, 1, "новое", new_date, redis)
+    assert updated == {"id": listed[0]["id"], "text": "новое", "datetime": new_date, "recurrence": None}
+    assert [reminder["text"] for reminder in await get_all_reminders(message)] == ["третье", "новое"]
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT job_id FROM main_schedule WHERE id = %s""", (updated["id"],))
+        job_id = (await cursor.fetchone())[0]
+    job = deserialize_job(await redis.get(job_key_prefix + job_id), deserializer=job_deserializer)
+    assert job.kwargs == {"reminder_id": updated["id"]}
+    assert await redis.zcard(redis.default_queue_name) == 2
+    assert await redis.zscore(redis.default_queue_name, job_id) == new_date.timestamp() * 1000
+
+
+@pytest.mark.asyncio
+async def test_send_reminder_loads_text_once(database) -> None:
+    """Тест доставки напоминания по ID.
+
+    Проверяет, что задача загружает текст из базы данных и удаляет строку, а
+    задача, замененная при редактировании, повторяется, пока у нее есть
+    попытки, и ничего не отправляет.
+    """
+    redis = make_redis()
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_USER_ID + 2, username=None))
+    when = datetime.now() + timedelta(hours=1)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (message.from_user.id,))
+
+    reminder_id = await set_info_remind(message, format_reminder("полить цветы", when), redis)
+    job_id = (await redis.zrange(redis.default_queue_name, 0, -1))[0].decode()
+    ctx = {"bot": MagicMock(), "job_id": job_id, "score": 0}
+
+    with patch('bot.other_func.arq_func.delivery_engine.deliver', new_callable=AsyncMock) as mock_deliver, \
+         patch('bot.other_func.arq_func.logger.log'):
+        mock_deliver.return_value = True
+
+        with pytest.raises(Retry):
+            await send_reminder({**ctx, "job_id": "reminder:stale"}, reminder_id)
+        last_try = {"job_try": WorkerSettings.max_tries}
+        assert await send_reminder({**ctx, **last_try, "job_id": "reminder:stale"}, reminder_id) is False
+        assert await send_reminder(ctx, reminder_id) is True
+        assert await send_reminder({**ctx, **last_try}, reminder_id) is False
+
+    mock_deliver.assert_called_once_with(ctx["bot"], message.from_user.id, "Пришло время:\nполить цветы", scheduled=None)
+    assert await get_all_reminders(message) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_keeps_reminder(database) -> None:
+    """Тест неудачной доставки.
+
+    Проверяет, что строка напоминания остается в базе данных, если отправка
+    не удалась или воркер упал во время отправки, задача повторяется arq, а
+    после успешной повторной отправки строка удаляется.
+    """
+    redis = make_redis()
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_USER_ID + 11, username=None))
+    when = datetime.now() + timedelta(hours=1)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (message.from_user.id,))
+
+    reminder_id = await set_info_remind(message, format_reminder("оплатить счет", when), redis)
+    job_id = (await redis.zrange(redis.default_queue_name, 0, -1))[0].decode()
+    ctx = {"bot": MagicMock(), "redis": redis, "job_id": job_id}
+
+    with patch('bot.other_func.arq_func.delivery_engine.deliver', new_callable=AsyncMock) as mock_deliver, \
+         patch('bot.other_func.arq_func.logger.log') as mock_log:
+        mock_deliver.side_effect = ConnectionError("worker lost")
+        with pytest.raises(ConnectionError):
+            await send_reminder({**ctx, "job_try": 1}, reminder_id)
+
+        mock_deliver.side_effect = None
+        mock_deliver.return_value = False
+        with pytest.raises(Retry):
+            await send_reminder({**ctx, "job_try": 2}, reminder_id)
+        assert await send_reminder({**ctx, "job_try": 5}, reminder_id) is False
+        assert mock_log.call_args.args[0] == 'error'
+        assert [r["id"] for r in await get_all_reminders(message)] == [reminder_id]
+
+        mock_deliver.return_value = True
+        assert await send_reminder({**ctx, "job_try": 1}, reminder_id) is True
+
+    assert mock_deliver.await_count == 4
+    assert await get_all_reminders(message) == []
+
+
+@pytest.mark.asyncio
+async def test_job_started_before_commit_is_retried(database) -> None:
+    """Тест задачи, начавшейся раньше фиксации транзакции со строкой.
+
+    Проверяет, что задача уже наступившего напоминания, которую воркер взял до
+    фиксации транзакции, повторяется, а не теряет напоминание, и после
+    фиксации доставляет его.
+    """
+    user_id = TEST_USER_ID + 13
+    job_id = "reminder:before-commit"
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (user_id,))
+
+    with patch('bot.other_func.arq_func.delivery_engine.deliver', new_callable=AsyncMock) as mock_deliver, \
+         patch('bot.other_func.arq_func.logger.log'):
+        mock_deliver.return_value = True
+        async with database.cursor() as cursor:
+            await cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id)
+                   VALUES (%s, %s, %s, %s) RETURNING id""",
+                ("уже пора", datetime.now(), user_id, job_id)
+            )
+            reminder_id = (await cursor.fetchone())[0]
+            with pytest.raises(Retry):
+                await send_reminder({"bot": MagicMock(), "job_id": job_id, "job_try": 1}, reminder_id)
+
+        assert await send_reminder({"bot": MagicMock(), "job_id": job_id, "job_try": 2}, reminder_id) is True
+
+    mock_deliver.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_reminders_share_one_transaction(database) -> None:
+    """Тест сохранения нескольких напоминаний одной транзакцией.
+
+    Проверяет, что ID возвращаются в порядке напоминаний и каждому ставится
+    задача доставки, а при ошибке Redis не сохраняется ни одно напоминание.
+    """
+    redis = make_redis()
+    user_id = TEST_USER_ID + 8
+    when = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+    reminders = [format_reminder(f"напоминание {n}", when + timedelta(minutes=n)) for n in range(3)]
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (user_id,))
+
+    reminder_ids = await set_info_reminds(user_id, reminders, redis)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT id, reminder_text, job_id FROM main_schedule WHERE fk_user_id = %s""", (user_id,))
+        rows = {reminder_id: (text, job_id) for reminder_id, text, job_id in await cursor.fetchall()}
+    assert [rows[reminder_id][0] for reminder_id in reminder_ids] == ["напоминание 0", "напоминание 1", "напоминание 2"]
+    for reminder_id in reminder_ids:
+        job = deserialize_job(await redis.get(job_key_prefix + rows[reminder_id][1]), deserializer=job_deserializer)
+        assert (job.function, job.kwargs) == ("send_reminder", {"reminder_id": reminder_id})
+
+    pipe = MagicMock(execute=AsyncMock(side_effect=ConnectionError))
+    broken = MagicMock()
+    broken.pipeline.return_value.__aenter__.return_value = pipe
+    with pytest.raises(ConnectionError):
+        await set_info_reminds(user_id, reminders, broken)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT count(*) FROM main_schedule WHERE fk_user_id = %s""", (user_id,))
+        assert (await cursor.fetchone())[0] == 3
+
+
+@pytest.mark.asyncio
+async def test_recurring_reminder_keeps_one_row_and_job(database) -> None:
+    """Тест доставки повторяющегося напоминания.
+
+    Проверяет, что после доставки строка остается одна и переносится на
+    следующее повторение, а в очереди остается одна задача.
+    """
+    redis = make_redis()
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_USER_ID + 9, username=None))
+    when = (datetime.now() + timedelta(hours=1)).replace(second=0, microsecond=0)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (message.from_user.id,))
+
+    parsed = format_reminder("пить воду", when)._replace(recurrence="D")
+    reminder_id = await set_info_remind(message, parsed, redis)
+    with patch('bot.other_func.arq_func.delivery_engine.deliver', new_callable=AsyncMock, return_value=True), \
+         patch('bot.other_func.arq_func.logger.log'):
+        for day in range(1, 4):
+            job_id = (await redis.zrange(redis.default_queue_name, 0, -1))[0].decode()
+            assert await send_reminder({"bot": MagicMock(), "redis": redis, "job_id": job_id}, reminder_id) is True
+            await redis.delete(job_key_prefix + job_id)
+            await redis.zrem(redis.default_queue_name, job_id)
+
+            reminders = await get_all_reminders(message)
+            assert [(r["id"], r["datetime"], r["recurrence"]) for r in reminders] == \
+                [(reminder_id, when + timedelta(days=day), "D")]
+            assert await redis.zcard(redis.default_queue_name) == 1
+
@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from arq import ArqRedis
+from arq.constants import job_key_prefix
+from arq.jobs import deserialize_job
+from arq.utils import to_unix_ms
+
+from bot.other_func.job_recovery import recover_jobs
+from bot.other_func.reminder_jobs import job_deserializer, job_serializer
+from tests.test_db import TEST_USER_ID
+
+fakeredis = pytest.importorskip("fakeredis")
+
+USER_ID = TEST_USER_ID + 3
+
+
+def make_redis() -> ArqRedis:
+    """Создать ArqRedis поверх Redis в памяти с сериализатором задач бота."""
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+    from redis.asyncio import ConnectionPool
+
+    return ArqRedis(connection_pool=ConnectionPool(
+        connection_class=FakeAsyncRedisConnection, server=fakeredis.FakeServer()
+    ), job_serializer=job_serializer, job_deserializer=job_deserializer)
+
+
+@pytest.mark.asyncio
+async def test_recover_jobs_is_idempotent(database) -> None:
+    """Тест восстановления очереди из main_schedule.
+
+    Проверяет, что задачи ставятся только для напоминаний без живой задачи,
+    в том числе без ID задачи, с прежним ID и временем, а повторный запуск
+    ничего не добавляет.
+    """
+    redis = make_redis()
+    now = datetime.now()
+    rows = [
+        ("живая задача", now + timedelta(hours=1), "reminder:live"),
+        ("потерянная задача", now + timedelta(hours=2), "reminder:lost"),
+        ("без задачи", now + timedelta(hours=3), None),
+        ("давно прошедшее", now - timedelta(days=2), "reminder:old"),
+    ]
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (USER_ID,))
+        ids = []
+        for text, when, job_id in rows:
+            await cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, job_id)
+                   VALUES (%s, %s, %s, %s) RETURNING id""",
+                (text, when, USER_ID, job_id)
+            )
+            ids.append((await cursor.fetchone())[0])
+    await redis.enqueue_job("send_reminder", _job_id="reminder:live", _defer_until=rows[0][1], reminder_id=ids[0])
+
+    with patch('bot.other_func.job_recovery.logger.log'):
+        first = await recover_jobs(redis, batch_size=1, lookback=timedelta(hours=1))
+        second = await recover_jobs(redis, batch_size=2, lookback=timedelta(hours=1))
+
+    assert first.enqueued >= 2 and first.scanned >= 3
+    assert second.enqueued == 0
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT job_id FROM main_schedule WHERE id = %s""", (ids[2],))
+        unlinked_job_id = (await cursor.fetchone())[0]
+    assert unlinked_job_id is not None
+
+    for reminder_id, job_id, when in ((ids[1], "reminder:lost", rows[1][1]), (ids[2], unlinked_job_id, rows[2][1])):
+        job = deserialize_job(await redis.get(job_key_prefix + job_id), deserializer=job_deserializer)
+        assert (job.function, job.kwargs) == ("send_reminder", {"reminder_id": reminder_id})
+        assert await redis.zscore(redis.default_queue_name, job_id) == to_unix_ms(when)
+    assert not await redis.exists(job_key_prefix + "reminder:old")
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from unittest.mock import patch
+
+from bot.db.migrations import MIGRATIONS, Migration, apply_migrations, get_schema_version
+from tests.test_db import TEST_USER_ID
+
+
+async def plan_node_types(cursor, query: str) -> set[str]:
+    """Вернуть типы узлов плана запроса.
+
+    Просмотры пустых секций main_schedule не учитываются: для них полный
+    просмотр дешевле индекса.
+    """
+    await cursor.execute(
+        """SELECT relname FROM pg_class
+           WHERE relname LIKE 'main_schedule%%' AND relkind = 'r' AND reltuples = 0"""
+    )
+    empty = {row[0] for row in await cursor.fetchall()}
+    await cursor.execute(f"EXPLAIN (FORMAT JSON) {query}")
+    plan = (await cursor.fetchone())[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes, types = [plan[0]["Plan"]], set()
+    while nodes:
+        node = nodes.pop()
+        if node.get("Relation Name") not in empty:
+            types.add(node["Node Type"])
+        nodes.extend(node.get("Plans", []))
+    return types
+
+
+@pytest.mark.asyncio
+async def test_migrations_are_recorded_and_idempotent(database) -> None:
+    """Тест применения миграций.
+
+    Проверяет, что версия схемы записывается, повторный запуск ничего не меняет,
+    а ID Telegram хранятся в bigint.
+    """
+    latest = MIGRATIONS[-1].version
+
+    assert await apply_migrations() == latest
+    assert await get_schema_version() == latest
+
+    async with database.cursor() as cursor:
+        await cursor.execute(
+            """SELECT table_name, column_name, data_type FROM information_schema.columns
+               WHERE (table_name, column_name) IN (('main_users', 'tg_id'), ('main_schedule', 'fk_user_id'))"""
+        )
+        assert {row[2] for row in await cursor.fetchall()} == {"bigint"}
+
+        await cursor.execute(
+            """INSERT INTO main_users (tg_id, tg_username) VALUES (%s, NULL) RETURNING tg_id""",
+            (TEST_USER_ID + 2**32,)
+        )
+        assert (await cursor.fetchone())[0] == TEST_USER_ID + 2**32
+        await cursor.execute("""DELETE FROM main_users WHERE tg_id = %s""", (TEST_USER_ID + 2**32,))
+
+
+@pytest.mark.asyncio
+async def test_migrations_ignore_query_timeout(database) -> None:
+    """Тест ограничения времени запроса при миграциях.
+
+    Проверяет, что миграции выполняются без statement_timeout пула, который
+    прервал бы перестройку большой таблицы.
+    """
+    check = Migration(10_000, "Проверка statement_timeout", (
+        """DO $$
+           BEGIN
+               IF current_setting('statement_timeout') <> '0' THEN
+                   RAISE EXCEPTION 'statement_timeout = %', current_setting('statement_timeout');
+               END IF;
+           END;
+           $$""",
+    ))
+
+    try:
+        with patch('bot.db.migrations.MIGRATIONS', MIGRATIONS + [check]), patch('bot.db.migrations.logger.log'):
+            assert await apply_migrations() == check.version
+        async with database.cursor() as cursor:
+            await cursor.execute("""SHOW statement_timeout""")
+            assert (await cursor.fetchone())[0] != "0"
+    finally:
+        async with database.cursor() as cursor:
+            await cursor.execute("""DELETE FROM schema_version WHERE version = %s""", (check.version,))
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(database) -> None:
+    """Тест планов горячих запросов.
+
+    Проверяет через EXPLAIN, что выборка напоминаний пользователя и поиск
+    просроченных напоминаний используют индексы, а не полный просмотр секций.
+    """
+    async with database.cursor() as cursor:
+        await cursor.execute(
+            """INSERT INTO main_users (tg_id, tg_username)
+               SELECT %s + n, NULL FROM generate_series(0, 499) AS n""",
+            (TEST_USER_ID,)
+        )
+        await cursor.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id)
+               SELECT 'тест', now() + (n || ' minutes')::interval, %s + n %% 500
+               FROM generate_series(1, 50000) AS n""",
+            (TEST_USER_ID,)
+        )
+        await cursor.execute("ANALYZE main_schedule")
+
+        user_id = TEST_USER_ID + 7
+        list_plan = await plan_node_types(
+            cursor,
+            f"SELECT id, reminder_text, reminder_datetime FROM main_schedule WHERE fk_user_id = {user_id}"
+        )
+        ordered_plan = await plan_node_types(
+            cursor,
+            f"""SELECT id FROM main_schedule WHERE fk_user_id = {user_id}
+                ORDER BY reminder_datetime LIMIT 10"""
+        )
+        sweep_plan = await plan_node_types(
+            cursor,
+            "SELECT id FROM main_schedule WHERE reminder_datetime < now() LIMIT 1000"
+        )
+
+    for types in (list_plan, ordered_plan, sweep_plan):
+        assert "Seq Scan" not in types
+        assert types & {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
@@ -0,0 +1,91 @@
+import json
+import statistics
+import time
+
+import pytest
+
+from bot.db.db_func import get_reminders_page
+from tests.test_db import TEST_USER_ID
+
+PAGE_SIZE = 10
+TOTAL = 10_000
+
+
+async def fill_user(cursor, user_id: int) -> None:
+    """Создать пользователя с TOTAL напоминаниями, часть из которых на одно время."""
+    await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (user_id,))
+    await cursor.execute(
+        """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id)
+           SELECT 'тест ' || n, TIMESTAMP '2030-01-01' + (n / 3 || ' minutes')::interval, %s
+           FROM generate_series(1, %s) AS n""",
+        (user_id, TOTAL)
+    )
+    await cursor.execute("ANALYZE main_schedule")
+
+
+async def timed_page(user_id: int, cursor=None, backward: bool = False):
+    """Получить страницу и время запроса в секундах."""
+    started = time.perf_counter()
+    page, has_more = await get_reminders_page(user_id, PAGE_SIZE, cursor, backward)
+    return page, has_more, time.perf_counter() - started
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_list_in_constant_time(database) -> None:
+    """Тест постраничного вывода для пользователя с 10 000 напоминаний.
+
+    Проверяет, что листание вперед и назад проходит весь список без пропусков
+    и повторов в порядке (reminder_datetime, id), а последние страницы читаются
+    так же быстро, как первые: план запроса просматривает только PAGE_SIZE + 1 строк.
+    """
+    user_id = TEST_USER_ID + 4
+    async with database.cursor() as cursor:
+        await fill_user(cursor, user_id)
+        await cursor.execute(
+            """SELECT reminder_datetime, id FROM main_schedule WHERE fk_user_id = %s ORDER BY reminder_datetime, id""",
+            (user_id,)
+        )
+        rows = await cursor.fetchall()
+        expected = [row[1] for row in rows]
+
+    seen, timings, cursor_row, has_more = [], [], None, True
+    while has_more:
+        page, has_more, elapsed = await timed_page(user_id, cursor_row)
+        seen.extend(reminder["id"] for reminder in page)
+        timings.append(elapsed)
+        cursor_row = (page[-1]["datetime"], page[-1]["id"])
+
+    assert seen == expected
+    assert len(timings) == TOTAL // PAGE_SIZE
+
+    back, has_more = [], True
+    cursor_row = (page[0]["datetime"], page[0]["id"])
+    while has_more:
+        page, has_more, _ = await timed_page(user_id, cursor_row, backward=True)
+        back = [reminder["id"] for reminder in page] + back
+        cursor_row = (page[0]["datetime"], page[0]["id"])
+    assert back == expected[:-PAGE_SIZE]
+
+    first, last = statistics.median(timings[:50]), statistics.median(timings[-50:])
+    assert last < first * 3 + 0.002
+
+    async with database.cursor() as cursor:
+        await cursor.execute(
+            """EXPLAIN (ANALYZE, FORMAT JSON)
+               SELECT id, reminder_text, reminder_datetime FROM main_schedule
+               WHERE fk_user_id = %s AND (reminder_datetime, id) > (%s, %s)
+               ORDER BY reminder_datetime, id LIMIT %s""",
+            (user_id, *rows[-PAGE_SIZE - 1], PAGE_SIZE + 1)
+        )
+        plan = (await cursor.fetchone())[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    # Просмотры секций main_schedule, прочитавшие хотя бы одну строку
+    nodes, scans = [plan[0]["Plan"]], []
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get("Plans", []))
+        if not node.get("Plans") and node["Actual Rows"] + node.get("Rows Removed by Filter", 0) > 0:
+            scans.append(node)
+
+    assert scans and all(scan["Node Type"] in {"Index Scan", "Index Only Scan"} for scan in scans)
+    assert sum(scan["Actual Rows"] + scan.get("Rows Removed by Filter", 0) for scan in scans) <= PAGE_SIZE + 1
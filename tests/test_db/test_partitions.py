@@ -0,0 +1,120 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from bot.db.db_func import get_all_reminders
+from bot.db.partitions import drop_expired_partitions, ensure_partitions, list_partitions
+from tests.test_db import TEST_USER_ID
+
+USER_ID = TEST_USER_ID + 5
+# Секции теста лежат в 2001 году, чтобы проход не задел секции текущих напоминаний
+MONTHS = ("2001_01", "2001_02", "2001_03", "2001_04")
+
+
+async def drop_test_partitions(cursor) -> None:
+    """Удалить секции и архивные секции тестовых месяцев."""
+    for month in MONTHS:
+        await cursor.execute(f"""DROP TABLE IF EXISTS main_schedule_{month}, main_schedule_archive_{month}""")
+
+
+@pytest.mark.asyncio
+async def test_retention_never_touches_live_partitions(database) -> None:
+    """Тест удаления просроченных секций.
+
+    Проверяет, что секции прошедших месяцев создаются для строк из секции по
+    умолчанию, просроченная секция переносится в архив или удаляется целиком,
+    а секция с повторяющимся напоминанием, секция текущего месяца с
+    просроченной строкой и секции будущих месяцев остаются со всеми строками.
+    """
+    now = datetime(2001, 3, 15, 12, 0)
+    rows = [
+        ("январь", datetime(2001, 1, 10, 9, 0), None),
+        ("февраль", datetime(2001, 2, 10, 9, 0), "D"),
+        ("март", datetime(2001, 3, 10, 9, 0), None),
+        ("апрель", datetime(2001, 4, 10, 9, 0), None),
+    ]
+    async with database.cursor() as cursor:
+        await drop_test_partitions(cursor)
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (USER_ID,))
+        for text, when, recurrence in rows:
+            await cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, recurrence)
+                   VALUES (%s, %s, %s, %s)""",
+                (text, when, USER_ID, recurrence)
+            )
+
+    try:
+        with patch('bot.db.partitions.logger.log'):
+            assert await ensure_partitions(now, ahead=1) == 4
+            assert await ensure_partitions(now, ahead=1) == 0
+            names = {partition.name for partition in await list_partitions()}
+            assert {f"main_schedule_{month}" for month in MONTHS} <= names
+
+            archived = await drop_expired_partitions(now - timedelta(hours=1), archive=True)
+
+        assert "main_schedule_2001_01" in archived
+        assert not {f"main_schedule_{month}" for month in MONTHS[1:]} & set(archived)
+
+        async with database.cursor() as cursor:
+            await cursor.execute(
+                """SELECT reminder_text, tableoid::regclass::text FROM main_schedule
+                   WHERE fk_user_id = %s ORDER BY reminder_datetime""",
+                (USER_ID,)
+            )
+            assert await cursor.fetchall() == [
+                ("февраль", "main_schedule_2001_02"),
+                ("март", "main_schedule_2001_03"),
+                ("апрель", "main_schedule_2001_04"),
+            ]
+            await cursor.execute(
+                """SELECT reminder_text, tableoid::regclass::text FROM main_schedule_archive
+                   WHERE fk_user_id = %s""",
+                (USER_ID,)
+            )
+            assert await cursor.fetchall() == [("январь", "main_schedule_archive_2001_01")]
+
+            await cursor.execute("""UPDATE main_schedule SET recurrence = NULL WHERE fk_user_id = %s""", (USER_ID,))
+
+        with patch('bot.db.partitions.logger.log'):
+            dropped = await drop_expired_partitions(now - timedelta(hours=1))
+
+        assert "main_schedule_2001_02" in dropped
+        async with database.cursor() as cursor:
+            await cursor.execute("""SELECT to_regclass('main_schedule_2001_02')""")
+            assert (await cursor.fetchone())[0] is None
+            await cursor.execute(
+                """SELECT reminder_text FROM main_schedule WHERE fk_user_id = %s ORDER BY reminder_datetime""",
+                (USER_ID,)
+            )
+            assert await cursor.fetchall() == [("март",), ("апрель",)]
+    finally:
+        async with database.cursor() as cursor:
+            await drop_test_partitions(cursor)
+
+
+@pytest.mark.asyncio
+async def test_lists_hide_expired_reminders(database) -> None:
+    """Тест списка напоминаний до удаления секции.
+
+    Проверяет, что однократное напоминание, просроченное больше EXPIRY_GRACE
+    назад, не показывается, а повторяющееся и будущее показываются.
+    """
+    now = datetime.now().replace(microsecond=0)
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (USER_ID,))
+        for text, when, recurrence in (
+            ("просроченное", now - timedelta(days=1), None),
+            ("повторяющееся", now - timedelta(days=1), "D"),
+            ("будущее", now + timedelta(days=1), None),
+        ):
+            await cursor.execute(
+                """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, recurrence)
+                   VALUES (%s, %s, %s, %s)""",
+                (text, when, USER_ID, recurrence)
+            )
+
+    message = MagicMock()
+    message.from_user.id = USER_ID
+    reminders = await get_all_reminders(message)
+
+    assert [reminder["text"] for reminder in reminders] == ["повторяющееся", "будущее"]
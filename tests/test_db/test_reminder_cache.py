@@ -0,0 +1,105 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bot.db.db_func import (complete_reminder, delete_reminder_at, get_reminders_page, set_info_remind,
+                            set_info_reminds, update_reminder_at)
+from bot.db.reminder_cache import ReminderPageCache, reminder_cache
+from bot.other_func.reminder_analysis import format_reminder
+from tests.test_db import TEST_USER_ID
+
+fakeredis = pytest.importorskip("fakeredis")
+
+PAGE_SIZE = 2
+
+
+def make_redis():
+    """Создать клиент Redis в памяти."""
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def cache():
+    """Подключить общий кэш страниц к Redis в памяти на время теста."""
+    reminder_cache.attach(make_redis())
+    reminder_cache.hits = reminder_cache.misses = reminder_cache.invalidations = 0
+    try:
+        yield reminder_cache
+    finally:
+        reminder_cache.attach(None)
+
+
+@pytest.mark.asyncio
+async def test_stale_put_is_never_served() -> None:
+    """Тест гонки чтения и изменения.
+
+    Проверяет, что страница, прочитанная до изменения и записанная в кэш после
+    сброса пользователя или всех списков, не выдается следующим чтениям.
+    """
+    cache = ReminderPageCache(ttl=60)
+    cache.attach(make_redis())
+    when = datetime(2030, 1, 1, 10, 0)
+
+    generation, cached = await cache.get(1, PAGE_SIZE)
+    assert cached is None
+
+    await cache.invalidate(1)
+    await cache.put(1, PAGE_SIZE, generation, [{"id": 1, "text": "удаленное", "datetime": when}], False)
+    assert (await cache.get(1, PAGE_SIZE))[1] is None
+
+    generation = (await cache.get(1, PAGE_SIZE))[0]
+    await cache.invalidate_all()
+    await cache.put(1, PAGE_SIZE, generation, [{"id": 1, "text": "из удаленной секции", "datetime": when}], False)
+    assert (await cache.get(1, PAGE_SIZE))[1] is None
+
+    await cache.put(1, PAGE_SIZE, (await cache.get(1, PAGE_SIZE))[0], [], False)
+    assert (await cache.get(1, PAGE_SIZE))[1] == ([], False)
+    assert (await cache.get(1, PAGE_SIZE + 1))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_cached_page_follows_changes(database, cache) -> None:
+    """Тест кэша первой страницы поверх базы данных.
+
+    Проверяет, что повторный запрос первой страницы обслуживается из кэша, а
+    после создания, редактирования, удаления и доставки напоминаний страница
+    из кэша совпадает с базой данных и не показывает удаленные или измененные
+    напоминания. Страница с просроченным напоминанием читается из базы заново.
+    """
+    user_id = TEST_USER_ID + 12
+    message = SimpleNamespace(from_user=SimpleNamespace(id=user_id, username=None))
+    soon = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+    later = soon + timedelta(hours=1)
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (user_id,))
+
+    async def texts() -> list:
+        reminders, has_next = await get_reminders_page(user_id, PAGE_SIZE)
+        return [reminder["text"] for reminder in reminders] + (["..."] if has_next else [])
+
+    await set_info_remind(message, format_reminder("первое", soon))
+    await set_info_remind(message, format_reminder("второе", later))
+
+    assert await texts() == ["первое", "второе"]
+    assert await texts() == ["первое", "второе"]
+    assert cache.stats()["hits"] == 1
+
+    await update_reminder_at(user_id, 1, "первое изменено", soon)
+    assert await texts() == ["первое изменено", "второе"]
+
+    await set_info_reminds(user_id, [format_reminder("третье", later + timedelta(hours=1))])
+    assert await texts() == ["первое изменено", "второе", "..."]
+
+    await delete_reminder_at(user_id, 2)
+    assert await texts() == ["первое изменено", "третье"]
+
+    first, _ = await get_reminders_page(user_id, PAGE_SIZE)
+    assert await complete_reminder(first[0]["id"], None, when=soon)
+    assert await texts() == ["третье"]
+
+    with patch('bot.db.db_func.expiry_cutoff', return_value=later + timedelta(hours=2)):
+        assert await texts() == []
+
+    assert cache.stats() == {"hits": 2, "misses": 6, "invalidations": 6, "hit_rate": 0.25}
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from bot.db.sweeper import ExpirySweeper
+from tests import assert_logged
+
+@pytest.mark.asyncio
+async def test_sweeper_starts_once_and_stops() -> None:
+    """Тест запуска и остановки очистки просроченных напоминаний.
+
+    Проверяет, что повторный запуск не создает вторую задачу, а остановка
+    дожидается завершения текущего прохода, который создает секции вперед и
+    удаляет просроченные.
+    """
+    sweeper = ExpirySweeper(interval=3600, grace=600, ahead=2, archive=True)
+
+    with patch('bot.db.sweeper.logger.log'), \
+         patch('bot.db.sweeper.ensure_partitions', new_callable=AsyncMock, return_value=0) as mock_ensure, \
+         patch('bot.db.sweeper.drop_expired_partitions', new_callable=AsyncMock) as mock_drop:
+
+        mock_drop.return_value = ["main_schedule_2024_01", "main_schedule_2024_02", "main_schedule_2024_03"]
+
+        sweeper.start()
+        task = sweeper._task
+        sweeper.start()
+        await asyncio.sleep(0)
+
+        assert sweeper._task is task
+        await sweeper.stop()
+
+        assert not sweeper.is_running
+        mock_ensure.assert_called_once()
+        assert mock_ensure.call_args.args[1] == 2
+        mock_drop.assert_called_once()
+        assert mock_drop.call_args.args[0] <= datetime.now() - timedelta(seconds=600)
+        assert mock_drop.call_args.args[1] is True
+        assert sweeper.total_removed == 3
+
+
+@pytest.mark.asyncio
+async def test_sweeper_survives_errors() -> None:
+    """Тест обработки ошибок базы данных при очистке.
+
+    Проверяет, что ошибка прохода логируется, а задача продолжает работать.
+    """
+    sweeper = ExpirySweeper(interval=0)
+
+    with patch('bot.db.sweeper.logger.log') as mock_log, \
+         patch('bot.db.sweeper.ensure_partitions', new_callable=AsyncMock, return_value=0), \
+         patch('bot.db.sweeper.drop_expired_partitions', new_callable=AsyncMock) as mock_drop:
+
+        mock_drop.side_effect = [Exception("connection lost"), ["main_schedule_2024_01", "main_schedule_2024_02"],
+                                 [], [], []]
+
+        sweeper.start()
+        while mock_drop.call_count < 2:
+            await asyncio.sleep(0)
+        await sweeper.stop()
+
+        assert_logged(mock_log, 'error', 'PostgresSQL ERROR in expiry_sweeper: connection lost')
+        assert sweeper.total_removed == 2
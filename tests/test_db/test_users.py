@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bot.db.db_func import get_user, set_info_remind
+from bot.db.user_cache import KnownUserCache, known_users
+from bot.other_func.reminder_analysis import format_reminder
+from tests.test_db import TEST_USER_ID
+
+USER_ID = TEST_USER_ID + 6
+
+
+def make_message(username: str) -> SimpleNamespace:
+    """Создать сообщение тестового пользователя."""
+    return SimpleNamespace(from_user=SimpleNamespace(id=USER_ID, username=username))
+
+
+def test_known_user_cache_is_bounded() -> None:
+    """Тест LRU-кэша известных пользователей.
+
+    Проверяет, что смена имени пользователя — промах, самый давний
+    пользователь вытесняется, а нулевой размер отключает кэш.
+    """
+    cache = KnownUserCache(maxsize=2)
+    cache.add(1, "first")
+    cache.add(2, "second")
+
+    assert cache.is_known(1, "first")
+    assert not cache.is_known(1, "renamed")
+    cache.add(3, "third")
+
+    assert not cache.is_known(2, "second")
+    assert cache.is_known(1, "first")
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 2, "hit_rate": 0.5}
+
+    disabled = KnownUserCache(maxsize=0)
+    disabled.add(1, "first")
+    assert not disabled.is_known(1, "first")
+
+
+@pytest.mark.asyncio
+async def test_registration_skips_known_users(database) -> None:
+    """Тест регистрации пользователя через upsert.
+
+    Проверяет, что повторный /start не обращается к базе данных и не пишет
+    ошибку, смена имени обновляет строку пользователя, а напоминание
+    пользователя, не нажимавшего /start или удаленного из базы, сохраняется
+    вместе с ним.
+    """
+    with patch('bot.db.db_func.logger.log') as mock_log:
+        await get_user(make_message("ninja"))
+        with patch('bot.db.db_func.db_pool.cursor') as mock_cursor:
+            await get_user(make_message("ninja"))
+        mock_cursor.assert_not_called()
+
+        await get_user(make_message("renamed"))
+        mock_log.assert_not_called()
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT tg_username FROM main_users WHERE tg_id = %s""", (USER_ID,))
+        assert await cursor.fetchall() == [("renamed",)]
+        await cursor.execute("""DELETE FROM main_users WHERE tg_id = %s""", (USER_ID,))
+    assert known_users.stats()["hits"] >= 1
+
+    # После удаления пользователя из базы кэш устарел: неудачная вставка сбрасывает его
+    when = datetime.now() + timedelta(hours=1)
+    with patch('bot.db.db_func.logger.log') as mock_log:
+        assert await set_info_remind(make_message("renamed"), format_reminder("без /start", when)) is None
+    assert mock_log.call_args.args[0] == 'error'
+    reminder_id = await set_info_remind(make_message("ninja"), format_reminder("без /start", when))
+
+    assert reminder_id is not None
+    assert known_users.is_known(USER_ID, "ninja")
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT tg_username FROM main_users WHERE tg_id = %s""", (USER_ID,))
+        assert await cursor.fetchall() == [("ninja",)]
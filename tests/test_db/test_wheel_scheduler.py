@@ -0,0 +1,137 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from bot.other_func.wheel_scheduler import WheelScheduler
+from tests.test_db import TEST_USER_ID
+
+TICK = 0.05
+
+
+async def insert_reminder(database, text: str, when: datetime, recurrence: Optional[str] = None) -> int:
+    """Добавить напоминание тестового пользователя и вернуть его ID."""
+    async with database.cursor() as cursor:
+        await cursor.execute(
+            """INSERT INTO main_schedule (reminder_text, reminder_datetime, fk_user_id, recurrence)
+               VALUES (%s, %s, %s, %s) RETURNING id""",
+            (text, when, TEST_USER_ID + 7, recurrence)
+        )
+        return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_wheel_delivers_on_time_and_follows_changes(database) -> None:
+    """Тест доставки напоминаний колесом таймеров.
+
+    Проверяет, что напоминания, добавленные и перенесенные после запуска,
+    срабатывают не раньше срока и не позже чем через тик с небольшим запасом,
+    а удаленное до срока напоминание не отправляется.
+    """
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (TEST_USER_ID + 7,))
+
+    sent = []
+
+    async def fake_send(ctx: dict, chat_id: int, text: str) -> bool:
+        sent.append((text, time.time(), ctx['score'] / 1000))
+        return True
+
+    scheduler = WheelScheduler(tick=TICK, window=3600, catchup=0)
+    with patch('bot.other_func.wheel_scheduler.send_message', side_effect=fake_send), \
+         patch('bot.other_func.wheel_scheduler.logger.log'):
+        runner = asyncio.create_task(scheduler.run(MagicMock()))
+        while scheduler._loaded_until is None:
+            await asyncio.sleep(0.01)
+
+        now = datetime.now()
+        await insert_reminder(database, "новое", now + timedelta(seconds=0.6))
+        deleted = await insert_reminder(database, "удаленное", now + timedelta(seconds=0.7))
+        moved = await insert_reminder(database, "перенесенное", now + timedelta(hours=2))
+        async with database.cursor() as cursor:
+            await cursor.execute("""DELETE FROM main_schedule WHERE id = %s""", (deleted,))
+            await cursor.execute("""UPDATE main_schedule SET reminder_datetime = %s WHERE id = %s""",
+                                 (now + timedelta(seconds=0.8), moved))
+
+        await asyncio.sleep(1.5)
+        scheduler.stop()
+        await runner
+
+    mine = {text: (fired, due) for text, fired, due in sent if text.startswith("Пришло время:")}
+    assert set(mine) == {"Пришло время:\nновое", "Пришло время:\nперенесенное"}
+    for fired, due in mine.values():
+        assert 0 <= fired - due < TICK + 0.1
+    assert deleted not in scheduler.wheel
+
+
+@pytest.mark.asyncio
+async def test_wheel_advances_recurring_reminder(database) -> None:
+    """Тест повторяющегося напоминания на колесе таймеров.
+
+    Проверяет, что сработавшее повторяющееся напоминание переносится в базе
+    данных на следующий день и снова планируется по уведомлению триггера.
+    """
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (TEST_USER_ID + 7,))
+
+    scheduler = WheelScheduler(tick=TICK, window=2 * 86400, catchup=0)
+    with patch('bot.other_func.wheel_scheduler.send_message', return_value=True) as mock_send, \
+         patch('bot.other_func.wheel_scheduler.logger.log'):
+        runner = asyncio.create_task(scheduler.run(MagicMock()))
+        while scheduler._loaded_until is None:
+            await asyncio.sleep(0.01)
+
+        when = datetime.now() + timedelta(seconds=0.5)
+        reminder_id = await insert_reminder(database, "пить воду", when, "D")
+        await asyncio.sleep(1.2)
+        scheduler.stop()
+        await runner
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT reminder_datetime FROM main_schedule WHERE id = %s""", (reminder_id,))
+        assert (await cursor.fetchone())[0] == when + timedelta(days=1)
+    mock_send.assert_called_once()
+    assert scheduler._reminders[reminder_id][2:] == (when + timedelta(days=1), "D")
+
+
+@pytest.mark.asyncio
+async def test_wheel_completes_only_delivered_reminders(database) -> None:
+    """Тест завершения напоминаний колесом таймеров после отправки.
+
+    Проверяет, что строка доставленного однократного напоминания удаляется,
+    поэтому перезапуск с догрузкой прошедших catchup секунд не отправляет его
+    снова, а строка недоставленного напоминания остается в базе данных.
+    """
+    async with database.cursor() as cursor:
+        await cursor.execute("""INSERT INTO main_users (tg_id) VALUES (%s)""", (TEST_USER_ID + 7,))
+
+    async def fake_send(ctx: dict, chat_id: int, text: str) -> bool:
+        return "доставить" in text
+
+    scheduler = WheelScheduler(tick=TICK, window=3600, catchup=0)
+    with patch('bot.other_func.wheel_scheduler.send_message', side_effect=fake_send), \
+         patch('bot.other_func.wheel_scheduler.logger.log') as mock_log:
+        runner = asyncio.create_task(scheduler.run(MagicMock()))
+        while scheduler._loaded_until is None:
+            await asyncio.sleep(0.01)
+
+        when = datetime.now() + timedelta(seconds=0.5)
+        delivered = await insert_reminder(database, "доставить", when)
+        failed = await insert_reminder(database, "не отправится", when)
+        await asyncio.sleep(1.2)
+        scheduler.stop()
+        await runner
+
+    async with database.cursor() as cursor:
+        await cursor.execute("""SELECT id FROM main_schedule WHERE id = ANY(%s)""", ([delivered, failed],))
+        assert await cursor.fetchall() == [(failed,)]
+    mock_log.assert_any_call('error', 'Напоминание %s не доставлено колесом таймеров и осталось в базе данных', failed)
+
+    restarted = WheelScheduler(tick=TICK, window=3600, catchup=60)
+    with patch('bot.other_func.wheel_scheduler.logger.log'):
+        await restarted.reload(datetime.now() - timedelta(seconds=60))
+    assert delivered not in restarted.wheel
+    assert failed in restarted.wheel
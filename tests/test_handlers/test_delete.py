@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, patch
 
 from bot.handlers.user_handlers import handle_delete_reminder
+from tests import assert_logged
 
 @pytest.mark.asyncio
 async def test_handle_delete_reminder() -> None:
@@ -12,21 +13,19 @@ async def test_handle_delete_reminder() -> None:
     message = AsyncMock()
     message.from_user.id = 12345
     message.text = "/delete_reminder 1"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders, \
-         patch('bot.handlers.user_handlers.delete_reminder', new_callable=AsyncMock) as mock_delete_reminder:
+         patch('bot.handlers.user_handlers.delete_reminder_at', new_callable=AsyncMock) as mock_delete_reminder:
         
-        mock_get_all_reminders.return_value = reminders
-        mock_delete_reminder.return_value = "Напоминание удалено"
+        mock_delete_reminder.return_value = {'id': 1, 'text': 'Напоминание 1'}
         
-        await handle_delete_reminder(message)
+        await handle_delete_reminder(message, redis_pool)
         
-        message.reply.assert_called_with("Напоминание удалено")
-        mock_log.assert_any_call('info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Напоминание с ID 1 удалено для пользователя: {message.from_user.id}')
+        message.reply.assert_called_with('Напоминание "Напоминание 1" успешно удалено.')
+        mock_delete_reminder.assert_called_once_with(12345, 1, redis_pool)
+        assert_logged(mock_log, 'info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Напоминание с ID 1 удалено для пользователя: {message.from_user.id}')
 
 
 @pytest.mark.asyncio
@@ -38,19 +37,20 @@ async def test_handle_delete_reminder_invalid_number() -> None:
     message = AsyncMock()
     message.from_user.id = 12345
     message.text = "/delete_reminder 3"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders:
+         patch('bot.handlers.user_handlers.delete_reminder_at', new_callable=AsyncMock) as mock_delete_reminder:
         
-        mock_get_all_reminders.return_value = reminders
+        mock_delete_reminder.return_value = None
         
-        await handle_delete_reminder(message)
+        await handle_delete_reminder(message, redis_pool)
+        
+        mock_delete_reminder.assert_called_once_with(12345, 3, redis_pool)
         
         message.reply.assert_called_with("Пожалуйста, укажите корректный номер напоминания.")
-        mock_log.assert_any_call('info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Ошибка: неверный номер напоминания для пользователя: {message.from_user.id}. Ошибка: Номер напоминания вне диапазона.')
+        assert_logged(mock_log, 'info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Ошибка: неверный номер напоминания для пользователя: {message.from_user.id}. Ошибка: Номер напоминания вне диапазона.')
 
 
 @pytest.mark.asyncio
@@ -62,18 +62,15 @@ async def test_handle_delete_reminder_exception() -> None:
     message = AsyncMock()
     message.from_user.id = 12345
     message.text = "/delete_reminder 1"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders, \
-         patch('bot.handlers.user_handlers.delete_reminder', new_callable=AsyncMock) as mock_delete_reminder:
+         patch('bot.handlers.user_handlers.delete_reminder_at', new_callable=AsyncMock) as mock_delete_reminder:
         
-        mock_get_all_reminders.return_value = reminders
         mock_delete_reminder.side_effect = Exception("Unexpected error")
         
-        await handle_delete_reminder(message)
+        await handle_delete_reminder(message, redis_pool)
         
         message.reply.assert_called_with("Произошла ошибка при удалении напоминания.")
-        mock_log.assert_any_call('info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: Unexpected error')
\ No newline at end of file
+        assert_logged(mock_log, 'info', f'Команда /delete_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: Unexpected error')
\ No newline at end of file
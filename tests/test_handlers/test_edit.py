@@ -1,7 +1,9 @@
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
 from bot.handlers.user_handlers import handle_edit_reminder
+from tests import assert_logged
 
 @pytest.mark.asyncio
 async def test_handle_edit_reminder() -> None:
@@ -11,22 +13,20 @@ async def test_handle_edit_reminder() -> None:
     """
     message = AsyncMock()
     message.from_user.id = 12345
-    message.text = "/edit_reminder 1 Новый текст напоминания 2024-10-25 14:30:00"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    message.text = "/edit_reminder 1 Новый текст напоминания 2099-10-25 14:30:00"
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders, \
-         patch('bot.handlers.user_handlers.update_reminder', new_callable=AsyncMock) as mock_update_reminder:
+         patch('bot.handlers.user_handlers.update_reminder_at', new_callable=AsyncMock) as mock_update_reminder:
         
-        mock_get_all_reminders.return_value = reminders
-        mock_update_reminder.return_value = "Напоминание обновлено"
+        mock_update_reminder.return_value = {'id': 1, 'text': 'Новый текст напоминания', 'datetime': datetime(2099, 10, 25, 14, 30)}
         
-        await handle_edit_reminder(message)
+        await handle_edit_reminder(message, redis_pool)
         
-        message.reply.assert_called_with("Напоминание обновлено")
-        mock_log.assert_any_call('info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Напоминание с ID 1 обновлено для пользователя: {message.from_user.id}')
+        message.reply.assert_called_with('Напоминание успешно обновлено!\n📝 "Новый текст напоминания"\n🗓 2099-10-25 14:30:00')
+        mock_update_reminder.assert_called_once_with(12345, 1, "Новый текст напоминания", datetime(2099, 10, 25, 14, 30), redis_pool)
+        assert_logged(mock_log, 'info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Напоминание с ID 1 обновлено для пользователя: {message.from_user.id}')
 
 
 @pytest.mark.asyncio
@@ -37,20 +37,19 @@ async def test_handle_edit_reminder_invalid_number() -> None:
     """
     message = AsyncMock()
     message.from_user.id = 12345
-    message.text = "/edit_reminder 3 Новый текст напоминания 2024-10-25 14:30:00"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    message.text = "/edit_reminder 3 Новый текст напоминания 2099-10-25 14:30:00"
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders:
+         patch('bot.handlers.user_handlers.update_reminder_at', new_callable=AsyncMock) as mock_update_reminder:
         
-        mock_get_all_reminders.return_value = reminders
+        mock_update_reminder.return_value = None
         
-        await handle_edit_reminder(message)
+        await handle_edit_reminder(message, redis_pool)
         
         message.reply.assert_called_with("Пожалуйста, укажите корректный номер напоминания, новый текст и дату.")
-        mock_log.assert_any_call('info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Ошибка: Номер напоминания вне диапазона. для пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Ошибка: Номер напоминания вне диапазона. для пользователя: {message.from_user.id}')
 
 
 @pytest.mark.asyncio
@@ -61,19 +60,38 @@ async def test_handle_edit_reminder_exception() -> None:
     """
     message = AsyncMock()
     message.from_user.id = 12345
-    message.text = "/edit_reminder 1 Новый текст напоминания 2024-10-25 14:30:00"
-
-    reminders = [{'id': 1, 'text': 'Напоминание 1'}, {'id': 2, 'text': 'Напоминание 2'}]
+    message.text = "/edit_reminder 1 Новый текст напоминания 2099-10-25 14:30:00"
+    redis_pool = AsyncMock()
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders, \
-         patch('bot.handlers.user_handlers.update_reminder', new_callable=AsyncMock) as mock_update_reminder:
+         patch('bot.handlers.user_handlers.update_reminder_at', new_callable=AsyncMock) as mock_update_reminder:
         
-        mock_get_all_reminders.return_value = reminders
         mock_update_reminder.side_effect = Exception("Unexpected error")
         
-        await handle_edit_reminder(message)
+        await handle_edit_reminder(message, redis_pool)
         
         message.reply.assert_called_with("Произошла ошибка при редактировании напоминания.")
-        mock_log.assert_any_call('info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: Unexpected error')
\ No newline at end of file
+        assert_logged(mock_log, 'info', f'Команда /edit_reminder выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Произошла ошибка для пользователя: {message.from_user.id}. Ошибка: Unexpected error')
+
+
+@pytest.mark.asyncio
+async def test_handle_edit_reminder_past_date() -> None:
+    """Тест для переноса напоминания в прошлое.
+
+    Проверяет, что функция не обновляет напоминание, время которого уже прошло,
+    и отвечает так же, как при установке напоминания.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "/edit_reminder 1 Новый текст напоминания 2024-10-25 14:30:00"
+    redis_pool = AsyncMock()
+
+    with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
+         patch('bot.handlers.user_handlers.update_reminder_at', new_callable=AsyncMock) as mock_update_reminder:
+
+        await handle_edit_reminder(message, redis_pool)
+
+        message.reply.assert_called_once_with("⚠ Минимальное время - 1 минута")
+        mock_update_reminder.assert_not_called()
+        assert_logged(mock_log, 'error', f'Попытка перенести напоминание в прошлое для пользователя: {message.from_user.id}')
@@ -3,16 +3,19 @@ from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
 from bot.handlers.user_handlers import get_reminder_text
+from bot.other_func.reminder_analysis import ReminderParse
+from tests import assert_logged
 
 @pytest.mark.asyncio
 async def test_get_reminder_text() -> None:
     """Тест для получения текста напоминания.
 
     Проверяет, что функция корректно анализирует напоминание, отправляет сообщения пользователю
-    и устанавливает напоминание в Redis.
+    и сохраняет напоминание вместе с задачей доставки.
     """
     message = AsyncMock()
     message.from_user.id = 12345
+    message.text = "Напоминание через 5 минут"
     
     redis_pool = AsyncMock()
     future_date = datetime.now() + timedelta(minutes=5)
@@ -25,19 +28,65 @@ async def test_get_reminder_text() -> None:
          patch('bot.handlers.user_handlers.set_info_remind', new_callable=AsyncMock) as mock_set_info_remind, \
          patch('bot.handlers.user_handlers.datetime') as mock_datetime:
         
-        mock_analyze_reminder_handlers.return_value = (text_remind, future_date, date_str, time_str)
+        parsed = ReminderParse(text_remind, future_date, date_str, time_str)
+        mock_analyze_reminder_handlers.return_value = parsed
         mock_datetime.now.return_value = datetime.now()
         
         await get_reminder_text(message, redis_pool)
         
         message.answer.assert_any_call("Идёт анализ вашего напоминания...")
         message.answer.assert_any_call(f'📝 Ваше напоминание: "{text_remind}"\n🗓 Дата: {date_str} \n⏰ Время: {time_str}')
-        redis_pool.enqueue_job.assert_called_once_with("send_message", _defer_until=future_date, chat_id=message.from_user.id, text=f"Пришло время:\n{text_remind}")
-        mock_set_info_remind.assert_called_once_with(message=message)
+        mock_set_info_remind.assert_called_once_with(message=message, parsed=parsed, redis_pool=redis_pool)
         
-        mock_log.assert_any_call('info', f'Получение текста напоминания от пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Отправка сообщения об анализе напоминания для пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Напоминание установлено для пользователя: {message.from_user.id}, текст: "{text_remind}", время: {future_date}')
+        assert_logged(mock_log, 'info', f'Получение текста напоминания от пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Отправка сообщения об анализе напоминания для пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Напоминание установлено для пользователя: {message.from_user.id}, текст: "{text_remind}", время: {future_date}')
+
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_without_queue() -> None:
+    """Тест установки напоминания без очереди arq.
+
+    Проверяет, что при доставке колесом таймеров напоминание сохраняется
+    без пула Redis, то есть без задачи доставки.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "Напоминание через 5 минут"
+    future_date = datetime.now() + timedelta(minutes=5)
+    parsed = ReminderParse("Напоминание", future_date, future_date.strftime("%Y-%m-%d"), future_date.strftime("%H:%M:%S"))
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.analyze_reminder_handlers', new_callable=AsyncMock, return_value=parsed), \
+         patch('bot.handlers.user_handlers.set_info_remind', new_callable=AsyncMock) as mock_set_info_remind:
+
+        await get_reminder_text(message, None)
+
+        mock_set_info_remind.assert_called_once_with(message=message, parsed=parsed, redis_pool=None)
+
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_save_error() -> None:
+    """Тест ошибки сохранения напоминания.
+
+    Проверяет, что если напоминание или его задача доставки не сохранены,
+    пользователь получает сообщение об ошибке, а не об установке напоминания.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "Напоминание через 5 минут"
+    future_date = datetime.now() + timedelta(minutes=5)
+    parsed = ReminderParse("Напоминание", future_date, future_date.strftime("%Y-%m-%d"), future_date.strftime("%H:%M:%S"))
+
+    with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
+         patch('bot.handlers.user_handlers.analyze_reminder_handlers', new_callable=AsyncMock, return_value=parsed), \
+         patch('bot.handlers.user_handlers.set_info_remind', new_callable=AsyncMock, return_value=None):
+
+        await get_reminder_text(message, AsyncMock())
+
+    message.answer.assert_called_once_with("Идёт анализ вашего напоминания...")
+    message.reply.assert_called_once_with("Произошла ошибка при сохранении напоминания. Попробуйте еще раз позже.")
+    assert_logged(mock_log, 'error', 'Напоминание не сохранено для пользователя: 12345')
 
 
 @pytest.mark.asyncio
@@ -47,6 +96,7 @@ async def test_get_reminder_text_min_time_error() -> None:
     """
     message = AsyncMock()
     message.from_user.id = 12345
+    message.text = "Напоминание через 5 минут"
     
     redis_pool = AsyncMock()
     past_date = datetime.now() - timedelta(minutes=5)
@@ -66,6 +116,102 @@ async def test_get_reminder_text_min_time_error() -> None:
         message.answer.assert_any_call("Идёт анализ вашего напоминания...")
         message.answer.assert_any_call("⚠ Минимальное время - 1 минута")
         
-        mock_log.assert_any_call('info', f'Получение текста напоминания от пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Отправка сообщения об анализе напоминания для пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Попытка установить напоминание через минуту для пользователя: {message.from_user.id}')
\ No newline at end of file
+        assert_logged(mock_log, 'info', f'Получение текста напоминания от пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Отправка сообщения об анализе напоминания для пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Попытка установить напоминание через минуту для пользователя: {message.from_user.id}')
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_bulk() -> None:
+    """Тест установки нескольких напоминаний одним сообщением.
+
+    Проверяет, что каждая строка разбирается как отдельное напоминание,
+    разобранные напоминания сохраняются одним вызовом set_info_reminds,
+    а пользователь получает одну сводку с напоминаниями, которые не удалось установить.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "Позвонить маме через 5 минут\n\nкупить хлеб\nЗарядка через 10 минут\n"
+    redis_pool = AsyncMock()
+    now = datetime.now()
+    first = ReminderParse("Позвонить маме", now + timedelta(minutes=5), "2026-01-01", "10:00:00")
+    second = ReminderParse("Зарядка", now + timedelta(minutes=10), "2026-01-01", "10:05:00")
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.parse_reminders', new_callable=AsyncMock,
+               return_value=[first, None, second]) as mock_parse_reminders, \
+         patch('bot.handlers.user_handlers.set_info_reminds', new_callable=AsyncMock) as mock_set_info_reminds:
+
+        await get_reminder_text(message, redis_pool)
+
+    mock_parse_reminders.assert_called_once_with(["Позвонить маме через 5 минут", "купить хлеб", "Зарядка через 10 минут"])
+    mock_set_info_reminds.assert_called_once_with(12345, [first, second], redis_pool, user=message.from_user)
+    assert message.answer.call_count == 2
+    summary = message.answer.call_args.args[0]
+    assert summary.startswith("📝 Установлено напоминаний: 2 из 3")
+    assert '"Позвонить маме" — 🗓 2026-01-01 ⏰ 10:00:00' in summary
+    assert summary.endswith("• купить хлеб")
+
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_bulk_limit() -> None:
+    """Тест ограничения количества напоминаний в одном сообщении.
+
+    Проверяет, что сообщение со слишком большим количеством строк не разбирается.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "\n".join(f"Напоминание {n} через 5 минут" for n in range(3))
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.BULK_REMINDER_LIMIT', 2), \
+         patch('bot.handlers.user_handlers.parse_reminders', new_callable=AsyncMock) as mock_parse_reminders:
+
+        await get_reminder_text(message, None)
+
+    mock_parse_reminders.assert_not_called()
+    message.reply.assert_called_once_with("⚠ Одним сообщением можно установить не больше 2 напоминаний")
+
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_bulk_db_error() -> None:
+    """Тест ошибки сохранения нескольких напоминаний.
+
+    Проверяет, что при ошибке транзакции пользователь получает сообщение
+    об ошибке вместо сводки.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "Позвонить маме через 5 минут\nЗарядка через 10 минут"
+    parsed = ReminderParse("Позвонить маме", datetime.now() + timedelta(minutes=5), "2026-01-01", "10:00:00")
+
+    with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
+         patch('bot.handlers.user_handlers.parse_reminders', new_callable=AsyncMock, return_value=[parsed, parsed]), \
+         patch('bot.handlers.user_handlers.set_info_reminds', new_callable=AsyncMock, side_effect=Exception("boom")):
+
+        await get_reminder_text(message, None)
+
+    message.reply.assert_called_once_with("Произошла ошибка при сохранении напоминаний.")
+    assert message.answer.call_count == 1
+    assert_logged(mock_log, 'error', 'PostgresSQL ERROR in set_info_reminds для пользователя: 12345. Ошибка: boom')
+
+
+@pytest.mark.asyncio
+async def test_get_reminder_text_recurring() -> None:
+    """Тест установки повторяющегося напоминания.
+
+    Проверяет, что в ответе пользователю указано правило повтора.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    message.text = "каждый день в 9:00 пить воду"
+    when = datetime.now() + timedelta(hours=1)
+    parsed = ReminderParse("пить воду", when, "19 October", "09:00", "D")
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.analyze_reminder_handlers', new_callable=AsyncMock, return_value=parsed), \
+         patch('bot.handlers.user_handlers.set_info_remind', new_callable=AsyncMock) as mock_set_info_remind:
+
+        await get_reminder_text(message, None)
+
+    message.answer.assert_any_call('📝 Ваше напоминание: "пить воду"\n🗓 Дата: 19 October \n⏰ Время: 09:00\n🔁 Повтор: каждый день')
+    mock_set_info_remind.assert_called_once_with(message=message, parsed=parsed, redis_pool=None)
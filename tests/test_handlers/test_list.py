@@ -1,7 +1,10 @@
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
-from bot.handlers.user_handlers import list_reminder
+from bot.handlers.user_handlers import MESSAGE_LIMIT, list_reminder, list_reminder_page
+from bot.keyboards.user_keyboards import reminder_page_cb
+from tests import assert_logged
 
 @pytest.mark.asyncio
 async def test_list_reminder() -> None:
@@ -19,9 +22,9 @@ async def test_list_reminder() -> None:
     ]
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders:
+         patch('bot.handlers.user_handlers.get_reminders_page', new_callable=AsyncMock) as mock_get_page:
 
-        mock_get_all_reminders.return_value = reminders
+        mock_get_page.return_value = (reminders, False)
 
         await list_reminder(message)
 
@@ -29,10 +32,10 @@ async def test_list_reminder() -> None:
 1. Напоминание: "Напоминание 1", Дата и время: 2024-10-19 15:00:00
 2. Напоминание: "Напоминание 2", Дата и время: 2024-10-20 16:00:00"""
 
-        message.answer.assert_called_with(expected_message)
-        mock_log.assert_any_call('info', f'Запрос списка напоминаний от пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Напоминание 1: "Напоминание 1", Дата и время: 2024-10-19 15:00:00 для пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Напоминание 2: "Напоминание 2", Дата и время: 2024-10-20 16:00:00 для пользователя: {message.from_user.id}')
+        message.answer.assert_called_with(expected_message, reply_markup=None)
+        assert_logged(mock_log, 'info', f'Запрос списка напоминаний от пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'debug', f'Напоминание 1: "Напоминание 1", Дата и время: 2024-10-19 15:00:00 для пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'debug', f'Напоминание 2: "Напоминание 2", Дата и время: 2024-10-20 16:00:00 для пользователя: {message.from_user.id}')
 
 
 @pytest.mark.asyncio
@@ -46,13 +49,122 @@ async def test_list_reminder_empty() -> None:
     message.from_user.id = 12345
 
     with patch('bot.handlers.user_handlers.logger.log') as mock_log, \
-         patch('bot.handlers.user_handlers.get_all_reminders', new_callable=AsyncMock) as mock_get_all_reminders:
+         patch('bot.handlers.user_handlers.get_reminders_page', new_callable=AsyncMock) as mock_get_page:
 
-        mock_get_all_reminders.return_value = []
+        mock_get_page.return_value = ([], False)
 
         await list_reminder(message)
 
         message.answer.assert_called_with("Список напоминаний пуст")
-        mock_log.assert_any_call('info', f'Запрос списка напоминаний от пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Список напоминаний пуст для пользователя: {message.from_user.id}')
-        mock_log.assert_any_call('error', f'Ошибка: Список напоминаний пуст для пользователя: {message.from_user.id}')
\ No newline at end of file
+        assert_logged(mock_log, 'info', f'Запрос списка напоминаний от пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Список напоминаний пуст для пользователя: {message.from_user.id}')
+        assert_logged(mock_log, 'error', f'Ошибка: Список напоминаний пуст для пользователя: {message.from_user.id}')
+
+def make_page(first_id: int, count: int) -> list:
+    """Создать страницу напоминаний с последовательными ID."""
+    return [
+        {'id': i, 'text': f'Напоминание {i}', 'datetime': datetime(2030, 1, 1, 10, i % 60)}
+        for i in range(first_id, first_id + count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_reminder_first_page_has_next_button() -> None:
+    """Тест первой страницы длинного списка.
+
+    Проверяет, что запрашивается только первая страница, а под ней есть
+    только кнопка перехода вперед с последним напоминанием страницы.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    page = make_page(1, 10)
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.get_reminders_page', new_callable=AsyncMock) as mock_get_page:
+
+        mock_get_page.return_value = (page, True)
+
+        await list_reminder(message)
+
+    mock_get_page.assert_awaited_once_with(12345, 10)
+    buttons = message.answer.call_args.kwargs['reply_markup'].inline_keyboard[0]
+    assert [reminder_page_cb.parse(button.callback_data) for button in buttons] == [
+        {'@': 'rl', 'direction': 'next', 'number': '10', 'datetime': '20300101101000000000', 'id': '10'}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_reminder_page_navigation() -> None:
+    """Тест перехода между страницами.
+
+    Проверяет, что кнопки передают запросу крайнее напоминание страницы,
+    а нумерация продолжается с нужного номера в обе стороны.
+    """
+    call = AsyncMock()
+    call.from_user.id = 12345
+    page = make_page(11, 10)
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.get_reminders_page', new_callable=AsyncMock) as mock_get_page:
+
+        mock_get_page.return_value = (page, True)
+        await list_reminder_page(call, {'direction': 'next', 'number': '10', 'datetime': '20300101101000000000', 'id': '10'})
+
+        mock_get_page.assert_awaited_with(12345, 10, (datetime(2030, 1, 1, 10, 10), 10), False)
+        text = call.message.edit_text.call_args.args[0]
+        assert '\n11. Напоминание: "Напоминание 11"' in text
+        buttons = call.message.edit_text.call_args.kwargs['reply_markup'].inline_keyboard[0]
+        assert [reminder_page_cb.parse(b.callback_data)['direction'] for b in buttons] == ['prev', 'next']
+
+        mock_get_page.return_value = (make_page(1, 10), False)
+        await list_reminder_page(call, reminder_page_cb.parse(buttons[0].callback_data))
+
+        mock_get_page.assert_awaited_with(12345, 10, (datetime(2030, 1, 1, 10, 11), 11), True)
+        text = call.message.edit_text.call_args.args[0]
+        assert text.split('\n')[2].startswith('1. Напоминание')
+        buttons = call.message.edit_text.call_args.kwargs['reply_markup'].inline_keyboard[0]
+        assert [reminder_page_cb.parse(b.callback_data)['direction'] for b in buttons] == ['next']
+        call.answer.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_reminder_long_texts_fit_one_message() -> None:
+    """Тест страницы с длинными напоминаниями.
+
+    Проверяет, что длинные тексты обрезаются, страница из 15 длинных
+    напоминаний не длиннее одного сообщения Telegram, а не поместившиеся
+    напоминания открываются кнопкой в ту же сторону, в том числе при
+    переходе назад.
+    """
+    message = AsyncMock()
+    message.from_user.id = 12345
+    page = [dict(reminder, text=f'{reminder["id"]} ' + 'очень длинный текст ' * 300) for reminder in make_page(1, 15)]
+
+    with patch('bot.handlers.user_handlers.logger.log'), \
+         patch('bot.handlers.user_handlers.get_reminders_page', new_callable=AsyncMock) as mock_get_page:
+
+        mock_get_page.return_value = (page, False)
+        await list_reminder(message)
+
+        text = message.answer.call_args.args[0]
+        shown = text.count('Напоминание: "')
+        assert len(text) <= MESSAGE_LIMIT
+        assert 0 < shown < 15
+        assert '…"' in text
+        buttons = message.answer.call_args.kwargs['reply_markup'].inline_keyboard[0]
+        assert [reminder_page_cb.parse(b.callback_data) for b in buttons] == [
+            {'@': 'rl', 'direction': 'next', 'number': str(shown), 'datetime': f'2030010110{shown:02d}00000000',
+             'id': str(shown)}
+        ]
+
+        call = AsyncMock()
+        call.from_user.id = 12345
+        mock_get_page.return_value = (page, True)
+        await list_reminder_page(call, {'direction': 'prev', 'number': '21', 'datetime': '20300101102100000000', 'id': '21'})
+
+        text = call.message.edit_text.call_args.args[0]
+        assert len(text) <= MESSAGE_LIMIT
+        assert text.split('\n')[-1].startswith('20. Напоминание: "15 ')
+        assert text.split('\n')[2].startswith(f'{21 - shown}. Напоминание: "{16 - shown} ')
+        buttons = call.message.edit_text.call_args.kwargs['reply_markup'].inline_keyboard[0]
+        assert [reminder_page_cb.parse(b.callback_data)['id'] for b in buttons] == [str(16 - shown), '15']
@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from bot.handlers.user_handlers import cmd_profile
+from tests import assert_logged
+
+
+@pytest.mark.asyncio
+async def test_profile_command_admin_only() -> None:
+    """Тест для команды /profile.
+
+    Проверяет, что команда недоступна пользователям не из ADMIN_IDS, а
+    администратор может включить, выключить профилирование и сохранить профили.
+    """
+    message = AsyncMock()
+    message.from_user.id = 7
+
+    with patch('bot.handlers.user_handlers.profiler') as mock_profiler, \
+         patch('bot.handlers.user_handlers.logger.log') as mock_log:
+        mock_profiler.admin_ids = frozenset({1})
+        message.get_args = lambda: "on"
+        await cmd_profile(message)
+
+        mock_profiler.start.assert_not_called()
+        message.reply.assert_not_called()
+        assert_logged(mock_log, 'error', 'Команда /profile от пользователя без прав: 7')
+
+        message.from_user.id = 1
+        await cmd_profile(message)
+        mock_profiler.start.assert_called_once()
+        message.reply.assert_called_with("Профилирование включено")
+
+        message.get_args = lambda: "off"
+        await cmd_profile(message)
+        mock_profiler.stop.assert_called_once()
+
+        mock_profiler.dump.return_value = ["a.collapsed", "b.collapsed"]
+        mock_profiler.directory = "profiles"
+        message.get_args = lambda: "dump"
+        await cmd_profile(message)
+        message.reply.assert_called_with("Сохранено профилей: 2 в profiles")
+        assert_logged(mock_log, 'info', 'Команда /profile dump выполнена пользователем: 1')
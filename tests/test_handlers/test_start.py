@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, patch
 
 from bot.handlers.user_handlers import cmd_start
 from bot.keyboards.user_keyboards import get_main_kb
+from tests import assert_logged
 
 @pytest.mark.asyncio
 async def test_start_handler() -> None:
@@ -26,5 +27,5 @@ async def test_start_handler() -> None:
         )
 
         message.answer.assert_called_with(start_text, parse_mode="html", reply_markup=get_main_kb())
-        mock_log.assert_any_call('info', f'Команда /start выполнена пользователем: {message.from_user.id}')
-        mock_log.assert_any_call('info', f'Приветственное сообщение отправлено пользователю: {message.from_user.id}')
\ No newline at end of file
+        assert_logged(mock_log, 'info', f'Команда /start выполнена пользователем: {message.from_user.id}')
+        assert_logged(mock_log, 'info', f'Приветственное сообщение отправлено пользователю: {message.from_user.id}')
\ No newline at end of file
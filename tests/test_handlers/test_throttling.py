@@ -0,0 +1,168 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram import Bot, Dispatcher, types
+
+from bot.handlers.throttling import (DEFAULT_BUDGET, PARSE_BUDGET, SLOW_DOWN_TEXT, Budget, ThrottlingMiddleware,
+                                     throttling_middleware)
+from bot.other_func.metrics import THROTTLE_DECISIONS
+from tests import assert_logged
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def make_middleware(parse: Budget, default: Budget = Budget(0, 0), window: float = 60) -> ThrottlingMiddleware:
+    """Создать ограничитель поверх Redis в памяти."""
+    redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    return ThrottlingMiddleware(redis, {PARSE_BUDGET: parse, DEFAULT_BUDGET: default}, window)
+
+
+def make_update(update_id: int, user_id: int, text: str) -> types.Update:
+    """Создать обновление с сообщением пользователя."""
+    return types.Update(**{
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Flood"},
+        },
+    })
+
+
+async def get_reminder_text(message: types.Message) -> None:
+    """Обработчик с именем обработчика разбора напоминаний."""
+
+
+@pytest.mark.asyncio
+async def test_user_limit_drops_flood_and_warns_once() -> None:
+    """Тест лимита одного пользователя.
+
+    Проверяет, что обновления сверх лимита отбрасываются, ответ с просьбой
+    подождать отправляется один раз за окно, другие пользователи не
+    затрагиваются, а через окно лимит восстанавливается.
+    """
+    throttling = make_middleware(parse=Budget(user_limit=2, global_limit=0))
+    reply = AsyncMock()
+    now = 6000.0
+
+    with patch('bot.handlers.throttling.current_handler') as mock_handler, \
+         patch('bot.handlers.throttling.logger.log') as mock_log:
+        mock_handler.get.return_value = get_reminder_text
+        dropped_before = THROTTLE_DECISIONS.labels(PARSE_BUDGET, 'user')._value.get()
+
+        results = [await throttling.allow(1, reply, now + n) for n in range(5)]
+        other = await throttling.allow(2, reply, now + 5)
+        later = await throttling.allow(1, reply, now + 180)
+
+    assert results == [True, True, False, False, False]
+    assert other and later
+    reply.assert_called_once_with(SLOW_DOWN_TEXT)
+    assert throttling.stats() == {"allowed": 4, "dropped": 3}
+    assert THROTTLE_DECISIONS.labels(PARSE_BUDGET, 'user')._value.get() - dropped_before == 3
+    assert_logged(mock_log, 'info', 'Обновление пользователя 1 отброшено: лимит parse (user)')
+
+
+@pytest.mark.asyncio
+async def test_global_limit_and_sliding_window() -> None:
+    """Тест общего лимита.
+
+    Проверяет, что общий лимит отбрасывает обновления разных пользователей,
+    а предыдущее окно учитывается пропорционально оставшейся доле.
+    """
+    throttling = make_middleware(parse=Budget(0, 0), default=Budget(user_limit=0, global_limit=3))
+    reply = AsyncMock()
+
+    with patch('bot.handlers.throttling.logger.log'):
+        first = [await throttling.allow(user_id, reply, 6000.0) for user_id in range(4)]
+        # Через половину следующего окна учитывается половина из 4 обновлений прошлого окна
+        middle = [await throttling.allow(user_id, reply, 6090.0) for user_id in range(3)]
+
+    assert first == [True, True, True, False]
+    assert middle == [True, False, False]
+    assert reply.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_parse_budget_charged_per_line() -> None:
+    """Тест стоимости сообщения с несколькими напоминаниями.
+
+    Проверяет, что сообщение для разбора расходует лимиты пользователя и общий
+    по числу непустых строк, стоимость не превышает лимит пользователя, а
+    дешевые обработчики расходуют по одному обновлению.
+    """
+    throttling = make_middleware(parse=Budget(user_limit=4, global_limit=7), default=Budget(user_limit=2, global_limit=0))
+    reply = AsyncMock()
+    bulk = make_update(1, 1, "купить хлеб через 5 минут\n\n  \nпозвонить завтра в 9:00\nкино в 19:00").message
+    huge = make_update(2, 3, "\n".join(["купить хлеб через 5 минут"] * 50)).message
+
+    assert throttling.cost_of(bulk) == 3
+    assert throttling.cost_of(make_update(3, 1, "").message) == 1
+
+    with patch('bot.handlers.throttling.current_handler') as mock_handler, \
+         patch('bot.handlers.throttling.logger.log'):
+        mock_handler.get.return_value = get_reminder_text
+        user = [await throttling.allow(1, reply, 6000.0, cost=throttling.cost_of(bulk)) for _ in range(2)]
+        # Общий счетчик учитывает только сообщения, уложившиеся в лимит пользователя: 3 + 3, затем 3 + 3 + 2 > 7
+        others = [await throttling.allow(2, reply, 6000.0, cost=3), await throttling.allow(5, reply, 6000.0, cost=2)]
+        capped = await throttling.allow(3, reply, 6200.0, cost=throttling.cost_of(huge))
+        after_capped = await throttling.allow(3, reply, 6200.0)
+
+        mock_handler.get.return_value = None
+        cheap = [await throttling.allow(4, reply, 6000.0, cost=3) for _ in range(3)]
+
+    assert user == [True, False]
+    assert others == [True, False]
+    assert capped and not after_capped
+    assert cheap == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_middleware_uses_handler_budgets() -> None:
+    """Тест middleware в диспетчере.
+
+    Проверяет, что разбор напоминаний и дешевые обработчики расходуют разные
+    бюджеты, отброшенное обновление не доходит до обработчика, а ошибка Redis
+    не блокирует обновления.
+    """
+    bot = Bot("123456:" + "A" * 35)
+    dp = Dispatcher(bot)
+    throttling = make_middleware(parse=Budget(1, 0), default=Budget(2, 0))
+    dp.middleware.setup(throttling)
+    calls = []
+
+    async def list_reminder(message: types.Message) -> None:
+        calls.append("list")
+
+    async def parse_handler(message: types.Message) -> None:
+        calls.append("parse")
+
+    parse_handler.__name__ = "get_reminder_text"
+    dp.register_message_handler(list_reminder, text="Список моих напоминаний")
+    dp.register_message_handler(parse_handler)
+    Bot.set_current(bot)
+    Dispatcher.set_current(dp)
+
+    with patch('aiogram.types.Message.answer', new_callable=AsyncMock) as mock_answer, \
+         patch('bot.handlers.throttling.logger.log') as mock_log:
+        for n, text in enumerate(["купить хлеб через 5 минут"] * 2 + ["Список моих напоминаний"] * 3):
+            await dp.process_update(make_update(n, 7, text))
+
+        assert calls == ["parse", "list", "list"]
+        assert mock_answer.call_count == 2
+
+        throttling.redis = MagicMock(pipeline=MagicMock(side_effect=ConnectionError("redis down")))
+        await dp.process_update(make_update(10, 7, "Список моих напоминаний"))
+
+    assert calls[-1] == "list"
+    assert_logged(mock_log, 'error', 'Redis ERROR in throttling: redis down')
+    await (await bot.get_session()).close()
+
+
+def test_throttling_middleware_reads_env() -> None:
+    """Тест создания ограничителя с лимитами из окружения."""
+    with patch.dict('os.environ', {"THROTTLE_PARSE_USER": "3", "THROTTLE_WINDOW": "30"}):
+        throttling = throttling_middleware(MagicMock())
+
+    assert throttling.budgets[PARSE_BUDGET].user_limit == 3
+    assert throttling.window == 30
@@ -0,0 +1,127 @@
+import contextvars
+import json
+import time
+from functools import partial
+
+import pytest
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+
+from bot.logging.logger import BotLogger
+
+
+class Exploding:
+    """Аргумент лога, который нельзя превратить в строку."""
+
+    def __str__(self) -> str:
+        raise AssertionError("сообщение собрано для отключенного уровня")
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    """Создавать логгеры с файлами во временном каталоге и останавливать их после теста."""
+    loggers = []
+
+    def factory(**kwargs) -> BotLogger:
+        bot_logger = BotLogger(str(tmp_path / "bot.log"), name=f"test_logger_{len(loggers)}_{id(tmp_path)}", **kwargs)
+        loggers.append(bot_logger)
+        return bot_logger
+
+    yield factory
+    for bot_logger in loggers:
+        bot_logger.stop()
+        bot_logger.logger.handlers.clear()
+
+
+def read_lines(path) -> list[dict]:
+    """Прочитать записи лога в формате JSON lines."""
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+async def list_handler(message, redis_pool=None) -> None:
+    """Подобие обработчика aiogram, зарегистрированного через partial."""
+
+
+def test_json_lines_with_user_and_handler(make_logger, tmp_path) -> None:
+    """Тест формата записей.
+
+    Проверяет, что прежний вызов logger.log(level, msg) работает, шаблон с %
+    собирается при записи, а user_id и handler берутся из обрабатываемого обновления.
+    """
+    bot_logger = make_logger()
+
+    def handle_update() -> None:
+        types.User.set_current(types.User(id=42, is_bot=False, first_name="Test"))
+        current_handler.set(partial(list_handler, redis_pool=None))
+        bot_logger.log('error', 'Напоминание %s для пользователя: %s', 7, 42, reminder_id=7)
+
+    bot_logger.log('info', 'Бот запущен')
+    contextvars.copy_context().run(handle_update)
+    bot_logger.stop()
+
+    first, second = read_lines(tmp_path / "bot.log")
+    assert first["message"] == 'Бот запущен'
+    assert (first["level"], first["user_id"], first["handler"]) == ('info', None, 'test_json_lines_with_user_and_handler')
+    assert second["message"] == 'Напоминание 7 для пользователя: 42'
+    assert (second["level"], second["user_id"], second["handler"]) == ('error', 42, 'list_handler')
+    assert second["reminder_id"] == 7
+
+
+def test_disabled_level_builds_nothing(make_logger, tmp_path) -> None:
+    """Тест проверки уровня.
+
+    Проверяет, что сообщения ниже минимального уровня не собираются и не пишутся.
+    """
+    bot_logger = make_logger(level='info')
+
+    assert not bot_logger.is_enabled('debug')
+    bot_logger.log('debug', 'Напоминание %s', Exploding())
+    bot_logger.log('info', 'записано')
+    bot_logger.stop()
+
+    assert [entry["message"] for entry in read_lines(tmp_path / "bot.log")] == ['записано']
+
+
+def test_rotation_by_size_and_time(make_logger, tmp_path) -> None:
+    """Тест ротации файла.
+
+    Проверяет, что файл ротируется при превышении размера и по истечении
+    интервала, а старых файлов хранится не больше backup_count.
+    """
+    bot_logger = make_logger(max_bytes=400, backup_count=2, interval=3600)
+    for n in range(20):
+        bot_logger.log('info', 'запись номер %s', n)
+    bot_logger.stop()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['bot.log', 'bot.log.1', 'bot.log.2']
+    assert all(path.stat().st_size <= 400 for path in tmp_path.iterdir())
+
+    bot_logger = make_logger(backup_count=1, interval=0.05)
+    bot_logger.log('info', 'до ротации')
+    time.sleep(0.1)
+    bot_logger.log('info', 'после ротации')
+    bot_logger.stop()
+
+    assert [entry["message"] for entry in read_lines(tmp_path / "bot.log")] == ['после ротации']
+    assert read_lines(tmp_path / "bot.log.1")[-1]["message"] == 'до ротации'
+
+
+def test_stop_and_restart(make_logger, tmp_path) -> None:
+    """Тест остановки и повторного запуска фонового потока.
+
+    Проверяет, что повторная остановка ничего не делает, а после нового запуска
+    записи снова попадают в файл.
+    """
+    bot_logger = make_logger()
+    bot_logger.log('info', 'первый запуск')
+    bot_logger.stop()
+    bot_logger.stop()
+    assert not bot_logger.is_running
+
+    bot_logger.start()
+    bot_logger.start()
+    assert bot_logger.is_running
+    bot_logger.log('info', 'второй запуск')
+    bot_logger.stop()
+
+    assert [entry["message"] for entry in read_lines(tmp_path / "bot.log")] == ['первый запуск', 'второй запуск']
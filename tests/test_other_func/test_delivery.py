@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from aiogram import Bot
+from aiogram.bot.api import TelegramAPIServer
+from aiogram.utils.exceptions import BotBlocked, NetworkError, RetryAfter
+
+from benchmarks.fake_telegram import FAKE_TOKEN, FakeTelegram
+from bot.other_func.delivery import ChatLimiter, DeliveryEngine, TokenBucket
+
+
+def test_token_bucket_burst_then_rate() -> None:
+    """Тест корзины токенов.
+
+    Проверяет, что после простоя доступна пачка из capacity токенов,
+    а следующие токены выдаются с интервалом 1 / rate.
+    """
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    delays = [bucket.reserve() for _ in range(5)]
+
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.1, abs=0.01)
+    assert delays[4] == pytest.approx(0.2, abs=0.01)
+
+    bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5.0, abs=0.01)
+
+
+def test_chat_limiter_spaces_messages_per_chat() -> None:
+    """Тест ограничителя чатов.
+
+    Проверяет, что сообщения в один чат разносятся на interval, разные чаты
+    не мешают друг другу, а postpone откладывает следующую отправку.
+    """
+    chats = ChatLimiter(interval=1.0)
+
+    assert chats.reserve(1) == 0
+    assert chats.reserve(2) == 0
+    assert chats.reserve(1) == pytest.approx(1.0, abs=0.01)
+
+    chats.postpone(2, 5)
+    assert chats.reserve(2) == pytest.approx(5.0, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_deliver_honors_retry_after() -> None:
+    """Тест повтора после RetryAfter.
+
+    Проверяет, что движок ждет указанное Telegram время и повторяет отправку,
+    а отправка в другие чаты тоже ждет это время.
+    """
+    engine = DeliveryEngine(rate=1000, burst=10, chat_interval=0, concurrency=5, max_retries=3, backoff=0)
+    bot = AsyncMock()
+    bot.send_message.side_effect = [RetryAfter(1), None]
+
+    with patch('bot.other_func.delivery.asyncio.sleep', new=AsyncMock()) as sleep:
+        delivered = await engine.deliver(bot, 1, "текст")
+
+    assert delivered
+    assert bot.send_message.await_count == 2
+    assert any(call.args == (1,) for call in sleep.await_args_list)
+    assert engine.stats()["retries"] == 1
+    assert engine.bucket.reserve() > 0.9
+
+
+@pytest.mark.asyncio
+async def test_deliver_gives_up() -> None:
+    """Тест неустранимых ошибок.
+
+    Проверяет, что заблокированный бот не повторяется, а сетевые ошибки
+    повторяются не больше max_retries раз.
+    """
+    engine = DeliveryEngine(rate=1000, burst=10, chat_interval=0, concurrency=5, max_retries=2, backoff=0)
+    blocked, broken = AsyncMock(), AsyncMock()
+    blocked.send_message.side_effect = BotBlocked("Forbidden: bot was blocked by the user")
+    broken.send_message.side_effect = NetworkError("connection reset")
+
+    with patch('bot.other_func.delivery.logger.log'):
+        assert not await engine.deliver(blocked, 1, "текст")
+        assert not await engine.deliver(broken, 2, "текст")
+
+    assert blocked.send_message.await_count == 1
+    assert broken.send_message.await_count == 3
+    assert engine.stats()["failed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delivery_within_fake_telegram_limits() -> None:
+    """Тест доставки через поддельный Telegram.
+
+    Проверяет, что пачка напоминаний, одновременно пришедших в нескольких чатах,
+    доставляется полностью без единого ответа 429 и не быстрее заданных лимитов.
+    """
+    fake = FakeTelegram(global_rate=100, chat_interval=0.2)
+    base = await fake.start()
+    bot = Bot(token=FAKE_TOKEN, server=TelegramAPIServer.from_base(base))
+    engine = DeliveryEngine(rate=80, burst=10, chat_interval=0.25, concurrency=10, max_retries=3, backoff=0.1)
+
+    try:
+        started = time.monotonic()
+        results = await asyncio.gather(*(
+            engine.deliver(bot, chat_id, f"напоминание {n}")
+            for n in range(4) for chat_id in range(1, 31)
+        ))
+        elapsed = time.monotonic() - started
+    finally:
+        await (await bot.get_session()).close()
+        await fake.stop()
+
+    assert all(results)
+    assert len(fake.sent) == 120
+    assert fake.rejected == 0
+    assert elapsed >= (120 - 10) / 80 * 0.9
+    assert engine.stats()["delivered"] == 120
@@ -0,0 +1,133 @@
+import itertools
+from datetime import datetime
+
+import pytest
+
+from bot.other_func.reminder_analysis import extract_reminder, fast_extract
+
+PHRASES = [
+    "через 0 минут", "через 1 минуту", "через 2 минуты", "через 15 минут", "через 90 мин",
+    "через 1 час", "через 3 часа", "через 21 час", "через 48 часов", "ЧЕРЕЗ 10 МИНУТ",
+    "завтра в 9:00", "завтра в 09:05", "Завтра в 15:30", "завтра в 23:59",
+    "послезавтра в 7:30", "послезавтра в 12:00", "Послезавтра в 18:45",
+]
+TEXTS = ["", "купить молоко", "Позвонить маме", "встреча у директора", "сдать отчет о работе"]
+
+
+def build_corpus() -> list[str]:
+    """Собрать сообщения с фразой времени в начале, в конце и в середине текста."""
+    corpus = []
+    for phrase, text in itertools.product(PHRASES, TEXTS):
+        words = text.split()
+        for pos in {0, len(words) // 2, len(words)}:
+            corpus.append(' '.join(words[:pos] + [phrase] + words[pos:]))
+    return corpus
+
+
+@pytest.mark.parametrize("message", build_corpus())
+def test_fast_path_matches_periodparser(message: str) -> None:
+    """Тест эквивалентности быстрого разбора и periodparser.
+
+    Проверяет, что для частых форм сообщений быстрый разбор срабатывает
+    и возвращает тот же результат, что и periodparser.
+    """
+    while True:
+        now = datetime.now()
+        expected = extract_reminder(message)
+        parsed = fast_extract(message, now)
+        if now.replace(second=0, microsecond=0) == datetime.now().replace(second=0, microsecond=0):
+            break
+
+    assert parsed is not None
+    assert parsed == expected
+
+
+@pytest.mark.parametrize("hour", range(24))
+def test_fast_path_matches_periodparser_every_hour(hour: int) -> None:
+    """Тест эквивалентности быстрого разбора и periodparser для каждого часа.
+
+    Проверяет, что "завтра/послезавтра в HH:MM" с часом с ведущим нулем и без
+    него либо передается periodparser, либо разбирается так же, как им, а
+    быстрый разбор не берется только за часы 0-4, которые periodparser
+    читает как дневные.
+    """
+    for message in (f"завтра в {hour}:00 купить хлеб", f"купить хлеб послезавтра в {hour:02d}:59"):
+        while True:
+            now = datetime.now()
+            expected = extract_reminder(message)
+            parsed = fast_extract(message, now)
+            if now.replace(second=0, microsecond=0) == datetime.now().replace(second=0, microsecond=0):
+                break
+
+        assert (parsed is None) == (hour < 5)
+        assert parsed is None or parsed == expected
+
+
+# Явные даты — документированное исключение из эквивалентности: periodparser не понимает
+# YYYY-MM-DD, оставляет дату в тексте и ставит время на сегодня (часы 0-4 — дневные)
+EXPLICIT_EXCEPTIONS = [
+    ("сдать отчет 2024-12-01 10:00", "2024-12-01 10:00"),
+    ("2031-02-28 23:59 сдать отчет", "2031-02-28 23:59"),
+    ("сдать отчет 2031-02-28 00:05", "2031-02-28 00:05"),
+    ("2024-12-01 10:00:30 сдать отчет", "2024-12-01 10:00:30"),
+]
+
+
+@pytest.mark.parametrize("message, explicit", EXPLICIT_EXCEPTIONS)
+def test_fast_path_explicit_datetime_differs_from_periodparser(message: str, explicit: str) -> None:
+    """Тест расхождения быстрого разбора и periodparser для явной даты.
+
+    Проверяет, что быстрый разбор берет дату и время из YYYY-MM-DD HH:MM,
+    а periodparser по-прежнему берет сегодняшнюю дату и оставляет явную дату
+    в тексте. Если periodparser начнет понимать такие даты, тест упадет и
+    исключение нужно будет убрать.
+    """
+    while True:
+        now = datetime.now()
+        expected = extract_reminder(message)
+        parsed = fast_extract(message, now)
+        if now.replace(second=0, microsecond=0) == datetime.now().replace(second=0, microsecond=0):
+            break
+
+    date = explicit.split()[0]
+    assert parsed == fast_extract(message, now)
+    assert parsed.from_date == datetime.fromisoformat(explicit)
+    assert parsed.text == "сдать отчет"
+    assert expected.from_date.date() == now.date()
+    assert date in expected.text
+
+
+def test_fast_path_explicit_datetime() -> None:
+    """Тест явной даты в формате YYYY-MM-DD HH:MM.
+
+    Проверяет, что быстрый разбор понимает явную дату с секундами и без них.
+    """
+    parsed = fast_extract("сдать отчет 2024-12-01 10:00")
+
+    assert parsed.text == "сдать отчет"
+    assert parsed.from_date == datetime(2024, 12, 1, 10, 0)
+    assert (parsed.date_str, parsed.time_str) == ("01 December", "10:00")
+    assert fast_extract("2024-12-01 10:00:30 сдать отчет").from_date == datetime(2024, 12, 1, 10, 0, 30)
+    assert fast_extract("сдать отчет 2024-02-30 10:00") is None
+
+
+@pytest.mark.parametrize("message", [
+    "позвонить",
+    "купить молоко через 10 минут и завтра в 9:00",
+    "купить на завтра в 9:30 хлеб",
+    "через 5 минут и хлеб",
+    "завтра в 0:30 проверить",
+    "завтра в 1:00 проверить",
+    "проверить послезавтра в 04:59",
+    "через 10 минут в обед",
+    "Купить, молоко! через 10 минут",
+    "в пятницу в 19:00 кино",
+    "через 10 минут купить 2 батона",
+])
+def test_fast_path_falls_back(message: str) -> None:
+    """Тест передачи разбора periodparser.
+
+    Проверяет, что быстрый разбор не берется за сообщения, которые он не может
+    разобрать так же, как periodparser.
+    """
+    assert fast_extract(message) is None
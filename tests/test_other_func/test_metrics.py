@@ -0,0 +1,107 @@
+import time
+from functools import partial
+
+import fakeredis
+import pytest
+from aiogram import Bot, Dispatcher, types
+from aiohttp.test_utils import TestClient, TestServer
+from prometheus_client import REGISTRY
+
+from bot.other_func.metrics import MetricsServer, queue_depth_refresher, timed, timed_handler, DB_SECONDS
+
+# Допустимая стоимость записи одного измерения, с запасом для медленных машин CI
+OVERHEAD_BUDGET_US = 20
+
+
+def sample(name: str, **labels: str) -> float:
+    """Текущее значение метрики или 0, если ее еще не было."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def make_update(text: str) -> types.Update:
+    """Создать обновление с сообщением пользователя."""
+    return types.Update(**{
+        "update_id": 1,
+        "message": {
+            "message_id": 1, "date": 0, "text": text,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+        },
+    })
+
+
+@pytest.mark.asyncio
+async def test_timed_handler_keeps_aiogram_arguments() -> None:
+    """Тест обертки обработчиков.
+
+    Проверяет, что обработчик, зарегистрированный через partial и обернутый
+    timed_handler, получает только свои аргументы, а его время и исключения
+    записываются в метрики под именем исходной функции.
+    """
+    received = []
+
+    async def metrics_delete_handler(message: types.Message, redis_pool: object) -> None:
+        received.append((message.get_args(), redis_pool))
+        if message.get_args() == "boom":
+            raise ValueError("boom")
+
+    dp = Dispatcher(Bot(token="123456:test-token"))
+    dp.register_message_handler(timed_handler(partial(metrics_delete_handler, redis_pool="pool")),
+                                commands=['delete_reminder'])
+    Bot.set_current(dp.bot)
+
+    await dp.process_update(make_update("/delete_reminder 1"))
+    with pytest.raises(ValueError):
+        await dp.process_update(make_update("/delete_reminder boom"))
+
+    assert received == [("1", "pool"), ("boom", "pool")]
+    assert sample('nudgeninja_handler_seconds_count', handler='metrics_delete_handler') == 2
+    assert sample('nudgeninja_handler_errors_total', handler='metrics_delete_handler') == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_queue_depth() -> None:
+    """Тест HTTP сервера метрик.
+
+    Проверяет, что /metrics отдает метрики в формате Prometheus и обновляет
+    длину очереди перед ответом.
+    """
+    redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    await redis.zadd("arq:queue", {"job-1": 1, "job-2": 2, "job-3": 3})
+
+    server = MetricsServer("127.0.0.1", 0)
+    server.add_refresher(queue_depth_refresher(redis, "arq:queue"))
+    async with TestClient(TestServer(server.make_app())) as client:
+        response = await client.get("/metrics")
+        body = await response.text()
+
+    assert response.status == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert "nudgeninja_queue_depth 3.0" in body
+    assert "# TYPE nudgeninja_db_seconds histogram" in body
+
+
+@pytest.mark.asyncio
+async def test_recording_overhead_within_budget() -> None:
+    """Тест стоимости записи метрик.
+
+    Проверяет, что обертка timed добавляет к вызову корутины меньше
+    OVERHEAD_BUDGET_US микросекунд, чтобы метрики можно было не отключать.
+    """
+    async def noop() -> None:
+        return None
+
+    measured = timed(DB_SECONDS, name="overhead_test")(noop)
+    calls = 20000
+
+    async def per_call_us(func) -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await func()
+        return (time.perf_counter() - started) / calls * 1e6
+
+    # Лучшее из нескольких повторов, чтобы случайная пауза машины не проваливала тест
+    overhead = min([await per_call_us(measured) - await per_call_us(noop) for _ in range(3)])
+
+    assert sample('nudgeninja_db_seconds_count', function='overhead_test') == calls * 3
+    assert overhead < OVERHEAD_BUDGET_US
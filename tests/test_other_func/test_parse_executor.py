@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from unittest.mock import patch
+
+from bot.other_func.parse_executor import ParseExecutor
+from bot.other_func.reminder_analysis import extract_reminder
+
+
+def slow_parse(seconds: float) -> float:
+    """Имитировать долгий разбор в процессе-воркере."""
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.asyncio
+async def test_executor_matches_inline_parse() -> None:
+    """Тест разбора в пуле процессов.
+
+    Проверяет, что результат из процесса-воркера совпадает с разбором в текущем процессе.
+    """
+    executor = ParseExecutor(workers=1, max_pending=2, timeout=30)
+
+    with patch('bot.other_func.parse_executor.logger.log'):
+        executor.start()
+        try:
+            parsed = await executor.run(extract_reminder, "купить молоко завтра в 9:00")
+        finally:
+            executor.shutdown()
+
+    assert parsed == extract_reminder("купить молоко завтра в 9:00")
+    assert not executor.is_running
+
+
+@pytest.mark.asyncio
+async def test_executor_timeout_and_backpressure() -> None:
+    """Тест ограничения времени и очереди разбора.
+
+    Проверяет, что долгий разбор прерывается по таймауту, а лишние вызовы
+    ждут свободного места в очереди.
+    """
+    executor = ParseExecutor(workers=1, max_pending=1, timeout=0.2)
+
+    with patch('bot.other_func.parse_executor.logger.log'):
+        executor.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.run(slow_parse, 1)
+
+            executor.timeout = 30
+            first = asyncio.create_task(executor.run(slow_parse, 0.1))
+            second = asyncio.create_task(executor.run(slow_parse, 0.1))
+            await asyncio.sleep(0)
+
+            assert executor._slots.locked()
+            assert await asyncio.gather(first, second) == [0.1, 0.1]
+        finally:
+            executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_replaces_stuck_worker() -> None:
+    """Тест замены зависшего воркера.
+
+    Проверяет, что после таймаута пул заменяется новым, процесс с зависшим
+    разбором завершается и его место в очереди освобождается, а следующий
+    разбор не ждет окончания зависшего.
+    """
+    executor = ParseExecutor(workers=1, max_pending=1, timeout=0.5)
+
+    with patch('bot.other_func.parse_executor.logger.log') as mock_log:
+        executor.start()
+        stuck_pool = executor._pool
+        try:
+            await executor.run(slow_parse, 0)
+            stuck_processes = list(stuck_pool._processes.values())
+
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.run(slow_parse, 60)
+
+            executor.timeout = 30
+            started = time.perf_counter()
+            assert await executor.run(slow_parse, 0.1) == 0.1
+            assert time.perf_counter() - started < 20
+            assert executor._pool is not stuck_pool
+            assert not any(process.is_alive() for process in stuck_processes)
+        finally:
+            executor.shutdown()
+
+    assert mock_log.call_args_list[1].args[0] == 'warning'
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_inline_when_not_started() -> None:
+    """Тест вызова до запуска пула.
+
+    Проверяет, что без запущенного пула функция выполняется в текущем процессе.
+    """
+    executor = ParseExecutor(workers=1, max_pending=1, timeout=30)
+
+    assert await executor.run(slow_parse, 0) == 0
+    assert not executor.is_running
+
+
+@pytest.mark.asyncio
+async def test_executor_retries_broken_pool_once() -> None:
+    """Тест повтора разбора после замены пула.
+
+    Проверяет, что разбор, прерванный заменой пула, повторяется в новом пуле
+    только один раз, даже если и новый пул ломается.
+    """
+    executor = ParseExecutor(workers=1, max_pending=1, timeout=30)
+    executor._slots = asyncio.Semaphore(1)
+    submitted = []
+
+    class BreakingPool:
+        """Пул, который при каждом разборе заменяется новым и ломается."""
+
+        def submit(self, func, *args) -> Future:
+            submitted.append(self)
+            executor._pool = BreakingPool()
+            future = Future()
+            future.set_exception(BrokenProcessPool("worker terminated"))
+            return future
+
+    executor._pool = BreakingPool()
+    with pytest.raises(BrokenProcessPool):
+        await executor.run(slow_parse, 0)
+
+    assert len(submitted) == 2
+    assert not executor._slots.locked()
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from functools import partial
+
+import pytest
+
+from bot.other_func.profiling import Profiler
+
+
+def make_profiler(tmp_path, enabled: bool = True, admin_ids: frozenset = frozenset(), keep: int = 2) -> Profiler:
+    """Создать профилировщик с коротким периодом сэмплирования."""
+    return Profiler(enabled=enabled, admin_ids=admin_ids, interval=0.001, keep=keep, directory=str(tmp_path))
+
+
+def busy_wait(seconds: float) -> None:
+    """Занять процессор на заданное время, как медленная библиотечная функция."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def slow_handler(message: str, delay: float) -> str:
+    """Обработчик, который считает и ждет ввода-вывода."""
+    busy_wait(delay)
+    await asyncio.sleep(delay)
+    return message
+
+
+def test_wrap_is_free_when_unavailable(tmp_path) -> None:
+    """Тест выключенного профилирования.
+
+    Проверяет, что без PROFILE_ENABLED и администраторов функции не оборачиваются.
+    """
+    profiler = make_profiler(tmp_path, enabled=False)
+
+    assert profiler.wrap(slow_handler) is slow_handler
+
+
+@pytest.mark.asyncio
+async def test_keeps_slowest_calls_with_stacks(tmp_path) -> None:
+    """Тест сбора профилей.
+
+    Проверяет, что сохраняются только keep самых долгих вызовов, их стеки
+    показывают и вычисления, и ожидание, а dump пишет файлы collapsed stacks.
+    """
+    profiler = make_profiler(tmp_path, admin_ids=frozenset({1}))
+    handler = profiler.wrap(partial(slow_handler, delay=0.02))
+    assert handler.__name__ == 'slow_handler'
+
+    assert await handler("до включения") == "до включения"
+    profiler.start()
+    try:
+        for delay in (0.02, 0.06, 0.04):
+            handler = profiler.wrap(partial(slow_handler, delay=delay))
+            await handler("текст")
+    finally:
+        profiler.stop()
+
+    slowest = profiler.slowest()
+    assert len(slowest) == 2
+    assert slowest[0].duration > slowest[1].duration > 0.08
+    stacks = list(slowest[0].samples)
+    assert any(stack.startswith('slow_handler') and 'busy_wait' in stack for stack in stacks)
+    assert any(stack.startswith('slow_handler') and 'sleep (tasks.py' in stack for stack in stacks)
+
+    paths = profiler.dump()
+    assert len(paths) == 2 and profiler.slowest() == []
+    line = paths[0].read_text(encoding='utf-8').splitlines()[0]
+    assert line.startswith('slow_handler;slow_handler (test_profiling.py:')
+    assert int(line.rsplit(' ', 1)[1]) > 0
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from bot.other_func.recurrence import describe_recurrence, next_occurrence, parse_recurrence
+from bot.other_func.reminder_analysis import recurring_extract
+
+# Воскресенье
+NOW = datetime(2026, 10, 18, 20, 0)
+
+
+def test_parse_recurrence_phrases() -> None:
+    """Тест разбора фраз повтора.
+
+    Проверяет правило, время первого повторения и текст без фразы повтора и времени.
+    """
+    assert parse_recurrence("каждый день в 9:00 пить воду", NOW) == ("пить воду", datetime(2026, 10, 19, 9, 0), "D")
+    assert parse_recurrence("по понедельникам планерка", NOW) == ("планерка", datetime(2026, 10, 19, 9, 0), "W0")
+    assert parse_recurrence("созвон каждую среду и пятницу в 21:30", NOW) == \
+        ("созвон", datetime(2026, 10, 21, 21, 30), "W24")
+    assert parse_recurrence("отчет еженедельно в 20:30", NOW) == ("отчет", datetime(2026, 10, 18, 20, 30), "W6")
+    assert parse_recurrence("купить хлеб завтра в 9:00", NOW) is None
+
+
+def test_recurring_extract_keeps_rule() -> None:
+    """Тест результата разбора повторяющегося напоминания.
+
+    Проверяет, что правило повтора сохраняется в ReminderParse.
+    """
+    parsed = recurring_extract("по будням зарядка в 7:15", NOW)
+
+    assert (parsed.text, parsed.from_date, parsed.time_str, parsed.recurrence) == \
+        ("зарядка", datetime(2026, 10, 19, 7, 15), "07:15", "W01234")
+
+
+def test_next_occurrence() -> None:
+    """Тест вычисления следующего повторения.
+
+    Проверяет, что время дня сохраняется, дни недели соблюдаются, а после
+    долгого простоя пропущенные повторы не навёрстываются.
+    """
+    monday = datetime(2026, 10, 19, 9, 0)
+
+    assert next_occurrence("D", monday, monday) == datetime(2026, 10, 20, 9, 0)
+    assert next_occurrence("W04", monday, monday) == datetime(2026, 10, 23, 9, 0)
+    assert next_occurrence("W0", monday, monday) == datetime(2026, 10, 26, 9, 0)
+    assert next_occurrence("D", monday, datetime(2027, 3, 1, 12, 0)) == datetime(2027, 3, 2, 9, 0)
+
+
+def test_describe_recurrence() -> None:
+    """Тест описания правила повтора."""
+    assert describe_recurrence("D") == "каждый день"
+    assert describe_recurrence("W01234") == "по будням"
+    assert describe_recurrence("W24") == "по средам, пятницам"
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import periodparser as pp
+
+from bot.other_func.reminder_analysis import (
+    ParseCache, ReminderParse, analyze_reminder_db, analyze_reminder_handlers, parse_cache, parse_reminders
+)
+
+@pytest.mark.asyncio
+async def test_message_parsed_once() -> None:
+    """Тест повторного использования результата разбора.
+
+    Проверяет, что разбор для обработчика и для базы данных вызывает periodparser один раз.
+    """
+    message = AsyncMock()
+    message.text = "Напомни мне о встрече   в пятницу в 15:00"
+    parse_cache.clear()
+
+    with patch('bot.other_func.reminder_analysis.pp.extract', wraps=pp.extract) as mock_extract:
+        parsed = await analyze_reminder_handlers(message=message)
+        text_remind, from_date = await analyze_reminder_db(message=message)
+
+    mock_extract.assert_called_once()
+    assert isinstance(parsed, ReminderParse)
+    assert (text_remind, from_date) == (parsed.text, parsed.from_date)
+    assert parsed.text == "Напомни мне о встрече"
+    assert parsed.time_str == "15:00"
+    assert parse_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_parse_reminders_batch() -> None:
+    """Тест разбора пачки сообщений.
+
+    Проверяет, что результаты возвращаются в порядке сообщений, periodparser
+    вызывается только для строк без быстрого разбора, а строки без даты дают None.
+    """
+    messages = ["Позвонить маме через 5 минут", "Напомни мне о встрече   в пятницу в 15:00", "купить хлеб"]
+    parse_cache.clear()
+
+    with patch('bot.other_func.reminder_analysis.pp.extract', wraps=pp.extract) as mock_extract:
+        parsed = await parse_reminders(messages)
+
+    assert mock_extract.call_count == 2
+    assert [reminder.text if reminder else None for reminder in parsed] == \
+        ["Позвонить маме", "Напомни мне о встрече", None]
+    assert parse_cache.stats()["size"] == 1
+
+
+def test_cache_key_changes_every_minute() -> None:
+    """Тест ключа кэша для относительных фраз.
+
+    Проверяет, что ключ нормализует пробелы и меняется при смене минуты.
+    """
+    key = ParseCache.make_key(" через  10 минут ", datetime(2024, 10, 20, 12, 0, 59))
+
+    assert key == ParseCache.make_key("через 10 минут", datetime(2024, 10, 20, 12, 0, 1))
+    assert key != ParseCache.make_key("через 10 минут", datetime(2024, 10, 20, 12, 1, 0))
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Тест вытеснения из кэша.
+
+    Проверяет, что при переполнении удаляется давно не использованный результат.
+    """
+    cache = ParseCache(maxsize=2)
+    parsed = ReminderParse("текст", datetime(2024, 10, 20, 12, 0), "20 October", "12:00")
+    now = datetime(2024, 10, 20, 11, 0)
+
+    cache.put(cache.make_key("a", now), parsed)
+    cache.put(cache.make_key("b", now), parsed)
+    cache.get(cache.make_key("a", now))
+    cache.put(cache.make_key("c", now), parsed)
+
+    assert cache.get(cache.make_key("b", now)) is None
+    assert cache.get(cache.make_key("a", now)) == parsed
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1}
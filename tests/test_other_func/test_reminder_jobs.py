@@ -0,0 +1,144 @@
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from arq import ArqRedis
+from arq.constants import job_key_prefix
+from arq.jobs import deserialize_job
+from arq.utils import to_unix_ms
+
+from bot.other_func.reminder_jobs import (cancel_job, job_deserializer, job_serializer, migrate_legacy_jobs,
+                                          reconcile_jobs, reschedule_job)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def make_redis(server=None, **serializers) -> ArqRedis:
+    """Создать ArqRedis поверх Redis в памяти."""
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+    from redis.asyncio import ConnectionPool
+
+    return ArqRedis(connection_pool=ConnectionPool(connection_class=FakeAsyncRedisConnection,
+                                                   server=server or fakeredis.FakeServer()), **serializers)
+
+
+def make_msgpack_redis(server=None) -> ArqRedis:
+    """Создать ArqRedis поверх Redis в памяти с сериализатором задач бота."""
+    return make_redis(server, job_serializer=job_serializer, job_deserializer=job_deserializer)
+
+
+def fake_db_pool(linked_job_ids: set[str]) -> MagicMock:
+    """Создать подобие db_pool, в котором существуют напоминания с указанными задачами."""
+    cursor = AsyncMock()
+    cursor.fetchall.side_effect = lambda: [(job_id,) for job_id in linked_job_ids]
+
+    @asynccontextmanager
+    async def get_cursor():
+        yield cursor
+
+    pool = MagicMock()
+    pool.cursor = get_cursor
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_reschedule_replaces_job() -> None:
+    """Тест переноса задачи доставки.
+
+    Проверяет, что старая задача удаляется, а новая ставится в очередь с новым временем
+    и несет только ID напоминания.
+    """
+    redis = make_msgpack_redis()
+    when = datetime.now() + timedelta(hours=1)
+    await redis.enqueue_job("send_reminder", _job_id="reminder:old", _defer_until=when, reminder_id=7)
+
+    new_when = when + timedelta(hours=1)
+    await reschedule_job(redis, "reminder:old", "reminder:new", new_when, 7)
+
+    queue = await redis.zrange(redis.default_queue_name, 0, -1, withscores=True)
+    assert queue == [(b"reminder:new", to_unix_ms(new_when))]
+    assert not await redis.exists(job_key_prefix + "reminder:old")
+    job = deserialize_job(await redis.get(job_key_prefix + "reminder:new"), deserializer=job_deserializer)
+    assert (job.function, job.kwargs) == ("send_reminder", {"reminder_id": 7})
+
+    assert await cancel_job(redis, "reminder:new") is True
+    assert await cancel_job(redis, "reminder:new") is False
+    assert await redis.zcard(redis.default_queue_name) == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_purges_only_orphan_jobs() -> None:
+    """Тест сверки очереди с базой данных.
+
+    Проверяет, что удаляются только старые задачи напоминаний без строки в main_schedule,
+    а свежие, связанные и чужие задачи остаются в очереди.
+    """
+    redis = make_redis()
+    when = datetime.now() + timedelta(hours=1)
+    for job_id in ("reminder:linked", "reminder:orphan", "other-job"):
+        await redis.enqueue_job("send_message", _job_id=job_id, _defer_until=when, chat_id=1, text="текст")
+
+    with patch('bot.other_func.reminder_jobs.logger.log'), \
+         patch('bot.other_func.reminder_jobs.db_pool', fake_db_pool({"reminder:linked"})):
+
+        assert await reconcile_jobs(redis) == 0
+
+        with patch('bot.other_func.reminder_jobs.RECONCILE_GRACE', timedelta(0)):
+            assert await reconcile_jobs(redis) == 1
+
+    queue = await redis.zrange(redis.default_queue_name, 0, -1)
+    assert sorted(queue) == [b"other-job", b"reminder:linked"]
+    assert not await redis.exists(job_key_prefix + "reminder:orphan")
+
+
+@pytest.mark.asyncio
+async def test_migrate_legacy_jobs() -> None:
+    """Тест перевода задач, поставленных до перехода на msgpack.
+
+    Проверяет, что задача с полным текстом и строкой в main_schedule становится
+    задачей send_reminder с ID напоминания, задача без строки только
+    пересериализуется, время и срок жизни сохраняются, а повторный запуск
+    ничего не меняет.
+    """
+    server = fakeredis.FakeServer()
+    legacy, redis = make_redis(server), make_msgpack_redis(server)
+    when = datetime.now() + timedelta(hours=1)
+    await legacy.enqueue_job("send_message", _job_id="reminder:linked", _defer_until=when, chat_id=1, text="текст")
+    await legacy.enqueue_job("send_message", _job_id="reminder:orphan", _defer_until=when, chat_id=2, text="другой")
+    ttl = await redis.pttl(job_key_prefix + "reminder:linked")
+
+    cursor = AsyncMock()
+    cursor.fetchall.return_value = [("reminder:linked", 42)]
+
+    @asynccontextmanager
+    async def get_cursor():
+        yield cursor
+
+    pool = MagicMock()
+    pool.cursor = get_cursor
+
+    with patch('bot.other_func.reminder_jobs.db_pool', pool), \
+         patch('bot.other_func.reminder_jobs.logger.log'):
+        assert await migrate_legacy_jobs(redis) == 2
+        assert await migrate_legacy_jobs(redis) == 0
+
+    linked = await redis.get(job_key_prefix + "reminder:linked")
+    orphan = await redis.get(job_key_prefix + "reminder:orphan")
+    assert linked[:1] != b"\x80" and orphan[:1] != b"\x80"
+    job = deserialize_job(linked, deserializer=job_deserializer)
+    assert (job.function, job.kwargs) == ("send_reminder", {"reminder_id": 42})
+    job = deserialize_job(orphan, deserializer=job_deserializer)
+    assert (job.function, job.kwargs) == ("send_message", {"chat_id": 2, "text": "другой"})
+    assert ttl - 1000 < await redis.pttl(job_key_prefix + "reminder:linked") <= ttl
+    assert await redis.zscore(redis.default_queue_name, "reminder:linked") == to_unix_ms(when)
+
+
+def test_job_deserializer_reads_both_formats() -> None:
+    """Тест десериализации задач в msgpack и в прежнем формате pickle."""
+    import pickle
+
+    job = {"t": 1, "f": "send_reminder", "a": [], "k": {"reminder_id": 5}, "et": 1700000000000}
+    assert job_deserializer(job_serializer(job)) == job
+    assert job_deserializer(pickle.dumps(job)) == job
+    assert job_deserializer(job_serializer({"r": ValueError("ошибка")})) == {"r": "ValueError('ошибка')"}
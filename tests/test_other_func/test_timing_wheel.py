@@ -0,0 +1,59 @@
+import random
+
+from bot.other_func.timing_wheel import TimingWheel
+
+
+def test_timers_fire_exactly_on_their_tick() -> None:
+    """Тест точности срабатывания.
+
+    Проверяет, что при продвижении по одному тику каждый таймер срабатывает
+    ровно в своем тике на всех уровнях колеса, а не раньше и не позже.
+    """
+    wheel = TimingWheel(slot_bits=3, levels=3, start_tick=5)
+    rng = random.Random(1)
+    due = {key: 5 + rng.randrange(600) for key in range(300)}
+    for key, tick in due.items():
+        wheel.insert(key, tick)
+
+    fired_at = {}
+    for tick in range(5, 700):
+        for key in wheel.advance(tick):
+            fired_at[key] = tick
+
+    assert fired_at == due
+    assert len(wheel) == 0
+
+
+def test_cancel_and_reschedule() -> None:
+    """Тест отмены и переноса таймеров.
+
+    Проверяет, что отмененный таймер не срабатывает, а повторная вставка
+    переносит таймер, не создавая второго.
+    """
+    wheel = TimingWheel(slot_bits=2, levels=3)
+    wheel.insert("a", 10)
+    wheel.insert("b", 10)
+    wheel.insert("c", 40)
+
+    assert wheel.cancel("a") is True
+    assert wheel.cancel("a") is False
+    wheel.insert("c", 3)
+
+    assert wheel.advance(3) == ["c"]
+    assert "b" in wheel and "c" not in wheel
+    assert wheel.advance(100) == ["b"]
+
+
+def test_past_and_beyond_horizon_timers() -> None:
+    """Тест таймеров в прошлом и за горизонтом колеса.
+
+    Проверяет, что таймер в прошлом срабатывает при следующем продвижении, а
+    таймер дальше 2**(slot_bits * levels) тиков срабатывает точно в свой тик.
+    """
+    wheel = TimingWheel(slot_bits=2, levels=2, start_tick=100)
+    wheel.insert("late", 50)
+    wheel.insert("far", 100 + 16 * 5 + 3)
+
+    assert wheel.advance(100) == ["late"]
+    assert wheel.advance(182) == []
+    assert wheel.advance(183) == ["far"]
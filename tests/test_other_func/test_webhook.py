@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from aiogram import Bot, Dispatcher, types
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.other_func.webhook import SECRET_HEADER, WebhookServer
+
+
+def make_update(update_id: int) -> dict:
+    """Создать тело запроса с обновлением Telegram."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": "купить молоко",
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+        },
+    }
+
+
+def make_server(handler, max_concurrency: int = 2) -> WebhookServer:
+    """Создать WebhookServer с одним обработчиком сообщений."""
+    dp = Dispatcher(Bot(token="123456:test-token"))
+    dp.register_message_handler(handler)
+    return WebhookServer(dp, path="/webhook", secret_token="secret",
+                         max_concurrency=max_concurrency, drain_timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_webhook_checks_secret_and_body() -> None:
+    """Тест проверки запросов webhook.
+
+    Проверяет, что запросы без секрета и с неверным телом отклоняются,
+    а верное обновление передается обработчику.
+    """
+    received = []
+
+    async def handler(message: types.Message) -> None:
+        received.append(message.text)
+
+    server = make_server(handler)
+    async with TestClient(TestServer(server.make_app())) as client:
+        assert (await client.post("/webhook", json=make_update(1))).status == 401
+        assert (await client.post("/webhook", data="{", headers={SECRET_HEADER: "secret"})).status == 400
+        assert (await client.post("/webhook", json=make_update(2), headers={SECRET_HEADER: "secret"})).status == 200
+        await server.drain()
+
+    assert received == ["купить молоко"]
+    assert (server.accepted, server.rejected) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_webhook_bounds_concurrency_and_drains() -> None:
+    """Тест ограничения параллельной обработки и остановки.
+
+    Проверяет, что одновременно обрабатывается не больше max_concurrency обновлений,
+    остановка дожидается уже принятых, а новые после нее получают 503.
+    """
+    running, peak, done = 0, 0, 0
+    release = asyncio.Event()
+
+    async def handler(message: types.Message) -> None:
+        nonlocal running, peak, done
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+        done += 1
+
+    server = make_server(handler, max_concurrency=2)
+    headers = {SECRET_HEADER: "secret"}
+    async with TestClient(TestServer(server.make_app())) as client:
+        posts = [asyncio.create_task(client.post("/webhook", json=make_update(i), headers=headers))
+                 for i in range(5)]
+        await asyncio.sleep(0.2)
+        assert server.in_flight == 2
+
+        release.set()
+        assert all(response.status == 200 for response in await asyncio.gather(*posts))
+
+        with patch('bot.other_func.webhook.logger.log'):
+            await server.drain()
+        assert (await client.post("/webhook", json=make_update(9), headers=headers)).status == 503
+
+    assert peak == 2
+    assert done == 5
+    assert server.in_flight == 0